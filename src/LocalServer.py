@@ -0,0 +1,331 @@
+import argparse
+import socket
+import time
+import numpy as np
+from gametree.State import State, BLACK, WHITE, EMPTY, KING, WHITE_WIN, BLACK_WIN, RIGHT, UP, LEFT, DOWN
+from gametree.SearchLimits import NO_LIMIT
+from ServerProtocol import ServerConnection, encodeState, decodeMove
+import logging
+logger = logging.getLogger(__name__)
+
+
+# Turns of the states sent to the players
+WHITE_TURN = "white"
+BLACK_TURN = "black"
+WHITE_WIN_TURN = "whitewin"
+BLACK_WIN_TURN = "blackwin"
+DRAW_TURN = "draw"
+
+B, W, K, E = BLACK, WHITE, KING, EMPTY
+INITIAL_BOARD = np.array([
+    [E,E,E,B,B,B,E,E,E],
+    [E,E,E,E,B,E,E,E,E],
+    [E,E,E,E,W,E,E,E,E],
+    [B,E,E,E,W,E,E,E,B],
+    [B,B,W,W,K,W,W,B,B],
+    [B,E,E,E,W,E,E,E,B],
+    [E,E,E,E,W,E,E,E,E],
+    [E,E,E,E,B,E,E,E,E],
+    [E,E,E,B,B,B,E,E,E]
+], dtype=np.byte)
+
+
+"""
+    Referee of a match with the Ashton rules, applied through `State`.
+    A player loses if it makes an illegal move, runs out of time or cannot move.
+    As in the Tablut server, the match is a draw as soon as a state is repeated
+    (states before a capture cannot occur again and are forgotten).
+"""
+class Referee:
+    """
+        Parameters
+        ----------
+            board : npt.NDArray[np.byte]|None
+                Starting board (the initial one if None).
+
+            is_white_turn : bool
+
+            max_turns : int|None
+                Moves after which the match is a draw (None for unlimited).
+    """
+    def __init__(self, board=None, is_white_turn:bool=True, max_turns:int|None=None):
+        self.state = State((INITIAL_BOARD if board is None else np.asarray(board, dtype=np.byte)).copy(), is_white_turn)
+        self.turn = WHITE_TURN if is_white_turn else BLACK_TURN
+        self.max_turns = max_turns
+        self.white_moves = 0
+        self.black_moves = 0
+        self.seen_states = { self.__stateKey() }
+
+
+    def __stateKey(self):
+        return self.state.board.tobytes(), self.state.is_white_turn
+
+
+    def isOver(self) -> bool:
+        return self.turn not in (WHITE_TURN, BLACK_TURN)
+
+
+    def playerToMove(self) -> BLACK|WHITE:
+        return WHITE if self.turn == WHITE_TURN else BLACK
+
+
+    """
+        Applies a move of the player to move.
+
+        Parameters
+        ----------
+            start, end : tuple[int, int]
+                Coordinates of the move.
+
+        Returns
+        -------
+            turn : str
+                Turn of the new state.
+    """
+    def applyMove(self, start:tuple[int, int], end:tuple[int, int]) -> str:
+        if not self.isLegalMove(start, end):
+            logger.warning(f"Illegal move {start} -> {end} by {self.turn}")
+            return self.forfeit()
+
+        if self.turn == WHITE_TURN: self.white_moves += 1
+        else: self.black_moves += 1
+        captured = self.state.applyMove(start, end)
+        if len(captured) > 0: self.seen_states.clear()
+        state_key = self.__stateKey()
+        game_state = self.state.getGameState()
+
+        if game_state == WHITE_WIN:
+            self.turn = WHITE_WIN_TURN
+        elif game_state == BLACK_WIN:
+            self.turn = BLACK_WIN_TURN
+        elif (state_key in self.seen_states) or (self.max_turns is not None and self.white_moves + self.black_moves >= self.max_turns):
+            self.turn = DRAW_TURN
+        else:
+            self.turn = WHITE_TURN if self.state.is_white_turn else BLACK_TURN
+            self.seen_states.add(state_key)
+            if not self.__canMove(): self.forfeit()
+        return self.turn
+
+
+    """
+        Checks if a move can be done by the player to move.
+    """
+    def isLegalMove(self, start, end) -> bool:
+        try:
+            start, end = (int(start[0]), int(start[1])), (int(end[0]), int(end[1]))
+        except (TypeError, ValueError, IndexError):
+            return False
+        if not (self.state.isValidCell(*start) and self.state.isValidCell(*end)): return False
+        return self.state.isLegalMove(start, end)
+
+
+    def __canMove(self) -> bool:
+        for idx in self.state.pieces:
+            i, j = idx // self.state.N_COLS, idx % self.state.N_COLS
+            if (self.state.board[i, j] == BLACK) == self.state.is_white_turn: continue
+            if any(self.state.numSteps(i, j, direction) > 0 for direction in (RIGHT, UP, LEFT, DOWN)):
+                return True
+        return False
+
+
+    """
+        Ends the match with the defeat of a player (the one to move by default).
+    """
+    def forfeit(self, loser=None) -> str:
+        loser = self.playerToMove() if loser is None else loser
+        self.turn = BLACK_WIN_TURN if loser == WHITE else WHITE_WIN_TURN
+        return self.turn
+
+
+    """
+        Returns
+        -------
+            turn : str
+                Final turn (whitewin, blackwin or draw).
+
+            white_moves, black_moves : int
+                Moves done by each player.
+    """
+    def result(self) -> tuple[str, int, int]:
+        return self.turn, self.white_moves, self.black_moves
+
+
+    def stateMessage(self) -> bytes:
+        return encodeState(self.state.board, self.turn)
+
+
+
+"""
+    Local stand-in of the Tablut server.
+    It referees a match between two players that connect with the length-prefixed JSON protocol,
+    and sends every state to both of them.
+    The ports are bound when the server is created, so the players can connect before `run` is called.
+"""
+class MatchServer:
+    """
+        Parameters
+        ----------
+            timeout : float
+                Seconds available to a player to send its move.
+
+            host : str
+
+            white_port, black_port : int
+                Ports of the players (0 to use free ones, see `white_port` and `black_port`).
+
+            max_turns : int|None
+                Moves after which the match is a draw (None for unlimited).
+
+            connect_timeout : float
+                Seconds to wait for the players to connect.
+    """
+    def __init__(self, timeout:float=60, host:str="localhost", white_port:int=5800, black_port:int=5801, max_turns:int|None=None, connect_timeout:float=60):
+        self.timeout = timeout
+        self.max_turns = max_turns
+        self.connect_timeout = connect_timeout
+        self.listeners = { WHITE: socket.create_server((host, white_port)), BLACK: socket.create_server((host, black_port)) }
+        self.white_port = self.listeners[WHITE].getsockname()[1]
+        self.black_port = self.listeners[BLACK].getsockname()[1]
+
+
+    """
+        Waits for the players and plays the match.
+
+        Returns
+        -------
+            turn : str
+                Final turn (whitewin, blackwin or draw).
+
+            white_moves, black_moves : int
+                Moves done by each player.
+    """
+    def run(self) -> tuple[str, int, int]:
+        referee = Referee(max_turns=self.max_turns)
+        players = {}
+        try:
+            for color in (WHITE, BLACK):
+                self.listeners[color].settimeout(self.connect_timeout)
+                sock, _ = self.listeners[color].accept()
+                sock.settimeout(self.timeout)
+                players[color] = ServerConnection(sock)
+                length = players[color].receiveMessage()
+                logger.debug(f"{'White' if color == WHITE else 'Black'} player: {players[color].buffer[:length].decode(errors='replace')}")
+
+            while True:
+                deadline = time.time() + self.timeout
+                self.__sendState(players, referee)
+                if referee.isOver(): break
+
+                player = players[referee.playerToMove()]
+                try:
+                    # The socket timeout only bounds each read, the whole move has to arrive before the deadline
+                    player.sock.settimeout(max(deadline - time.time(), 1e-3))
+                    length = player.receiveMessage()
+                    if player.arrival_time > deadline: raise TimeoutError("Move received after the timeout")
+                    start, end, turn = decodeMove(player.buffer[:length])
+                    if turn != referee.turn[0].upper(): raise ValueError(f"Move sent during the turn of {referee.turn}")
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"The {referee.turn} player loses: {e!r}")
+                    referee.forfeit()
+                    continue
+                referee.applyMove(start, end)
+        finally:
+            for player in players.values(): player.close()
+            for listener in self.listeners.values(): listener.close()
+
+        return referee.result()
+
+
+    """
+        Sends the current state to both the players.
+        A player that cannot receive it loses (if the match is not over).
+    """
+    def __sendState(self, players:dict, referee:Referee):
+        message = referee.stateMessage()
+        for color, player in players.items():
+            try:
+                player.sendMessage(message)
+            except OSError as e:
+                if referee.isOver(): continue
+                logger.warning(f"The {'white' if color == WHITE else 'black'} player loses: {e!r}")
+                referee.forfeit(color)
+                return self.__sendState(players, referee)
+
+
+
+"""
+    Plays a match between two trees in this process, without sockets.
+    The searches are stopped by their own deadline.
+
+    Parameters
+    ----------
+        white_weights, black_weights : dict
+            Weights of the players.
+
+        timeout : float
+            Seconds available for each move.
+
+        max_nodes, max_depth : int
+            Limits of each search (NO_LIMIT for unlimited), e.g. for reproducible matches.
+
+        max_turns : int|None
+            Moves after which the match is a draw (None for unlimited).
+
+        tt_mb : float
+            Memory (in MB) of the transposition table of each tree.
+
+        cython : bool
+            If True, the trees use the compiled modules.
+
+        tree_args
+            Other parameters of the trees.
+
+    Returns
+    -------
+        turn : str
+            Final turn (whitewin, blackwin or draw).
+
+        white_moves, black_moves : int
+            Moves done by each player.
+"""
+def playInProcess(white_weights:dict, black_weights:dict, timeout:float=60, max_nodes:int=NO_LIMIT, max_depth:int=NO_LIMIT, max_turns:int|None=None, tt_mb:float=64, cython:bool=False, **tree_args) -> tuple[str, int, int]:
+    if cython:
+        from cgametree.State import State as TreeState
+        from cgametree.Tree import Tree
+    else:
+        from gametree.Tree import Tree
+        TreeState = State
+
+    referee = Referee(max_turns=max_turns)
+    weights = { WHITE: white_weights, BLACK: black_weights }
+    trees = {}
+    try:
+        while not referee.isOver():
+            color = referee.playerToMove()
+            state = TreeState(referee.state.board.copy(), color == WHITE)
+            if color not in trees:
+                trees[color] = Tree(state, color, weights[color], tt_mb, **tree_args)
+            else:
+                trees[color].applyOpponentMove(state)
+            start, end, _ = trees[color].decide(timeout, max_nodes, max_depth)
+            referee.applyMove(start, end)
+    finally:
+        for tree in trees.values(): tree.close()
+
+    return referee.result()
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="Local Tablut server")
+    parser.add_argument("-t", "--timeout", type=float, default=60, help="Time available to make a move")
+    parser.add_argument("--host", type=str, default="localhost", help="Address to listen on")
+    parser.add_argument("--white-port", type=int, default=5800, help="Port of the white player")
+    parser.add_argument("--black-port", type=int, default=5801, help="Port of the black player")
+    parser.add_argument("--max-turns", type=int, default=None, help="Moves after which the match is a draw")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    server = MatchServer(args.timeout, args.host, args.white_port, args.black_port, args.max_turns)
+    turn, white_moves, black_moves = server.run()
+    print(f"{turn.upper()} | {white_moves} white moves, {black_moves} black moves | {time.time() - start_time:.2f} s")
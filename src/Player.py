@@ -1,109 +1,16 @@
-import socket
-import struct
-import json
 import numpy as np
 from gametree.State import BLACK, WHITE, EMPTY, KING, State
+from gametree.BitboardState import BitboardState
 from gametree.Tree import Tree
+from ServerProtocol import connectToServer, fromIndexToLetters
 import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import logging
 logger = logging.getLogger(__name__)
 
 
-def recvall(sock, n):
-    # Funzione ausiliaria per ricevere n byte o restituire None se viene raggiunta la fine del file (EOF)
-    data = b''
-    while len(data) < n:
-        packet = sock.recv(n - len(data))
-        if not packet:
-            return None
-        data += packet
-    return data
-
-def sendToServer(data, socket):
-    # Invia la lunghezza dei dati di stato corrente dal server e poi i dati stessi
-    data_bytes = data.encode()
-    socket.send(struct.pack('>i', len(data_bytes)))
-    socket.send(data_bytes)
-
-"""
-    Converts our coordinate format into the server's format.
-"""
-def fromIndexToLetters(position):
-    letters = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I']
-    return letters[position[1]] + str(position[0] + 1)
-
-"""
-    Opens the connection to the server and
-    does the initial setup.
-"""
-def initServerConnection(player_name, player_color, ip_addr="localhost", port=None):
-    # Crea un socket TCP
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    # Imposta l'indirizzo del server in base al colore del giocatore
-    if player_color == WHITE:
-        server_address = (ip_addr, port if port is not None else 5800)
-    elif player_color == BLACK:
-        server_address = (ip_addr, port if port is not None else 5801)
-    
-    # Connessione al server
-    sock.connect(server_address)
-
-    # Invia la lunghezza del nome del giocatore e il nome stesso al server
-    sendToServer(player_name, sock)
-
-    return sock
-
-"""
-    Waits for the server to send a new board state.
-"""
-def receiveStateFromServer(sock):
-    # Ricevi la lunghezza dei dati di stato corrente dal server e poi i dati stessi
-    len_bytes = struct.unpack('>i', recvall(sock, 4))[0]
-    current_state_server_bytes = sock.recv(len_bytes)
-
-    # Decodifica i dati di stato in formato JSON
-    json_current_state_server = json.loads(current_state_server_bytes)
-    board = json_current_state_server['board']
-    turn = json_current_state_server['turn'].lower()
-
-    return turn, board
-
-"""
-    Sends a move to the server.
-"""
-def sendMoveToServer(sock, start_pos, end_pos, my_color):
-    # Converte la mossa del giocatore nel formato richiesto dal server e la invia
-    mossa = {
-        "from" : fromIndexToLetters(start_pos),
-        "to" : fromIndexToLetters(end_pos),
-        "turn" : "W" if my_color == WHITE else "B"
-    }
-    sendToServer(json.dumps(mossa), sock)
-
-"""
-    Parses the board received from the server into our format.
-"""
-def parseServerBoard(board):
-    curr_board = np.zeros((len(board), len(board[0])), dtype=np.byte)
-
-    for i in range(len(board)):
-        for j in range(len(board[i])):
-            col = board[i][j].upper()
-            if col == 'EMPTY' or col == "THRONE":
-                curr_board[i, j] = EMPTY
-            elif col == 'BLACK':
-                curr_board[i, j] = BLACK
-            elif col == 'WHITE':
-                curr_board[i, j] = WHITE
-            elif col == 'KING':
-                curr_board[i, j] = KING
-            else:
-                logger.error(f"Unknown board value\n{curr_board}")
-                raise Exception("Stato non riconosciuto")
-            
-    return curr_board
-
-
 class Player:
     def __init__(self, 
         my_color: str,
@@ -111,18 +18,34 @@ class Player:
         timeout_tol = 1,
         name = "TheCatIsOnTheTablut",
         weights:dict = None,
-        tt_size:int = 1e6,
+        tt_mb:float = 64,
+        compact = False,
+        search = "alphabeta",
+        workers = 1,
+        quiescence = False,
+        null_move = False,
+        lmr = False,
+        ponder = False,
         server_ip = "localhost",
         server_port = None,
+        bitboard = False,
         debug = False
     ):
         self.my_color = WHITE if my_color == "white" else BLACK
         self.name = name
-        self.sock = initServerConnection(name, self.my_color, server_ip, server_port)
+        self.server = connectToServer(name, self.my_color, server_ip, server_port)
         self.timeout = timeout
         self.timeout_tol = timeout_tol
         self.weights = weights
-        self.tt_size = tt_size
+        self.tt_mb = tt_mb
+        self.compact = compact
+        self.search = search
+        self.workers = workers
+        self.quiescence = quiescence
+        self.null_move = null_move
+        self.lmr = lmr
+        self.ponder = ponder
+        self.state_class = BitboardState if bitboard else State
         self.debug = debug
 
         self.game_tree = None
@@ -130,22 +53,23 @@ class Player:
 
     def play(self):
         while True:
-            turn, board = receiveStateFromServer(self.sock)
+            turn, board = self.server.receiveState()
+            if self.debug:
+                logger.debug(f"Received state in {1000*self.server.read_duration:.3f} ms (parsed in {1000*self.server.parse_duration:.3f} ms)")
             if turn == "white": curr_turn = WHITE
             elif turn == "black": curr_turn = BLACK
             else: break
 
             if curr_turn != self.my_color:
+                if self.ponder and self.game_tree is not None:
+                    # Searches on the opponent's time until its move arrives
+                    self.game_tree.ponder(self.server.hasIncomingData)
                 continue
 
-            curr_board = parseServerBoard(board)
-            curr_state = State(curr_board, curr_turn == WHITE, rules="ashton")
+            curr_board = board.copy() # The board of the connection is reused by the next state
+            curr_state = self.state_class(curr_board, curr_turn == WHITE, rules="ashton")
 
-            if self.game_tree is None:
-                # Tree created for the first time
-                self.game_tree = Tree(curr_state, self.my_color, weights=self.weights, tt_size=self.tt_size, debug=self.debug)
-            else:
-                self.game_tree.applyOpponentMove(curr_state)
+            self.updateTree(curr_state)
 
             if self.debug:
                 start_time = time.time()
@@ -154,12 +78,139 @@ class Player:
                 end_time = time.time()
                 logger.debug(f"[{end_time-start_time:.2f} s] Best move {start_pos} -> {end_pos} ({score:.3f})")
 
-            sendMoveToServer(self.sock, start_pos, end_pos, self.my_color)
+            self.server.sendMove(start_pos, end_pos, self.my_color)
+            if self.debug:
+                logger.debug(f"Sent move in {1000*self.server.send_duration:.3f} ms")
+
+        if self.game_tree is not None:
+            self.game_tree.close()
+        self.server.close()
+        self.printResult(turn)
+
+
+    """
+        Brings the game tree to the state received from the server.
+    """
+    def updateTree(self, curr_state):
+        if self.game_tree is None:
+            # Tree created for the first time
+            self.game_tree = Tree(curr_state, self.my_color, weights=self.weights, tt_mb=self.tt_mb, compact=self.compact, search=self.search, workers=self.workers, quiescence=self.quiescence, null_move=self.null_move, lmr=self.lmr, debug=self.debug)
+        else:
+            self.game_tree.applyOpponentMove(curr_state)
+
 
+    """
+        Prints the outcome of the game.
+    """
+    def printResult(self, turn):
         if turn == "draw":
             print("🇨🇭")
         elif ((turn == "whitewin" and self.my_color == WHITE) or
             (turn == "blackwin" and self.my_color == BLACK)):
             print("ᕦ(⌐■_■)ᕤ")
         else:
-            print("(• ᴖ •)")
\ No newline at end of file
+            print("(• ᴖ •)")
+
+
+"""
+    Player driven by an asyncio event loop.
+    The socket is handled by the loop and the searches run in a worker thread, so that the next state
+    is read while searching and a search is interrupted as soon as it arrives
+    (i.e. the opponent's move while pondering or the end of the game during our turn).
+    The time of a move is counted from the arrival of its state.
+"""
+class AsyncPlayer(Player):
+    def play(self):
+        asyncio.run(self.__play())
+
+
+    async def __play(self):
+        self.server.sock.setblocking(False)
+        executor = ThreadPoolExecutor(max_workers=1) # The tree handles a search at a time
+        next_state = asyncio.ensure_future(self.__receiveState())
+
+        try:
+            while True:
+                turn, board, arrival_time = await next_state
+                if turn == "white": curr_turn = WHITE
+                elif turn == "black": curr_turn = BLACK
+                else: break
+                next_state = asyncio.ensure_future(self.__receiveState())
+
+                if curr_turn != self.my_color:
+                    if self.ponder and self.game_tree is not None:
+                        # Searches on the opponent's time until its move arrives
+                        await self.__search(executor, next_state, self.game_tree.ponder)
+                    continue
+
+                self.updateTree(self.state_class(board, curr_turn == WHITE, rules="ashton"))
+
+                timeout = self.timeout - self.timeout_tol - (time.time() - arrival_time)
+                start_time = time.time()
+                start_pos, end_pos, score = await self.__search(executor, next_state, lambda is_interrupted: self.game_tree.decide(timeout, is_interrupted=is_interrupted))
+                end_time = time.time()
+                if next_state.done():
+                    logger.warning("Search interrupted by a new state from the server")
+                    continue
+                logger.info(f"[{end_time-start_time:.2f} s] Best move {start_pos} -> {end_pos} [{fromIndexToLetters(start_pos)} -> {fromIndexToLetters(end_pos)}] ({score:.3f})")
+
+                await self.server.sendMoveAsync(start_pos, end_pos, self.my_color)
+                if self.debug:
+                    logger.debug(f"Sent move in {1000*self.server.send_duration:.3f} ms ({1000*(time.time() - arrival_time - (end_time - start_time)):.3f} ms of the turn outside of the search)")
+        finally:
+            next_state.cancel()
+            executor.shutdown()
+            if self.game_tree is not None:
+                self.game_tree.close()
+            self.server.close()
+
+        self.printResult(turn)
+
+
+    """
+        Waits for the next state of the server.
+
+        Returns
+        -------
+            turn : str
+
+            board : npt.NDArray[np.byte]
+                Copy of the board, as the one of the connection is reused.
+
+            arrival_time : float
+                Timestamp at which the state has been received.
+    """
+    async def __receiveState(self):
+        turn, board = await self.server.receiveStateAsync()
+        if self.debug:
+            logger.debug(f"Received state in {1000*self.server.read_duration:.3f} ms (parsed in {1000*self.server.parse_duration:.3f} ms)")
+        return turn, board.copy(), self.server.arrival_time
+
+
+    """
+        Runs a search in the executor until it ends or the next state arrives.
+
+        Parameters
+        ----------
+            executor : concurrent.futures.Executor
+
+            next_state : asyncio.Future
+                Pending reception of the next state.
+
+            search : Callable[[Callable[[], bool]], Any]
+                Search to run, called with its interruption check.
+
+        Returns
+        -------
+            result : Any
+                Result of the search.
+    """
+    async def __search(self, executor, next_state, search):
+        interrupted = threading.Event()
+        interrupt = lambda _: interrupted.set()
+        next_state.add_done_callback(interrupt)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, search, interrupted.is_set)
+        finally:
+            next_state.remove_done_callback(interrupt)
+            interrupted.set() # Stops the search if the player is cancelled
@@ -0,0 +1,317 @@
+import asyncio
+import socket
+import select
+import struct
+import json
+import time
+import numpy as np
+from gametree.State import BLACK, WHITE, EMPTY, KING
+import logging
+logger = logging.getLogger(__name__)
+
+
+BOARD_ROWS = 9
+BOARD_COLS = 9
+HEADER_SIZE = 4 # Length of a message, as a big-endian int
+INITIAL_BUFFER_SIZE = 4096
+QUOTE = ord('"')
+
+# Cells sent by the server, recognized by their first byte (case insensitive) and their length
+CELL_CODES = np.full(256, -1, dtype=np.int8)
+CELL_NAME_LENGTHS = np.zeros(256, dtype=np.int64)
+for name, code in (("EMPTY", EMPTY), ("THRONE", EMPTY), ("BLACK", BLACK), ("WHITE", WHITE), ("KING", KING)):
+    for first_byte in (ord(name[0]), ord(name[0].lower())):
+        CELL_CODES[first_byte] = code
+        CELL_NAME_LENGTHS[first_byte] = len(name)
+CELL_NAMES = { EMPTY: "EMPTY", BLACK: "BLACK", WHITE: "WHITE", KING: "KING" }
+
+
+"""
+    Converts our coordinate format into the server's format.
+"""
+def fromIndexToLetters(position):
+    letters = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I']
+    return letters[position[1]] + str(position[0] + 1)
+
+
+"""
+    Converts the server's coordinate format into ours.
+"""
+def fromLettersToIndex(position):
+    return int(position[1:]) - 1, ord(position[0].upper()) - ord('A')
+
+
+"""
+    Encodes a move in the server's format.
+"""
+def encodeMove(start_pos, end_pos, my_color) -> bytes:
+    return json.dumps({
+        "from" : fromIndexToLetters(start_pos),
+        "to" : fromIndexToLetters(end_pos),
+        "turn" : "W" if my_color == WHITE else "B"
+    }).encode()
+
+
+"""
+    Decodes a move sent by a player.
+
+    Returns
+    -------
+        start_pos, end_pos : tuple[int, int]
+            Coordinates of the move.
+
+        turn : str
+            Player that sent the move (W or B).
+"""
+def decodeMove(data):
+    move = json.loads(data)
+    return fromLettersToIndex(move["from"]), fromLettersToIndex(move["to"]), move["turn"].upper()
+
+
+"""
+    Encodes a state in the server's format.
+
+    Parameters
+    ----------
+        board : npt.NDArray[np.byte]
+
+        turn : str
+            Turn of the state (white, black, whitewin, blackwin or draw).
+"""
+def encodeState(board, turn) -> bytes:
+    cells = [ [CELL_NAMES[cell] for cell in row] for row in board.tolist() ]
+    if cells[BOARD_ROWS//2][BOARD_COLS//2] == "EMPTY":
+        cells[BOARD_ROWS//2][BOARD_COLS//2] = "THRONE"
+    return json.dumps({ "board": cells, "turn": turn.upper() }).encode()
+
+
+"""
+    Opens the connection to the server and
+    does the initial setup.
+"""
+def connectToServer(player_name:str, player_color, ip_addr="localhost", port=None):
+    if player_color == WHITE:
+        server_address = (ip_addr, int(port) if port is not None else 5800)
+    elif player_color == BLACK:
+        server_address = (ip_addr, int(port) if port is not None else 5801)
+
+    connection = ServerConnection(socket.create_connection(server_address))
+    connection.sendMessage(player_name.encode())
+    return connection
+
+
+"""
+    Length-prefixed JSON channel with the server.
+    Messages are received into a reusable buffer and the board of a state is decoded
+    directly from its bytes into a preallocated array (i.e. a turn does not allocate the JSON objects).
+    The `Async` methods do the same on an asyncio event loop and require a non-blocking socket.
+    The duration of the last reads, parsing and sends are kept for the debug logs.
+"""
+class ServerConnection:
+    """
+        Parameters
+        ----------
+            sock : socket.socket
+                Connected socket.
+    """
+    def __init__(self, sock:socket.socket):
+        self.sock = sock
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            # Moves are small and have to leave immediately
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.header = bytearray(HEADER_SIZE)
+        self.header_view = memoryview(self.header)
+        self.__allocateBuffer(INITIAL_BUFFER_SIZE)
+        self.board = np.zeros((BOARD_ROWS, BOARD_COLS), dtype=np.byte)
+
+        self.arrival_time = 0.0     # Timestamp at which the last message has been completely received
+        self.read_duration = 0.0    # Seconds spent reading the last message (after its header arrived)
+        self.parse_duration = 0.0   # Seconds spent decoding the last state
+        self.send_duration = 0.0    # Seconds spent sending the last message
+
+
+    def __allocateBuffer(self, size:int):
+        self.buffer = bytearray(size)
+        self.buffer_view = memoryview(self.buffer)
+        self.buffer_bytes = np.frombuffer(self.buffer, dtype=np.uint8)
+
+
+    """
+        Fills the first `n` bytes of a buffer with the data of the socket.
+    """
+    def __receiveInto(self, view:memoryview, n:int):
+        received = 0
+        while received < n:
+            count = self.sock.recv_into(view[received:n], n - received)
+            if count == 0:
+                raise ConnectionError("Connection closed by the server")
+            received += count
+
+
+    """
+        Waits for the next message of the server.
+
+        Returns
+        -------
+            length : int
+                Length of the message, stored at the beginning of `self.buffer`
+                (valid until the next call).
+    """
+    def receiveMessage(self) -> int:
+        self.__receiveInto(self.header_view, HEADER_SIZE)
+        start_time = time.time()
+        length = self.__prepareBuffer()
+        self.__receiveInto(self.buffer_view, length)
+        self.arrival_time = time.time()
+        self.read_duration = self.arrival_time - start_time
+        return length
+
+
+    async def __receiveIntoAsync(self, view:memoryview, n:int):
+        loop = asyncio.get_running_loop()
+        received = 0
+        while received < n:
+            count = await loop.sock_recv_into(self.sock, view[received:n])
+            if count == 0:
+                raise ConnectionError("Connection closed by the server")
+            received += count
+
+
+    """
+        Asynchronous version of `receiveMessage`.
+    """
+    async def receiveMessageAsync(self) -> int:
+        await self.__receiveIntoAsync(self.header_view, HEADER_SIZE)
+        start_time = time.time()
+        length = self.__prepareBuffer()
+        await self.__receiveIntoAsync(self.buffer_view, length)
+        self.arrival_time = time.time()
+        self.read_duration = self.arrival_time - start_time
+        return length
+
+
+    """
+        Returns the length of the incoming message, after making room for it in the buffer.
+    """
+    def __prepareBuffer(self) -> int:
+        length = struct.unpack(">i", self.header)[0]
+        if length > len(self.buffer):
+            self.__allocateBuffer(max(length, 2*len(self.buffer)))
+        return length
+
+
+    """
+        Waits for the server to send a new board state.
+
+        Returns
+        -------
+            turn : str
+                Turn in lowercase (white, black, whitewin, blackwin or draw).
+
+            board : npt.NDArray[np.byte]
+                Board of the state, overwritten by the next call.
+    """
+    def receiveState(self) -> tuple[str, np.ndarray]:
+        return self.parseState(self.receiveMessage())
+
+
+    """
+        Asynchronous version of `receiveState`.
+    """
+    async def receiveStateAsync(self) -> tuple[str, np.ndarray]:
+        return self.parseState(await self.receiveMessageAsync())
+
+
+    """
+        Decodes the state in the buffer.
+
+        Parameters
+        ----------
+            length : int
+                Length of the message.
+
+        Returns
+        -------
+            turn : str
+                Turn in lowercase (white, black, whitewin, blackwin or draw).
+
+            board : npt.NDArray[np.byte]
+                Board of the state, overwritten by the next call.
+    """
+    def parseState(self, length:int) -> tuple[str, np.ndarray]:
+        start_time = time.time()
+        turn = self.__parseTurn(length)
+        self.__parseBoard(length)
+        self.parse_duration = time.time() - start_time
+        return turn, self.board
+
+
+    def __parseTurn(self, length:int) -> str:
+        key = self.buffer.find(b'"turn"', 0, length)
+        if key < 0: raise ValueError("Missing turn in the state")
+        value_start = self.buffer.find(b'"', key + len(b'"turn"'), length) + 1
+        value_end = self.buffer.find(b'"', value_start, length)
+        if value_start <= 0 or value_end < 0: raise ValueError("Malformed turn in the state")
+        return self.buffer_view[value_start:value_end].tobytes().decode().lower()
+
+
+    """
+        Decodes the board from the quoted cells that follow the "board" key.
+    """
+    def __parseBoard(self, length:int):
+        key = self.buffer.find(b'"board"', 0, length)
+        if key < 0: raise ValueError("Missing board in the state")
+        key_end = key + len(b'"board"')
+        quotes = np.flatnonzero(self.buffer_bytes[key_end:length] == QUOTE)[:2*BOARD_ROWS*BOARD_COLS] + key_end
+        if len(quotes) < 2*BOARD_ROWS*BOARD_COLS: raise ValueError("Incomplete board in the state")
+
+        first_bytes = self.buffer_bytes[quotes[0::2] + 1]
+        codes = CELL_CODES[first_bytes]
+        if np.any(codes < 0) or np.any(quotes[1::2] - quotes[0::2] - 1 != CELL_NAME_LENGTHS[first_bytes]):
+            logger.error(f"Unknown board value\n{self.buffer_view[:length].tobytes().decode(errors='replace')}")
+            raise ValueError("Unknown board value")
+        self.board.reshape(-1)[:] = codes
+
+
+    """
+        Sends a message with its length.
+    """
+    def sendMessage(self, data:bytes):
+        start_time = time.time()
+        self.sock.sendall(struct.pack(">i", len(data)) + data)
+        self.send_duration = time.time() - start_time
+
+
+    """
+        Sends a move to the server.
+    """
+    def sendMove(self, start_pos, end_pos, my_color):
+        self.sendMessage(encodeMove(start_pos, end_pos, my_color))
+
+
+    """
+        Asynchronous version of `sendMessage`.
+    """
+    async def sendMessageAsync(self, data:bytes):
+        start_time = time.time()
+        await asyncio.get_running_loop().sock_sendall(self.sock, struct.pack(">i", len(data)) + data)
+        self.send_duration = time.time() - start_time
+
+
+    """
+        Asynchronous version of `sendMove`.
+    """
+    async def sendMoveAsync(self, start_pos, end_pos, my_color):
+        await self.sendMessageAsync(encodeMove(start_pos, end_pos, my_color))
+
+
+    """
+        Checks (without blocking) if the server sent something.
+    """
+    def hasIncomingData(self) -> bool:
+        readable, _, _ = select.select([self.sock], [], [], 0)
+        return len(readable) > 0
+
+
+    def close(self):
+        self.sock.close()
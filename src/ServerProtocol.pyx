@@ -0,0 +1,354 @@
+import asyncio
+import socket
+import select
+import struct
+import json
+import time
+import numpy as np
+cimport numpy as cnp
+cnp.import_array()
+from cgametree.State cimport BLACK, WHITE, EMPTY, KING
+import logging
+logger = logging.getLogger(__name__)
+
+
+cdef enum:
+    BOARD_ROWS = 9
+    BOARD_COLS = 9
+    HEADER_SIZE = 4 # Length of a message, as a big-endian int
+    INITIAL_BUFFER_SIZE = 4096
+    QUOTE = 34 # '"'
+
+# Cells sent by the server, recognized by their first byte (case insensitive) and their length
+cdef signed char[256] CELL_CODES
+cdef int[256] CELL_NAME_LENGTHS
+cdef void __initCellTables():
+    cdef int k
+    cdef str name
+    cdef char code
+    for k in range(256):
+        CELL_CODES[k] = -1
+        CELL_NAME_LENGTHS[k] = 0
+    for name, code in (("EMPTY", EMPTY), ("THRONE", EMPTY), ("BLACK", BLACK), ("WHITE", WHITE), ("KING", KING)):
+        for k in (ord(name[0]), ord(name[0].lower())):
+            CELL_CODES[k] = code
+            CELL_NAME_LENGTHS[k] = len(name)
+__initCellTables()
+CELL_NAMES = { EMPTY: "EMPTY", BLACK: "BLACK", WHITE: "WHITE", KING: "KING" }
+
+
+"""
+    Converts our coordinate format into the server's format.
+"""
+def fromIndexToLetters(position):
+    letters = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I']
+    return letters[position[1]] + str(position[0] + 1)
+
+
+"""
+    Converts the server's coordinate format into ours.
+"""
+def fromLettersToIndex(position):
+    return int(position[1:]) - 1, ord(position[0].upper()) - ord('A')
+
+
+"""
+    Encodes a move in the server's format.
+"""
+def encodeMove(start_pos, end_pos, my_color) -> bytes:
+    return json.dumps({
+        "from" : fromIndexToLetters(start_pos),
+        "to" : fromIndexToLetters(end_pos),
+        "turn" : "W" if my_color == WHITE else "B"
+    }).encode()
+
+
+"""
+    Decodes a move sent by a player.
+
+    Returns
+    -------
+        start_pos, end_pos : tuple[int, int]
+            Coordinates of the move.
+
+        turn : str
+            Player that sent the move (W or B).
+"""
+def decodeMove(data):
+    move = json.loads(data)
+    return fromLettersToIndex(move["from"]), fromLettersToIndex(move["to"]), move["turn"].upper()
+
+
+"""
+    Encodes a state in the server's format.
+
+    Parameters
+    ----------
+        board : npt.NDArray[np.byte]
+
+        turn : str
+            Turn of the state (white, black, whitewin, blackwin or draw).
+"""
+def encodeState(board, turn) -> bytes:
+    cells = [ [CELL_NAMES[cell] for cell in row] for row in board.tolist() ]
+    if cells[BOARD_ROWS//2][BOARD_COLS//2] == "EMPTY":
+        cells[BOARD_ROWS//2][BOARD_COLS//2] = "THRONE"
+    return json.dumps({ "board": cells, "turn": turn.upper() }).encode()
+
+
+"""
+    Opens the connection to the server and
+    does the initial setup.
+"""
+def connectToServer(str player_name, player_color, ip_addr="localhost", port=None):
+    if player_color == WHITE:
+        server_address = (ip_addr, int(port) if port is not None else 5800)
+    elif player_color == BLACK:
+        server_address = (ip_addr, int(port) if port is not None else 5801)
+
+    connection = ServerConnection(socket.create_connection(server_address))
+    connection.sendMessage(player_name.encode())
+    return connection
+
+
+"""
+    Length-prefixed JSON channel with the server.
+    Messages are received into a reusable buffer and the board of a state is decoded
+    directly from its bytes into a preallocated array (i.e. a turn does not allocate the JSON objects).
+    The `Async` methods do the same on an asyncio event loop and require a non-blocking socket.
+    The duration of the last reads, parsing and sends are kept for the debug logs.
+"""
+cdef class ServerConnection:
+    cdef public object sock
+    cdef bytearray header
+    cdef object header_view
+    cdef public bytearray buffer
+    cdef object buffer_view
+    cdef public cnp.ndarray board
+    cdef public double arrival_time
+    cdef public double read_duration
+    cdef public double parse_duration
+    cdef public double send_duration
+
+    """
+        Parameters
+        ----------
+            sock : socket.socket
+                Connected socket.
+    """
+    def __init__(self, sock):
+        self.sock = sock
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            # Moves are small and have to leave immediately
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.header = bytearray(HEADER_SIZE)
+        self.header_view = memoryview(self.header)
+        self.__allocateBuffer(INITIAL_BUFFER_SIZE)
+        self.board = np.zeros((BOARD_ROWS, BOARD_COLS), dtype=np.byte)
+
+        self.arrival_time = 0.0     # Timestamp at which the last message has been completely received
+        self.read_duration = 0.0    # Seconds spent reading the last message (after its header arrived)
+        self.parse_duration = 0.0   # Seconds spent decoding the last state
+        self.send_duration = 0.0    # Seconds spent sending the last message
+
+
+    cdef void __allocateBuffer(self, Py_ssize_t size):
+        self.buffer = bytearray(size)
+        self.buffer_view = memoryview(self.buffer)
+
+
+    """
+        Fills the first `n` bytes of a buffer with the data of the socket.
+    """
+    cdef __receiveInto(self, view, Py_ssize_t n):
+        cdef Py_ssize_t received = 0
+        cdef Py_ssize_t count
+        while received < n:
+            count = self.sock.recv_into(view[received:n], n - received)
+            if count == 0:
+                raise ConnectionError("Connection closed by the server")
+            received += count
+
+
+    """
+        Waits for the next message of the server.
+
+        Returns
+        -------
+            length : int
+                Length of the message, stored at the beginning of `self.buffer`
+                (valid until the next call).
+    """
+    def receiveMessage(self) -> int:
+        cdef double start_time
+        cdef Py_ssize_t length
+        self.__receiveInto(self.header_view, HEADER_SIZE)
+        start_time = time.time()
+        length = self.__prepareBuffer()
+        self.__receiveInto(self.buffer_view, length)
+        self.arrival_time = time.time()
+        self.read_duration = self.arrival_time - start_time
+        return length
+
+
+    async def __receiveIntoAsync(self, view, Py_ssize_t n):
+        cdef Py_ssize_t received = 0
+        cdef Py_ssize_t count
+        loop = asyncio.get_running_loop()
+        while received < n:
+            count = await loop.sock_recv_into(self.sock, view[received:n])
+            if count == 0:
+                raise ConnectionError("Connection closed by the server")
+            received += count
+
+
+    """
+        Asynchronous version of `receiveMessage`.
+    """
+    async def receiveMessageAsync(self):
+        cdef double start_time
+        cdef Py_ssize_t length
+        await self.__receiveIntoAsync(self.header_view, HEADER_SIZE)
+        start_time = time.time()
+        length = self.__prepareBuffer()
+        await self.__receiveIntoAsync(self.buffer_view, length)
+        self.arrival_time = time.time()
+        self.read_duration = self.arrival_time - start_time
+        return length
+
+
+    """
+        Returns the length of the incoming message, after making room for it in the buffer.
+    """
+    cdef Py_ssize_t __prepareBuffer(self) except -1:
+        cdef Py_ssize_t length = struct.unpack(">i", self.header)[0]
+        if length > len(self.buffer):
+            self.__allocateBuffer(max(length, 2*len(self.buffer)))
+        return length
+
+
+    """
+        Waits for the server to send a new board state.
+
+        Returns
+        -------
+            turn : str
+                Turn in lowercase (white, black, whitewin, blackwin or draw).
+
+            board : npt.NDArray[np.byte]
+                Board of the state, overwritten by the next call.
+    """
+    def receiveState(self):
+        return self.parseState(self.receiveMessage())
+
+
+    """
+        Asynchronous version of `receiveState`.
+    """
+    async def receiveStateAsync(self):
+        return self.parseState(await self.receiveMessageAsync())
+
+
+    """
+        Decodes the state in the buffer.
+
+        Parameters
+        ----------
+            length : int
+                Length of the message.
+
+        Returns
+        -------
+            turn : str
+                Turn in lowercase (white, black, whitewin, blackwin or draw).
+
+            board : npt.NDArray[np.byte]
+                Board of the state, overwritten by the next call.
+    """
+    cpdef tuple parseState(self, Py_ssize_t length):
+        cdef double start_time = time.time()
+        cdef str turn = self.__parseTurn(length)
+        self.__parseBoard(length)
+        self.parse_duration = time.time() - start_time
+        return turn, self.board
+
+
+    cdef str __parseTurn(self, Py_ssize_t length):
+        cdef Py_ssize_t key, value_start, value_end
+        key = self.buffer.find(b'"turn"', 0, length)
+        if key < 0: raise ValueError("Missing turn in the state")
+        value_start = self.buffer.find(b'"', key + len(b'"turn"'), length) + 1
+        value_end = self.buffer.find(b'"', value_start, length)
+        if value_start <= 0 or value_end < 0: raise ValueError("Malformed turn in the state")
+        return self.buffer_view[value_start:value_end].tobytes().decode().lower()
+
+
+    """
+        Decodes the board from the quoted cells that follow the "board" key.
+    """
+    cdef int __parseBoard(self, Py_ssize_t length) except -1:
+        cdef const unsigned char[:] payload = self.buffer
+        cdef cnp.npy_byte[:, :] board = self.board
+        cdef Py_ssize_t key, pos
+        cdef int cell = 0
+        cdef unsigned char first_byte
+        key = self.buffer.find(b'"board"', 0, length)
+        if key < 0: raise ValueError("Missing board in the state")
+
+        pos = key + len(b'"board"')
+        while cell < BOARD_ROWS*BOARD_COLS:
+            while (pos < length) and (payload[pos] != QUOTE): pos += 1
+            if pos + 1 >= length: raise ValueError("Incomplete board in the state")
+            first_byte = payload[pos + 1]
+            pos += 1 + CELL_NAME_LENGTHS[first_byte]
+            if (CELL_CODES[first_byte] < 0) or (pos >= length) or (payload[pos] != QUOTE):
+                logger.error(f"Unknown board value\n{self.buffer_view[:length].tobytes().decode(errors='replace')}")
+                raise ValueError("Unknown board value")
+            board[cell // BOARD_COLS, cell % BOARD_COLS] = CELL_CODES[first_byte]
+            pos += 1
+            cell += 1
+        return 0
+
+
+    """
+        Sends a message with its length.
+    """
+    def sendMessage(self, bytes data):
+        cdef double start_time = time.time()
+        self.sock.sendall(struct.pack(">i", len(data)) + data)
+        self.send_duration = time.time() - start_time
+
+
+    """
+        Sends a move to the server.
+    """
+    def sendMove(self, start_pos, end_pos, my_color):
+        self.sendMessage(encodeMove(start_pos, end_pos, my_color))
+
+
+    """
+        Asynchronous version of `sendMessage`.
+    """
+    async def sendMessageAsync(self, bytes data):
+        cdef double start_time = time.time()
+        await asyncio.get_running_loop().sock_sendall(self.sock, struct.pack(">i", len(data)) + data)
+        self.send_duration = time.time() - start_time
+
+
+    """
+        Asynchronous version of `sendMove`.
+    """
+    async def sendMoveAsync(self, start_pos, end_pos, my_color):
+        await self.sendMessageAsync(encodeMove(start_pos, end_pos, my_color))
+
+
+    """
+        Checks (without blocking) if the server sent something.
+    """
+    def hasIncomingData(self) -> bool:
+        readable, _, _ = select.select([self.sock], [], [], 0)
+        return len(readable) > 0
+
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,49 @@
+from .State cimport State
+from .utils cimport *
+
+cdef extern from *:
+    """
+    typedef unsigned __int128 bitboard_t;
+
+    static inline bitboard_t bbCell(int idx) { return ((bitboard_t)1) << idx; }
+
+    static inline int bbLowestBit(bitboard_t b) {
+        unsigned long long low = (unsigned long long)b;
+        if (low) return __builtin_ctzll(low);
+        return 64 + __builtin_ctzll((unsigned long long)(b >> 64));
+    }
+
+    static inline int bbHighestBit(bitboard_t b) {
+        unsigned long long high = (unsigned long long)(b >> 64);
+        if (high) return 127 - __builtin_clzll(high);
+        return 63 - __builtin_clzll((unsigned long long)b);
+    }
+
+    static inline int bbPopCount(bitboard_t b) {
+        return __builtin_popcountll((unsigned long long)b) + __builtin_popcountll((unsigned long long)(b >> 64));
+    }
+    """
+    ctypedef unsigned long long bitboard_t
+    bitboard_t bbCell(int idx)
+    int bbLowestBit(bitboard_t b)
+    int bbHighestBit(bitboard_t b)
+    int bbPopCount(bitboard_t b)
+
+
+cdef class BitboardState(State):
+    cdef bitboard_t white_mask
+    cdef bitboard_t black_mask
+    cdef bitboard_t king_mask
+
+    cdef char getGameState(self)
+    cdef bint isWall(self, pos_t i, pos_t j)
+    cdef bint isCaptured(self, pos_t i, pos_t j, char to_filter_axis=*)
+    cdef int numSteps(self, pos_t i, pos_t j, char direction)
+
+    cdef tuple[list[Move], list[Move]] getMoves(self)
+    cdef bitboard_t __wallsFor(self, int idx)
+    cdef bitboard_t __movesMask(self, int idx, int direction, bitboard_t obstacles)
+    cdef void __appendMoves(self, list[Move] out, int idx, int direction, bitboard_t moves)
+    cdef bitboard_t __capturingCells(self)
+
+    cdef void __togglePawn(self, char pawn, bitboard_t mask)
@@ -0,0 +1,466 @@
+from __future__ import annotations
+import numpy as np
+cimport numpy as cnp
+cnp.import_array()
+from .utils cimport *
+from .State cimport (
+    State, EMPTY, BLACK, WHITE, KING, WHITE_WIN, BLACK_WIN, OPEN,
+    UP, DOWN, RIGHT, LEFT, VERTICAL, HORIZONTAL, VERT_HORIZ,
+    ESCAPE_TILES, NO_CAMP, CASTLE_TILE, NEAR_CASTLE_TILES
+)
+from .State import CAMP_DICT
+cimport cython
+
+
+cdef enum:
+    N_ROWS = 9
+    N_COLS = 9
+    N_CELLS = 81
+
+# Directions are indexed as (direction - UP), i.e. UP, DOWN, RIGHT, LEFT (same order of State)
+cdef int[4] DELTA_I = [-1, 1, 0, 0]
+cdef int[4] DELTA_J = [0, 0, 1, -1]
+cdef int[4] OPPOSITE = [1, 0, 3, 2]
+# Order in which State checks the captures around a moved pawn
+cdef int[4] CAPTURE_CHECK_ORDER = [1, 0, 2, 3]
+
+cdef bitboard_t FULL_MASK
+cdef bitboard_t ESCAPE_MASK
+cdef bitboard_t CASTLE_MASK
+cdef bitboard_t NEAR_CASTLE_MASK
+cdef bitboard_t CAMPS_MASK
+cdef bitboard_t WALLS_MASK
+cdef bitboard_t[4] CAMP_MASKS
+cdef char[N_CELLS] CAMP_OF
+cdef bitboard_t[N_ROWS] ROW_MASKS
+cdef bitboard_t[N_COLS] COL_MASKS
+# Cells reachable from a cell towards a direction on an empty board (the cell itself excluded)
+cdef bitboard_t[4][N_CELLS] RAYS
+# The two cells that can capture a pawn along an axis (0 if the pawn is on the border of that axis)
+cdef bitboard_t[N_CELLS] VERTICAL_PARTNERS
+cdef bitboard_t[N_CELLS] HORIZONTAL_PARTNERS
+# The orthogonally adjacent cells of a cell
+cdef bitboard_t[N_CELLS] ADJACENT_MASKS
+cdef list[Coord] COORDS = [ (idx // N_COLS, idx % N_COLS) for idx in range(N_CELLS) ]
+
+
+cdef inline bint isInside(int i, int j):
+    return (0 <= i < N_ROWS) and (0 <= j < N_COLS)
+
+
+cdef void __initTables():
+    global FULL_MASK, ESCAPE_MASK, CASTLE_MASK, NEAR_CASTLE_MASK, CAMPS_MASK, WALLS_MASK
+    cdef int i, j, k, d, ti, tj
+    cdef bitboard_t mask
+    cdef Coord pos
+
+    FULL_MASK = 0
+    for k in range(N_CELLS): FULL_MASK |= bbCell(k)
+
+    for i in range(N_ROWS):
+        ROW_MASKS[i] = 0
+        for j in range(N_COLS): ROW_MASKS[i] |= bbCell(i*N_COLS + j)
+    for j in range(N_COLS):
+        COL_MASKS[j] = 0
+        for i in range(N_ROWS): COL_MASKS[j] |= bbCell(i*N_COLS + j)
+
+    ESCAPE_MASK = 0
+    for pos in ESCAPE_TILES: ESCAPE_MASK |= bbCell(pos[0]*N_COLS + pos[1])
+    CASTLE_MASK = bbCell(CASTLE_TILE[0]*N_COLS + CASTLE_TILE[1])
+    NEAR_CASTLE_MASK = 0
+    for pos in NEAR_CASTLE_TILES: NEAR_CASTLE_MASK |= bbCell(pos[0]*N_COLS + pos[1])
+
+    for k in range(4): CAMP_MASKS[k] = 0
+    for k in range(N_CELLS): CAMP_OF[k] = NO_CAMP
+    CAMPS_MASK = 0
+    for pos, k in CAMP_DICT.items():
+        CAMP_OF[pos[0]*N_COLS + pos[1]] = k
+        CAMP_MASKS[k] |= bbCell(pos[0]*N_COLS + pos[1])
+        CAMPS_MASK |= bbCell(pos[0]*N_COLS + pos[1])
+    WALLS_MASK = CAMPS_MASK | CASTLE_MASK
+
+    for i in range(N_ROWS):
+        for j in range(N_COLS):
+            k = i*N_COLS + j
+            ADJACENT_MASKS[k] = 0
+            for d in range(4):
+                mask = 0
+                ti, tj = i + DELTA_I[d], j + DELTA_J[d]
+                if isInside(ti, tj): ADJACENT_MASKS[k] |= bbCell(ti*N_COLS + tj)
+                while isInside(ti, tj):
+                    mask |= bbCell(ti*N_COLS + tj)
+                    ti, tj = ti + DELTA_I[d], tj + DELTA_J[d]
+                RAYS[d][k] = mask
+
+            VERTICAL_PARTNERS[k] = (bbCell(k-N_COLS) | bbCell(k+N_COLS)) if (0 < i < N_ROWS-1) else 0
+            HORIZONTAL_PARTNERS[k] = (bbCell(k-1) | bbCell(k+1)) if (0 < j < N_COLS-1) else 0
+
+__initTables()
+
+
+"""
+    Moves each cell of a mask by one step towards a direction.
+    Cells that go out of the board are dropped.
+"""
+cdef inline bitboard_t shiftMask(bitboard_t mask, int direction):
+    if direction == RIGHT - UP:
+        return (mask << 1) & ~COL_MASKS[0] & FULL_MASK
+    elif direction == LEFT - UP:
+        return (mask >> 1) & ~COL_MASKS[N_COLS-1]
+    elif direction == DOWN - UP:
+        return (mask << N_COLS) & FULL_MASK
+    else:
+        return mask >> N_COLS
+
+
+
+"""
+    State of the game represented with bitboards.
+    Each type of piece is stored as a 81-bit mask (bit i*9+j represents the cell (i, j))
+    and move generation, captures and end of game are computed with mask operations.
+    The byte matrix of `State` is kept in sync so that the heuristics and
+    the rest of the code can use this class as a drop-in replacement.
+"""
+cdef class BitboardState(State):
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.initializedcheck(False)
+    def __init__(self, cnp.ndarray[cnp.npy_byte, ndim=2] board, bint is_white_turn, str rules="ashton"):
+        cdef int i, j
+
+        if rules != "ashton":
+            raise ValueError("Bitboards are only available for the ashton rules")
+        State.__init__(self, board, is_white_turn, rules)
+
+        self.white_mask = 0
+        self.black_mask = 0
+        self.king_mask = 0
+        for i in range(N_ROWS):
+            for j in range(N_COLS):
+                if self.memv_board[i, j] == WHITE: self.white_mask |= bbCell(i*N_COLS + j)
+                elif self.memv_board[i, j] == BLACK: self.black_mask |= bbCell(i*N_COLS + j)
+                elif self.memv_board[i, j] == KING: self.king_mask |= bbCell(i*N_COLS + j)
+
+
+    """
+        Determines the possible allowed moves from the current state of the booard.
+        Moves are grouped in the same way as `State.getMoves`.
+
+        Returns
+        -------
+            critical_moves : list[Move]
+                List of tuples (from, start) of critical moves.
+
+            other_moves : list[Move]
+                List of tuples (from, start) of the remaining moves.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef tuple[list[Move], list[Move]] getMoves(self):
+        cdef int king_idx = bbHighestBit(self.king_mask)
+        cdef int king_i = king_idx // N_COLS, king_j = king_idx % N_COLS
+        cdef bitboard_t occupied = self.white_mask | self.black_mask | self.king_mask
+        cdef bitboard_t same_axis_mask, near_axis_mask, capture_mask, other_mask, pawns, obstacles, moves
+        cdef int idx, d
+
+        cdef list[Move] king_moves = []
+        cdef list[Move] same_king_axis_moves = []
+        cdef list[Move] near_king_moves = []
+        cdef list[Move] capturing_moves = []
+        cdef list[Move] other_moves = []
+
+        same_axis_mask = ROW_MASKS[king_i] | COL_MASKS[king_j]
+        near_axis_mask = 0
+        if king_i > 0: near_axis_mask |= ROW_MASKS[king_i-1]
+        if king_i < N_ROWS-1: near_axis_mask |= ROW_MASKS[king_i+1]
+        if king_j > 0: near_axis_mask |= COL_MASKS[king_j-1]
+        if king_j < N_COLS-1: near_axis_mask |= COL_MASKS[king_j+1]
+        near_axis_mask &= ~same_axis_mask
+        capture_mask = self.__capturingCells() & ~(same_axis_mask | near_axis_mask)
+        other_mask = ~(same_axis_mask | near_axis_mask | capture_mask)
+
+        if self.is_white_turn:
+            # If White turn, check KING moves
+            for d in range(4):
+                self.__appendMoves(king_moves, king_idx, d, self.__movesMask(king_idx, d, occupied | WALLS_MASK))
+            pawns = self.white_mask
+        else:
+            pawns = self.black_mask
+
+        while pawns:
+            idx = bbLowestBit(pawns)
+            pawns ^= bbCell(idx)
+            obstacles = occupied | self.__wallsFor(idx)
+            for d in range(4):
+                moves = self.__movesMask(idx, d, obstacles)
+                if moves == 0: continue
+                self.__appendMoves(same_king_axis_moves, idx, d, moves & same_axis_mask)
+                self.__appendMoves(near_king_moves, idx, d, moves & near_axis_mask)
+                self.__appendMoves(capturing_moves, idx, d, moves & capture_mask)
+                self.__appendMoves(other_moves, idx, d, moves & other_mask)
+
+        return king_moves + same_king_axis_moves + near_king_moves + capturing_moves, other_moves
+
+
+    """
+        Mask of the walls that block a pawn in a given cell.
+        A black pawn inside a camp can move through its own camp.
+    """
+    cdef bitboard_t __wallsFor(self, int idx):
+        if (self.black_mask & bbCell(idx)) and (CAMP_OF[idx] != NO_CAMP):
+            return WALLS_MASK & ~CAMP_MASKS[CAMP_OF[idx]]
+        return WALLS_MASK
+
+
+    """
+        Mask of the cells reachable by sliding from a cell towards a direction
+        until the first obstacle.
+    """
+    cdef bitboard_t __movesMask(self, int idx, int direction, bitboard_t obstacles):
+        cdef bitboard_t ray = RAYS[direction][idx]
+        cdef bitboard_t blockers = ray & obstacles
+        cdef int first_blocker
+
+        if blockers == 0: return ray
+        if direction == DOWN - UP or direction == RIGHT - UP:
+            first_blocker = bbLowestBit(blockers)
+        else:
+            first_blocker = bbHighestBit(blockers)
+        return ray & ~(RAYS[direction][first_blocker] | bbCell(first_blocker))
+
+
+    """
+        Appends the moves in a mask to a list following the order of the steps.
+    """
+    cdef void __appendMoves(self, list[Move] out, int idx, int direction, bitboard_t moves):
+        cdef Coord start = COORDS[idx]
+        cdef int target
+
+        while moves:
+            if direction == DOWN - UP or direction == RIGHT - UP:
+                target = bbLowestBit(moves)
+            else:
+                target = bbHighestBit(moves)
+            moves ^= bbCell(target)
+            out.append((start, COORDS[target]))
+
+
+    """
+        Determines the empty cells where a pawn of the player to move
+        would capture an opponent pawn with a normal (two sided) capture.
+    """
+    cdef bitboard_t __capturingCells(self):
+        cdef bitboard_t[2] victims
+        cdef bitboard_t[2] partners
+        cdef bitboard_t cells = 0
+        cdef int n_groups, g, d
+
+        if self.is_white_turn:
+            victims[0] = self.black_mask & ~CAMPS_MASK
+            partners[0] = self.white_mask | self.king_mask | WALLS_MASK
+            victims[1] = self.black_mask & CAMPS_MASK
+            partners[1] = self.white_mask | self.king_mask
+            n_groups = 2
+        else:
+            victims[0] = self.white_mask | (self.king_mask & ~(CASTLE_MASK | NEAR_CASTLE_MASK))
+            partners[0] = self.black_mask | WALLS_MASK
+            n_groups = 1
+
+        for g in range(n_groups):
+            if victims[g] == 0: continue
+            for d in range(4):
+                # Victims with a partner on the other side, moved to the cell to reach
+                cells |= shiftMask(victims[g] & shiftMask(partners[g], OPPOSITE[d]), OPPOSITE[d])
+        return cells & ~(self.white_mask | self.black_mask | self.king_mask)
+
+
+    """
+        Applies a move in the board.
+        It is assumed that the move is valid.
+
+        Parameters
+        ----------
+            start : tuple[int, int]
+                Coordinates of the starting position.
+
+            end : tuple[int, int]
+                Coordinates of the destination.
+
+        Returns
+        -------
+            captures : list[tuple[tuple[int, int], BLACK|WHITE|KING]]
+                List of the pawns captured with this move.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.initializedcheck(False)
+    cdef list applyMove(self, Coord start, Coord end):
+        cdef list[tuple[Coord, char]] captured = []
+        cdef int start_i = start[0], start_j = start[1], end_i = end[0], end_j = end[1]
+        cdef int i, j, k, d
+        cdef char pawn = self.memv_board[start_i, start_j]
+        cdef char captured_pawn
+
+        self.__togglePawn(pawn, bbCell(start_i*N_COLS + start_j) | bbCell(end_i*N_COLS + end_j))
+
+        # Applies move
+        self.memv_board[end_i, end_j] = pawn
+        self.memv_board[start_i, start_j] = EMPTY
+        self.updateHash(start_i, start_j, pawn)
+        self.updateHash(end_i, end_j, pawn)
+        self.updatePieces(start_i, start_j, pawn)
+        self.updatePieces(end_i, end_j, pawn)
+        if pawn == KING: self.king_idx = end_i*N_COLS + end_j
+
+        # Checks if the adjacent pieces have been captured
+        for k in range(4):
+            d = CAPTURE_CHECK_ORDER[k]
+            i, j = end_i + DELTA_I[d], end_j + DELTA_J[d]
+            if self.isCaptured(i, j, to_filter_axis=(VERTICAL if DELTA_J[d] == 0 else HORIZONTAL)):
+                captured_pawn = self.memv_board[i, j]
+                captured.append( ((i, j), captured_pawn) )
+                self.__togglePawn(captured_pawn, bbCell(i*N_COLS + j))
+                self.updateHash(i, j, captured_pawn)
+                self.updatePieces(i, j, captured_pawn)
+                if captured_pawn == KING: self.king_idx = -1
+                self.memv_board[i, j] = EMPTY
+
+        self.flipTurn()
+
+        return captured
+
+
+    """
+        Reverts a move and restores captured pawns.
+        It is assumed that the parameters are correct.
+
+        Parameters
+        ----------
+            old_start : tuple[int, int]
+                Old starting point of the move to revert.
+
+            old_end : tuple[int, int]
+                Old destination of the move to revert.
+
+            captured : list[tuple[tuple[int, int], BLACK|WHITE|KING]]
+                List of pawns the move to revert captured.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.initializedcheck(False)
+    cdef void revertMove(self, Coord old_start, Coord old_end, list captured):
+        cdef int start_i = old_start[0], start_j = old_start[1], end_i = old_end[0], end_j = old_end[1]
+        cdef char pawn = self.memv_board[end_i, end_j]
+        cdef tuple[Coord, char] el
+        cdef Coord pos
+        cdef char captured_pawn
+
+        self.__togglePawn(pawn, bbCell(start_i*N_COLS + start_j) | bbCell(end_i*N_COLS + end_j))
+
+        # Reverts move
+        self.memv_board[start_i, start_j] = pawn
+        self.memv_board[end_i, end_j] = EMPTY
+        self.updateHash(start_i, start_j, pawn)
+        self.updateHash(end_i, end_j, pawn)
+        self.updatePieces(start_i, start_j, pawn)
+        self.updatePieces(end_i, end_j, pawn)
+        if pawn == KING: self.king_idx = start_i*N_COLS + start_j
+
+        # Reverts captured pawn
+        for el in captured:
+            pos = el[0]
+            captured_pawn = el[1]
+            self.__togglePawn(captured_pawn, bbCell(pos[0]*N_COLS + pos[1]))
+            self.memv_board[pos[0], pos[1]] = captured_pawn
+            self.updateHash(pos[0], pos[1], captured_pawn)
+            self.updatePieces(pos[0], pos[1], captured_pawn)
+            if captured_pawn == KING: self.king_idx = pos[0]*N_COLS + pos[1]
+
+        self.flipTurn()
+
+
+    cdef void __togglePawn(self, char pawn, bitboard_t mask):
+        if pawn == WHITE: self.white_mask ^= mask
+        elif pawn == BLACK: self.black_mask ^= mask
+        elif pawn == KING: self.king_mask ^= mask
+
+
+    """
+        Determines the status of the current board.
+
+        Returns
+        -------
+            game_state : BLACK_WIN | WHITE_WIN | OPEN
+    """
+    cdef char getGameState(self):
+        if self.king_mask == 0:
+            return BLACK_WIN
+        elif self.king_mask & ESCAPE_MASK:
+            return WHITE_WIN
+        return OPEN
+
+
+    cdef bint isWall(self, pos_t i, pos_t j):
+        return (WALLS_MASK & bbCell(i*N_COLS + j)) != 0
+
+
+    """
+        Checks if there is a capture in a given position (i, j).
+        Same rules of `State.isCaptured`, computed on the masks.
+    """
+    cdef bint isCaptured(self, pos_t i, pos_t j, char to_filter_axis=VERT_HORIZ):
+        cdef int idx
+        cdef bitboard_t pawn_mask, hostile, partners
+
+        if not self.isValidCell(i, j): return False
+
+        idx = i*N_COLS + j
+        pawn_mask = bbCell(idx)
+
+        if self.king_mask & pawn_mask:
+            # King captured in castle
+            if pawn_mask & CASTLE_MASK:
+                return (ADJACENT_MASKS[idx] & self.black_mask) == ADJACENT_MASKS[idx]
+            # King captured near castle
+            if pawn_mask & NEAR_CASTLE_MASK:
+                return bbPopCount(ADJACENT_MASKS[idx] & self.black_mask) == 3
+            hostile = self.black_mask | WALLS_MASK
+        elif self.white_mask & pawn_mask:
+            hostile = self.black_mask | WALLS_MASK
+        elif self.black_mask & pawn_mask:
+            hostile = self.white_mask | self.king_mask
+            if not (pawn_mask & CAMPS_MASK): hostile |= WALLS_MASK
+        else:
+            return False
+
+        # Normal capture
+        if (to_filter_axis == VERT_HORIZ) or (to_filter_axis == VERTICAL):
+            partners = VERTICAL_PARTNERS[idx]
+            if partners != 0 and (hostile & partners) == partners: return True
+        if (to_filter_axis == VERT_HORIZ) or (to_filter_axis == HORIZONTAL):
+            partners = HORIZONTAL_PARTNERS[idx]
+            if partners != 0 and (hostile & partners) == partners: return True
+        return False
+
+
+    """
+        Determines the number of steps a pawn can do towards a direction.
+
+        Parameters
+        ----------
+            i, j
+                Row and column of the pawn.
+
+            direction : RIGHT | UP | LEFT | DOWN
+                Direction to check.
+
+        Returns
+        -------
+            num_steps
+                Number of steps the pawn can make.
+    """
+    cdef int numSteps(self, pos_t i, pos_t j, char direction):
+        cdef int idx = i*N_COLS + j
+        cdef bitboard_t occupied = self.white_mask | self.black_mask | self.king_mask
+        return bbPopCount(self.__movesMask(idx, direction - UP, occupied | self.__wallsFor(idx)))
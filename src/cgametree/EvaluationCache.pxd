@@ -0,0 +1,21 @@
+from .State cimport State
+from .utils cimport *
+
+
+cdef enum:
+    EMPTY_PHASE = -1
+
+
+cdef packed struct EvaluationEntry:
+    hash_t key
+    score_t value
+    char phase
+
+
+cdef class EvaluationCache:
+    cdef EvaluationEntry* table
+    cdef size_t n_slots
+    cdef hash_t slot_mask
+
+    cdef void setScore(self, State state, char phase, score_t value)
+    cdef bint getScore(self, State state, char phase, score_t* value)
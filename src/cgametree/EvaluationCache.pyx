@@ -0,0 +1,83 @@
+from .State cimport State
+from .utils cimport *
+from libc.stdlib cimport malloc, free
+cimport cython
+
+
+"""
+    Direct-mapped cache of the static evaluations of the states, preallocated in a single array.
+    A state is mapped to a slot with the low bits of its normalized hash (the heuristics do not change with the symmetries of the board)
+    and a new score always replaces the one in its slot.
+    Scores are stored with the phase of the weights they have been computed with, so that
+    the entries of the previous phases are not reused when the weights change.
+    Unlike the transposition table, the scores do not depend on the depth of the search.
+"""
+cdef class EvaluationCache:
+    """
+        Parameters
+        ----------
+            size_mb : float
+                Maximum memory (in MB) the cache can use.
+    """
+    def __init__(self, double size_mb):
+        cdef size_t i
+
+        self.n_slots = 1
+        while (2*self.n_slots * sizeof(EvaluationEntry)) <= (size_mb * 2**20):
+            self.n_slots *= 2
+        self.slot_mask = self.n_slots - 1
+
+        self.table = <EvaluationEntry*> malloc(self.n_slots * sizeof(EvaluationEntry))
+        if self.table == NULL:
+            raise MemoryError()
+        for i in range(self.n_slots):
+            self.table[i].key = 0
+            self.table[i].value = 0
+            self.table[i].phase = EMPTY_PHASE
+
+
+    def __dealloc__(self):
+        free(self.table)
+
+
+    """
+        Stores the static evaluation of a state.
+        It does not allocate memory.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void setScore(self, State state, char phase, score_t value):
+        cdef hash_t key = state.hash(normalize=True)
+        cdef EvaluationEntry* entry = &self.table[key & self.slot_mask]
+        entry.key = key
+        entry.value = value
+        entry.phase = phase
+
+
+    """
+        Reads the static evaluation of a state.
+
+        Parameters
+        ----------
+            state : State
+
+            phase : char
+                Phase of the weights in use.
+
+            value : score_t*
+                Where the score is written, if cached.
+
+        Returns
+        -------
+            hit : bint
+                True if the score of the state is cached.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef bint getScore(self, State state, char phase, score_t* value):
+        cdef hash_t key = state.hash(normalize=True)
+        cdef EvaluationEntry* entry = &self.table[key & self.slot_mask]
+        if (entry.phase == phase) and (entry.key == key):
+            value[0] = entry.value
+            return True
+        return False
@@ -0,0 +1,31 @@
+from .State cimport State
+from .MoveOrdering cimport MoveOrdering, HISTORY_SIZE
+from .TranspositionTable cimport NO_MOVE
+from .utils cimport *
+
+# Stages of the generation
+cdef enum:
+    STAGE_TT = 0
+    STAGE_CRITICAL = 1
+    STAGE_KILLERS = 2
+    STAGE_QUIET = 3
+    STAGE_DONE = 4
+
+
+cdef class MoveGenerator:
+    cdef MoveOrdering ordering
+    cdef State state
+    cdef int stage
+    cdef short tt_move
+    cdef int ply
+    cdef short prev_move
+    cdef short[MAX_MOVES] moves
+    cdef int n_moves
+    cdef int next_index
+    # A move has already been generated if its stamp is the current one
+    cdef unsigned int[HISTORY_SIZE] generated
+    cdef unsigned int stamp
+
+    cdef void reset(self, State state, short tt_move=*, int ply=*, short prev_move=*)
+    cdef void skip(self, short move)
+    cdef short next(self)
@@ -0,0 +1,110 @@
+cimport cython
+
+
+"""
+    Staged generator of the moves of a position.
+    Moves are produced one at a time in the order:
+        1. Best move of the transposition table.
+        2. Moves of the king and moves that capture.
+        3. Killer moves and countermove.
+        4. Remaining moves sorted by the history heuristic.
+    Each stage is computed only when the previous ones are exhausted,
+    so positions that cut off early do not pay for the full generation.
+"""
+cdef class MoveGenerator:
+    """
+        Parameters
+        ----------
+            ordering : MoveOrdering
+                Source of the killer moves and of the history scores.
+    """
+    def __init__(self, MoveOrdering ordering):
+        cdef int i
+
+        self.ordering = ordering
+        self.state = None
+        self.stage = STAGE_DONE
+        self.n_moves = 0
+        self.next_index = 0
+        self.stamp = 1
+        for i in range(HISTORY_SIZE):
+            self.generated[i] = 0
+
+
+    """
+        Starts the generation of the moves of a position.
+        The state must not change while the generator is used.
+        `prev_move` is the move of the opponent that lead to the position (NO_MOVE if unknown).
+    """
+    cdef void reset(self, State state, short tt_move=NO_MOVE, int ply=0, short prev_move=NO_MOVE):
+        cdef int i
+
+        self.state = state
+        self.stage = STAGE_TT
+        self.tt_move = tt_move
+        self.ply = ply
+        self.prev_move = prev_move
+        self.n_moves = 0
+        self.next_index = 0
+
+        self.stamp += 1
+        if self.stamp == 0:
+            # Stamps wrapped around, old marks have to be cleared
+            for i in range(HISTORY_SIZE):
+                self.generated[i] = 0
+            self.stamp = 1
+
+
+    """
+        Marks a move as already generated (e.g. because already known by the caller), so that it is skipped.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void skip(self, short move):
+        self.generated[move] = self.stamp
+
+
+    """
+        Returns the next move packed with `packMove` (NO_MOVE when all the moves have been generated).
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef short next(self):
+        cdef short move
+        cdef short[4] killers
+        cdef int n_killers, k
+
+        while True:
+            # Moves already computed by the current stage
+            while self.next_index < self.n_moves:
+                move = self.moves[self.next_index]
+                self.next_index += 1
+                if self.generated[move] != self.stamp:
+                    self.generated[move] = self.stamp
+                    return move
+
+            if self.stage == STAGE_TT:
+                self.stage = STAGE_CRITICAL
+                self.n_moves = 0
+                if self.tt_move != NO_MOVE and self.state.isLegalMove(self.tt_move):
+                    self.moves[0] = self.tt_move
+                    self.n_moves = 1
+            elif self.stage == STAGE_CRITICAL:
+                self.stage = STAGE_KILLERS
+                self.n_moves = self.state.getKingMoves(self.moves)
+                self.n_moves += self.state.getCapturingMoves(&self.moves[self.n_moves])
+            elif self.stage == STAGE_KILLERS:
+                self.stage = STAGE_QUIET
+                self.n_moves = 0
+                n_killers = self.ordering.getKillers(self.ply, self.state.is_white_turn, self.prev_move, killers)
+                for k in range(n_killers):
+                    if self.generated[killers[k]] != self.stamp and self.state.isLegalMove(killers[k]):
+                        self.moves[self.n_moves] = killers[k]
+                        self.n_moves += 1
+            elif self.stage == STAGE_QUIET:
+                self.stage = STAGE_DONE
+                self.n_moves = self.state.getPawnsMoves(self.moves)
+                self.ordering.sortMoves(self.moves, 0, self.n_moves, self.ply, self.state.is_white_turn, self.prev_move)
+            else:
+                return NO_MOVE
+            self.next_index = 0
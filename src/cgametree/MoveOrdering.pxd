@@ -0,0 +1,21 @@
+from .utils cimport *
+from .TranspositionTable cimport NO_MOVE
+
+cdef enum:
+    KILLERS_PER_PLY = 2
+    HISTORY_SIZE = 81*81 # Indexed by packed move (from/to)
+    HISTORY_MAX = 1 << 20 # When reached, the history table is halved
+    KILLER_SCORE = 1 << 22
+    COUNTERMOVE_SCORE = 1 << 21
+
+
+cdef class MoveOrdering:
+    cdef int max_ply
+    cdef short* killers
+    cdef int[2][HISTORY_SIZE] history
+    cdef short[2][HISTORY_SIZE] countermoves
+
+    cdef void decay(self)
+    cdef void recordCutoff(self, short move, int ply, int depth, bint is_white_turn, short prev_move=*)
+    cdef int getKillers(self, int ply, bint is_white_turn, short prev_move, short* out)
+    cdef void sortMoves(self, short* moves, int start, int end, int ply, bint is_white_turn, short prev_move=*)
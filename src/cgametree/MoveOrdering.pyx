@@ -0,0 +1,130 @@
+from libc.stdlib cimport malloc, free
+cimport cython
+
+
+"""
+    Dynamic ordering of the quiet moves of the search.
+    Moves that caused a beta cutoff are remembered as killer moves of their ply,
+    rewarded in a from/to history table and as reply (countermove) to the previous move.
+    Tables are kept separately for each side.
+"""
+cdef class MoveOrdering:
+    """
+        Parameters
+        ----------
+            max_ply : int
+                Maximum distance from the root the killer moves are stored for.
+    """
+    def __init__(self, int max_ply):
+        cdef int i, side
+
+        self.max_ply = max_ply
+        self.killers = <short*> malloc(max_ply * KILLERS_PER_PLY * sizeof(short))
+        if self.killers == NULL:
+            raise MemoryError()
+        for i in range(max_ply * KILLERS_PER_PLY):
+            self.killers[i] = NO_MOVE
+        for side in range(2):
+            for i in range(HISTORY_SIZE):
+                self.history[side][i] = 0
+                self.countermoves[side][i] = NO_MOVE
+
+
+    def __dealloc__(self):
+        free(self.killers)
+
+
+    """
+        Prepares the tables for the search of a new turn.
+        Killer moves are tied to the distance from the root so they are cleared,
+        the history is aged so that recent cutoffs weight more.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void decay(self):
+        cdef int i, side
+
+        for i in range(self.max_ply * KILLERS_PER_PLY):
+            self.killers[i] = NO_MOVE
+        for side in range(2):
+            for i in range(HISTORY_SIZE):
+                self.history[side][i] >>= 1
+
+
+    """
+        Rewards a quiet move that caused a beta cutoff.
+        `prev_move` is the move of the opponent that lead to the position (NO_MOVE if unknown).
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void recordCutoff(self, short move, int ply, int depth, bint is_white_turn, short prev_move=NO_MOVE):
+        cdef int side = 0 if is_white_turn else 1
+        cdef short* killers
+        cdef int k, m
+
+        if ply < self.max_ply and self.killers[ply*KILLERS_PER_PLY] != move:
+            killers = &self.killers[ply*KILLERS_PER_PLY]
+            for k in range(KILLERS_PER_PLY-1, 0, -1):
+                killers[k] = killers[k-1]
+            killers[0] = move
+
+        self.history[side][move] += depth*depth
+        if self.history[side][move] >= HISTORY_MAX:
+            for m in range(HISTORY_SIZE):
+                self.history[side][m] >>= 1
+
+        if prev_move != NO_MOVE:
+            self.countermoves[side][prev_move] = move
+
+
+    """
+        Writes the killer moves of a ply followed by the countermove of the previous move in a buffer.
+        Moves may repeat and are not guaranteed to be legal in the current position.
+    """
+    cdef int getKillers(self, int ply, bint is_white_turn, short prev_move, short* out):
+        cdef int n = 0, k
+
+        if ply < self.max_ply:
+            for k in range(KILLERS_PER_PLY):
+                if self.killers[ply*KILLERS_PER_PLY + k] != NO_MOVE:
+                    out[n] = self.killers[ply*KILLERS_PER_PLY + k]
+                    n += 1
+        if prev_move != NO_MOVE and self.countermoves[0 if is_white_turn else 1][prev_move] != NO_MOVE:
+            out[n] = self.countermoves[0 if is_white_turn else 1][prev_move]
+            n += 1
+        return n
+
+
+    """
+        Sorts (in place) the packed moves in [start, end) from the most to the least promising.
+        Killer moves come first, then the countermove and then the others by history score.
+        The relative order of moves with the same score is kept.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void sortMoves(self, short* moves, int start, int end, int ply, bint is_white_turn, short prev_move=NO_MOVE):
+        cdef int side = 0 if is_white_turn else 1
+        cdef short countermove = self.countermoves[side][prev_move] if prev_move != NO_MOVE else NO_MOVE
+        cdef int[MAX_MOVES] scores
+        cdef int i, j, k, score
+        cdef short move
+
+        if end - start > MAX_MOVES: end = start + MAX_MOVES
+
+        for i in range(start, end):
+            move = moves[i]
+            score = self.history[side][move]
+            if move == countermove: 
+                score = COUNTERMOVE_SCORE
+            if ply < self.max_ply:
+                for k in range(KILLERS_PER_PLY-1, -1, -1):
+                    if move == self.killers[ply*KILLERS_PER_PLY + k]: score = KILLER_SCORE - k
+
+            # Insertion sort
+            j = i
+            while j > start and scores[j-1-start] < score:
+                moves[j] = moves[j-1]
+                scores[j-start] = scores[j-1-start]
+                j -= 1
+            moves[j] = move
+            scores[j-start] = score
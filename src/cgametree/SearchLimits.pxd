@@ -0,0 +1,23 @@
+from .utils cimport *
+
+cdef enum:
+    NO_LIMIT = 0
+    MIN_POLL_INTERVAL = 16
+    MAX_POLL_INTERVAL = 1 << 16
+
+
+cdef class SearchLimits:
+    cdef readonly double deadline
+    cdef readonly long long max_nodes
+    cdef readonly int max_depth
+    cdef object is_interrupted
+    cdef readonly long long nodes
+    cdef readonly bint stopped
+    cdef long long next_poll
+    cdef long long last_poll_nodes
+    cdef double last_poll_time
+
+    cdef bint tick(self)
+    cdef void __poll(self)
+    cdef long long __nextPoll(self)
+    cdef int depthLimit(self, int max_ply)
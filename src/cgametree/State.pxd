@@ -23,6 +23,33 @@ cdef char VERTICAL
 cdef char HORIZONTAL
 cdef char VERT_HORIZ
 
+cdef enum:
+    N_SYMMETRIES = 8
+
+cdef int symmetricCell(int idx, int symmetry, bint inverse=*)
+
+cdef enum:
+    BOARD_ROWS = 9
+    BOARD_COLS = 9
+    BOARD_CELLS = 81
+
+# Indexes of the heuristic features (see `State.getFeatures`)
+cdef enum:
+    PAWNS_WHITE = 0
+    PAWNS_BLACK = 1
+    PROXIMITY_WHITE = 2
+    PROXIMITY_BLACK = 3
+    SAFENESS_WHITE = 4
+    SAFENESS_BLACK = 5
+    ESCAPE_PROXIMITY = 6
+    KING_DANGER = 7
+    N_FEATURES = 8
+
+cdef list[Coord] ESCAPE_TILES
+cdef char NO_CAMP
+cdef Coord CASTLE_TILE
+cdef list[Coord] NEAR_CASTLE_TILES
+
 
 cdef class State:
     cdef cnp.ndarray board
@@ -34,11 +61,22 @@ cdef class State:
     cdef unsigned short N_BLACKS 
     cdef int MAX_DIST_TO_KING
     cdef int MAX_DIST_TO_ESCAPE
+    cdef hash_t[N_SYMMETRIES] sym_hashes
+    cdef int king_idx
+    # Indexes of the cells occupied by a pawn or the king (in any order) and position of each cell in this list
+    cdef int[BOARD_CELLS] pieces
+    cdef int[BOARD_CELLS] piece_slot
+    cdef int n_pieces
+    cdef int n_whites
+    cdef int n_blacks
 
-    cdef int hash(self, bint normalize=*)
+    cdef hash_t hash(self, bint normalize=*)
+    cdef int getNormalizingSymmetry(self)
+    cdef void updateHash(self, pos_t i, pos_t j, char pawn)
+    cdef void updatePieces(self, pos_t i, pos_t j, char pawn)
+    cdef void flipTurn(self)
     cdef cnp.ndarray getNormalizedBoard(self)
 
-    cdef Coord __findKing(self)
     cdef char getGameState(self)
     cdef bint isValidCell(self, pos_t i, pos_t j)
     cdef bint isWall(self, pos_t i, pos_t j)
@@ -47,18 +85,27 @@ cdef class State:
 
     cdef tuple[list[Move], list[Move]] getMoves(self)
     cdef list[Move] __getPawnMoves(self, pos_t i, pos_t j)
+    cdef int __packPawnMoves(self, int idx, short* out)
+    cdef int getKingMoves(self, short* out)
+    cdef int getCapturingMoves(self, short* out)
+    cdef int getPawnsMoves(self, short* out)
+    cdef bint isQuietMove(self, short move)
+    cdef int __packMovesTo(self, int* targets, int n_targets, short* out)
+    cdef int getKingEscapeCells(self, int* out)
+    cdef bint canKingEscape(self)
+    cdef int getQuiescenceMoves(self, short* out, bint king_threats=*)
+    cdef bint __capturesKing(self, short move)
+    cdef bint isLegalMove(self, short move)
     cdef int numSteps(self, pos_t i, pos_t j, char direction)
 
     cdef bint isCaptured(self, pos_t i, pos_t j, char to_filter_axis=*)
     cdef bint isCapturingElementFor(self, pos_t pawn_i, pos_t pawn_j, pos_t check_i, pos_t check_j)
 
-    cdef list[tuple[Coord, char]] applyMove(self, Coord start, Coord end)
-    cdef void revertMove(self, Coord old_start, Coord old_end, list[tuple[Coord, char]] captured)
+    cdef list applyMove(self, Coord start, Coord end)
+    cdef void __capture(self, pos_t i, pos_t j, list captured)
+    cdef void revertMove(self, Coord old_start, Coord old_end, list captured)
+    cdef tuple findMove(self, State next_state)
 
     cdef score_t evaluate(self, char player_color, int max_depth, float[:] positive_weights, float[:] negative_weights)
     cdef score_t heuristics(self, char player_color, float[:] positive_weights, float[:] negative_weights)
-    cdef score_t __pawnRatio(self, char color)
-    cdef score_t __avgProximityToKingRatio(self, char color)
-    cdef score_t __safenessRatio(self, char color)
-    cdef score_t __minDistanceToEscapeRatio(self)
-    cdef score_t __kingDangerRatio(self)
+    cdef void getFeatures(self, score_t* features)
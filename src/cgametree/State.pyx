@@ -64,25 +64,167 @@ cdef char NO_CAMP = -1
 cdef Coord CASTLE_TILE = (4, 4)
 cdef list[Coord] NEAR_CASTLE_TILES = [(3, 4), (5, 4), (4, 3), (4, 5)]
 
-cdef int[:, :, :] zobrist_table = np.random.randint(low=0, high=RAND_MAX, size=(9, 9, 3), dtype=np.int32)
-cdef int zobrist_black = rand()
+"""
+    Lookup tables of the board, built once at import.
+    Each table is indexed by the index of a cell (i*9 + j).
+"""
+cdef enum:
+    MAX_RAY_LENGTH = 8
+    N_ESCAPE_TILES = 16
+
+cdef int CASTLE_INDEX = CASTLE_TILE[0]*BOARD_COLS + CASTLE_TILE[1]
+cdef bint[BOARD_CELLS] IS_ESCAPE
+cdef int[N_ESCAPE_TILES] ESCAPE_INDEXES
+cdef bint[BOARD_CELLS] IS_WALL
+cdef bint[BOARD_CELLS] IS_NEAR_CASTLE
+cdef char[BOARD_CELLS] CAMP_OF
+# MOVE_RAYS[d][idx] contains the indexes of the cells crossed moving from a cell towards DIRECTIONS[d], ordered by distance
+cdef int[4][BOARD_CELLS][MAX_RAY_LENGTH] MOVE_RAYS
+cdef int[4][BOARD_CELLS] RAY_LENGTH
+# NEIGHBOURS[idx] contains the indexes of the orthogonally adjacent cells
+cdef int[BOARD_CELLS][4] NEIGHBOURS
+cdef int[BOARD_CELLS] N_NEIGHBOURS
+# CAPTURE_PARTNERS[idx][k] contains the pair of cells that can capture a pawn in a cell along the axis PARTNERS_AXIS[idx][k]
+cdef int[BOARD_CELLS][2][2] CAPTURE_PARTNERS
+cdef char[BOARD_CELLS][2] PARTNERS_AXIS
+cdef int[BOARD_CELLS] N_PARTNERS
+# Order in which the moves of a pawn are generated (RIGHT, UP, LEFT, DOWN) and opposite of each direction, as offsets from UP
+# Features weighted for each player, in the order of the weights
+cdef int[4] WHITE_FEATURES = [PAWNS_WHITE, PROXIMITY_WHITE, SAFENESS_WHITE, ESCAPE_PROXIMITY]
+cdef int[4] BLACK_FEATURES = [PAWNS_BLACK, PROXIMITY_BLACK, SAFENESS_BLACK, KING_DANGER]
+
+cdef int[4] MOVE_ORDER = [2, 0, 3, 1]
+cdef int[4] OPPOSITE_DIRECTION = [1, 0, 3, 2]
+
+
+cdef bint isInBoard(int i, int j):
+    return (0 <= i < BOARD_ROWS) and (0 <= j < BOARD_COLS)
+
+
+cdef void __initBoardTables():
+    cdef int[4] delta_i = [-1, 1, 0, 0] # UP, DOWN, RIGHT, LEFT
+    cdef int[4] delta_j = [0, 0, 1, -1]
+    cdef int idx, i, j, d, ti, tj, n
+
+    for idx in range(BOARD_CELLS):
+        i, j = idx // BOARD_COLS, idx % BOARD_COLS
+        IS_ESCAPE[idx] = (i, j) in ESCAPE_TILES
+        IS_WALL[idx] = ((i, j) in CAMP_DICT) or (idx == CASTLE_INDEX)
+        IS_NEAR_CASTLE[idx] = (i, j) in NEAR_CASTLE_TILES
+        CAMP_OF[idx] = CAMP_DICT.get((i, j), NO_CAMP)
+
+        N_NEIGHBOURS[idx] = 0
+        for d in range(4):
+            n = 0
+            ti, tj = i + delta_i[d], j + delta_j[d]
+            if isInBoard(ti, tj):
+                NEIGHBOURS[idx][N_NEIGHBOURS[idx]] = ti*BOARD_COLS + tj
+                N_NEIGHBOURS[idx] += 1
+            while isInBoard(ti, tj):
+                MOVE_RAYS[d][idx][n] = ti*BOARD_COLS + tj
+                n += 1
+                ti, tj = ti + delta_i[d], tj + delta_j[d]
+            RAY_LENGTH[d][idx] = n
+
+        N_PARTNERS[idx] = 0
+        if isInBoard(i+1, j) and isInBoard(i-1, j):
+            CAPTURE_PARTNERS[idx][N_PARTNERS[idx]] = [(i+1)*BOARD_COLS + j, (i-1)*BOARD_COLS + j]
+            PARTNERS_AXIS[idx][N_PARTNERS[idx]] = VERTICAL
+            N_PARTNERS[idx] += 1
+        if isInBoard(i, j+1) and isInBoard(i, j-1):
+            CAPTURE_PARTNERS[idx][N_PARTNERS[idx]] = [i*BOARD_COLS + j+1, i*BOARD_COLS + j-1]
+            PARTNERS_AXIS[idx][N_PARTNERS[idx]] = HORIZONTAL
+            N_PARTNERS[idx] += 1
+
+    for idx in range(N_ESCAPE_TILES):
+        ESCAPE_INDEXES[idx] = ESCAPE_TILES[idx][0]*BOARD_COLS + ESCAPE_TILES[idx][1]
+
+__initBoardTables()
+
+
+cdef hash_t[:, :, :] zobrist_table = np.random.randint(low=0, high=np.iinfo(np.uint64).max, size=(9, 9, 3), dtype=np.uint64)
+cdef hash_t zobrist_black = np.random.randint(low=0, high=np.iinfo(np.uint64).max, dtype=np.uint64)
+
+
+# Rotations and flips of the board (the first one is the identity)
+SYMMETRIES = [
+    lambda board: board,
+    lambda board: np.rot90(board, k=1),
+    lambda board: np.flip(board, axis=1),
+    lambda board: np.rot90(board, k=2),
+    lambda board: np.rot90(np.flip(board, axis=0), k=1),
+    lambda board: np.rot90(board, k=3),
+    lambda board: np.flip(board, axis=0),
+    lambda board: np.rot90(np.flip(board, axis=1), k=1),
+]
+
+# ZOBRIST_KEYS[pawn][i*9 + j][k] is the key of a pawn in (i, j) after applying the k-th symmetry
+cdef hash_t[4][81][N_SYMMETRIES] ZOBRIST_KEYS
+# Symmetry that moves in the first upper-quadrant a king in a given position
+cdef char[81] NORMALIZING_SYMMETRY
+# SYMMETRIC_CELLS[k][i*9 + j] is the index of the cell (i, j) after applying the k-th symmetry
+# and INVERSE_SYMMETRIC_CELLS[k] maps it back
+cdef unsigned char[N_SYMMETRIES][81] SYMMETRIC_CELLS
+cdef unsigned char[N_SYMMETRIES][81] INVERSE_SYMMETRIC_CELLS
+
+
+"""
+    Determines the symmetry that moves the king in the first upper-quadrant.
+"""
+cdef char normalizingSymmetry(int king_i, int king_j, int n_rows, int n_cols):
+    if (king_i <= floor(n_rows/2)) and (king_j >= ceil(n_cols/2)):
+        if king_i + king_j >= n_cols-1:
+            return 1
+        else:
+            return 2
+    elif (king_i >= ceil(n_rows/2)) and (king_j >= floor(n_cols/2)):
+        if king_i >= king_j:
+            return 3
+        else:
+            return 4
+    elif (king_i >= floor(n_rows/2)) and (king_j <= (floor(n_cols/2)-1)):
+        if king_i + king_j <= n_cols-1:
+            return 5
+        else:
+            return 6
+    elif (king_i <= (floor(n_rows/2)-1)) and (king_j <= (floor(n_cols/2)-2)):
+        if king_i > king_j:
+            return 7
+        else:
+            return 0
+    else:
+        return 0
 
 
-@cython.boundscheck(False)
-@cython.wraparound(False)
-@cython.initializedcheck(False)
-cdef int zobristHash(cnp.ndarray[cnp.npy_byte, ndim=2] board, int n_rows, int n_cols, bint is_white_turn):
-    cdef int state_hash = 0
-    cdef int i, j
+cdef void __initZobristKeys():
+    cdef int i, j, k, idx, transformed_idx
+    cdef cnp.ndarray cells = np.arange(81).reshape(9, 9)
+    cdef cnp.ndarray transformed
 
-    if not is_white_turn: state_hash ^= zobrist_black
-    for i in range(n_rows):
-        for j in range(n_cols):
-            if board[i, j] == KING: state_hash ^= zobrist_table[i, j, 0]
-            elif board[i, j] == WHITE: state_hash ^= zobrist_table[i, j, 1]
-            elif board[i, j] == BLACK: state_hash ^= zobrist_table[i, j, 2]
+    for idx in range(81):
+        for k in range(N_SYMMETRIES):
+            ZOBRIST_KEYS[EMPTY][idx][k] = 0
+        NORMALIZING_SYMMETRY[idx] = normalizingSymmetry(idx // 9, idx % 9, 9, 9)
 
-    return state_hash
+    for k in range(N_SYMMETRIES):
+        transformed = SYMMETRIES[k](cells)
+        for i in range(9):
+            for j in range(9):
+                idx = transformed[i, j]
+                SYMMETRIC_CELLS[k][idx] = i*9 + j
+                INVERSE_SYMMETRIC_CELLS[k][i*9 + j] = idx
+                ZOBRIST_KEYS[KING][idx][k] = zobrist_table[i, j, 0]
+                ZOBRIST_KEYS[WHITE][idx][k] = zobrist_table[i, j, 1]
+                ZOBRIST_KEYS[BLACK][idx][k] = zobrist_table[i, j, 2]
+
+__initZobristKeys()
+
+
+"""
+    Returns the index of a cell after applying a symmetry of `SYMMETRIES` (or its inverse).
+"""
+cdef int symmetricCell(int idx, int symmetry, bint inverse=False):
+    return INVERSE_SYMMETRIC_CELLS[symmetry][idx] if inverse else SYMMETRIC_CELLS[symmetry][idx]
 
 
 
@@ -109,13 +251,30 @@ cdef class State:
         else:
             raise ValueError("Unknown rules")
 
+        cdef int i, j, k
+        for k in range(N_SYMMETRIES):
+            self.sym_hashes[k] = zobrist_black if not is_white_turn else 0
+        self.king_idx = -1
+        self.n_pieces = 0
+        self.n_whites = 0
+        self.n_blacks = 0
+        for i in range(self.N_ROWS):
+            for j in range(self.N_COLS):
+                self.piece_slot[i*self.N_COLS + j] = -1
+        for i in range(self.N_ROWS):
+            for j in range(self.N_COLS):
+                if self.memv_board[i, j] == KING: self.king_idx = i*self.N_COLS + j
+                self.updateHash(i, j, self.memv_board[i, j])
+                if self.memv_board[i, j] != EMPTY: self.updatePieces(i, j, self.memv_board[i, j])
+
 
     def __str__(self):
         return f"WhiteTurn = {self.is_white_turn}\n {str(self.board)}"
 
 
     """
-        Computes the Zobrist hash of the current state.
+        Returns the Zobrist hash of the current state.
+        Hashes are kept updated by `applyMove` and `revertMove`.
         Parameters
         ----------
             normalize : bool
@@ -125,11 +284,63 @@ cdef class State:
         -------
             hash : int
     """
-    cdef int hash(self, bint normalize=False):
-        if normalize:
-            return zobristHash(self.getNormalizedBoard(), self.N_ROWS, self.N_COLS, self.is_white_turn)
+    cdef hash_t hash(self, bint normalize=False):
+        return self.sym_hashes[self.getNormalizingSymmetry() if normalize else 0]
+
+
+    """
+        Returns the index in `SYMMETRIES` of the symmetry used to normalize the board
+        (the identity if there is no king).
+    """
+    cdef int getNormalizingSymmetry(self):
+        if self.king_idx < 0: return 0
+        return NORMALIZING_SYMMETRY[self.king_idx]
+
+
+    """
+        Adds or removes a pawn in a given position from the hashes of the state.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void updateHash(self, pos_t i, pos_t j, char pawn):
+        cdef int k
+        cdef int idx = i*self.N_COLS + j
+        for k in range(N_SYMMETRIES):
+            self.sym_hashes[k] ^= ZOBRIST_KEYS[pawn][idx][k]
+
+
+    """
+        Adds or removes a pawn in a given position from the pieces of the state and from the pawns count.
+        As the hashes, pieces are kept updated by `applyMove` and `revertMove`.
+        A removed piece is replaced by the last one of the list.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void updatePieces(self, pos_t i, pos_t j, char pawn):
+        cdef int idx = i*self.N_COLS + j
+        cdef int slot = self.piece_slot[idx]
+        cdef int delta
+
+        if slot < 0:
+            self.pieces[self.n_pieces] = idx
+            self.piece_slot[idx] = self.n_pieces
+            self.n_pieces += 1
+            delta = 1
         else:
-            return zobristHash(self.board, self.N_ROWS, self.N_COLS, self.is_white_turn)
+            self.n_pieces -= 1
+            self.pieces[slot] = self.pieces[self.n_pieces]
+            self.piece_slot[self.pieces[slot]] = slot
+            self.piece_slot[idx] = -1
+            delta = -1
+        if pawn == WHITE: self.n_whites += delta
+        elif pawn == BLACK: self.n_blacks += delta
+
+
+    cdef void flipTurn(self):
+        cdef int k
+        self.is_white_turn = not self.is_white_turn
+        for k in range(N_SYMMETRIES):
+            self.sym_hashes[k] ^= zobrist_black
 
 
     """
@@ -143,42 +354,9 @@ cdef class State:
     @cython.wraparound(False)
     @cython.initializedcheck(False)
     cdef cnp.ndarray getNormalizedBoard(self):
-        cdef Coord pos_king = self.__findKing()
-        if (pos_king[0] == NULL_COORD[0]) and (pos_king[1] == NULL_COORD[1]): return self.board
-
-        if (pos_king[0] <= floor(self.N_ROWS/2)) and (pos_king[1] >= ceil(self.N_COLS/2)):
-            if pos_king[0] + pos_king[1] >= self.N_COLS-1:
-                return np.rot90(self.board, k=1)
-            else:
-                return np.flip(self.board, axis=1)
-        elif (pos_king[0] >= ceil(self.N_ROWS/2)) and (pos_king[1] >= floor(self.N_COLS/2)):
-            if pos_king[0] >= pos_king[1]:
-                return np.rot90(self.board, k=2)
-            else:
-                return np.rot90(np.flip(self.board, axis=0), k=1)
-        elif (pos_king[0] >= floor(self.N_ROWS/2)) and (pos_king[1] <= (floor(self.N_COLS/2)-1)):
-            if pos_king[0] + pos_king[1] <= self.N_COLS-1:
-                return np.rot90(self.board, k=3)
-            else:
-                return np.flip(self.board, axis=0)
-        elif (pos_king[0] <= (floor(self.N_ROWS/2)-1)) and (pos_king[1] <= (floor(self.N_COLS/2)-2)):
-            if pos_king[0] > pos_king[1]:
-                return np.rot90(np.flip(self.board, axis=1), k=1)
-            else:
-                return self.board
-        else:
-            return self.board
-
+        if self.king_idx < 0: return self.board
 
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
-    @cython.initializedcheck(False)
-    cdef Coord __findKing(self):
-        for i in range(self.N_ROWS):
-            for j in range(self.N_COLS):
-                if self.memv_board[i, j] == KING:
-                    return (i, j)
-        return NULL_COORD
+        return SYMMETRIES[NORMALIZING_SYMMETRY[self.king_idx]](self.board)
     
     """
         Determines the possible allowed moves from the current state of the booard.
@@ -196,7 +374,7 @@ cdef class State:
     @cython.cdivision(True)
     @cython.initializedcheck(False)
     cdef tuple[list[Move], list[Move]] getMoves(self):
-        cdef Coord pos_king = self.__findKing()
+        cdef Coord pos_king = (self.king_idx // self.N_COLS, self.king_idx % self.N_COLS)
         cdef char pawn = WHITE if self.is_white_turn else BLACK
 
         cdef list[Move] king_moves = []
@@ -232,31 +410,304 @@ cdef class State:
         return king_moves + same_king_axis_moves + near_king_moves + capturing_moves, other_moves
 
 
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
     cdef list[Move] __getPawnMoves(self, pos_t i, pos_t j):
         cdef list[Move] out = []
-        cdef char direction
-        cdef int n, step
-        cdef Coord target
-        cdef int k
+        cdef int idx = i*self.N_COLS + j
+        cdef int n, step, target
+        cdef int k, d
 
         for k in range(4):
-            direction = DIRECTIONS[k]
-            n = self.numSteps(i, j, direction)
-            for step in range(1, n+1):
-                if direction == RIGHT:
-                    target = (i, j + step)
-                elif direction == UP:
-                    target = (i - step, j)
-                elif direction == LEFT:
-                    target = (i, j - step)
-                elif direction == DOWN:
-                    target = (i + step, j)
-                
-                if self.isValidCell(target[0], target[1]):
-                    out.append( ((i, j), target) )
+            d = DIRECTIONS[k] - UP
+            n = self.numSteps(i, j, DIRECTIONS[k])
+            for step in range(n):
+                target = MOVE_RAYS[d][idx][step]
+                out.append( ((i, j), (target // BOARD_COLS, target % BOARD_COLS)) )
         
         return out
 
+
+    """
+        Writes the moves of the pawn in a cell (packed as start*81 + end) in a buffer.
+
+        Returns
+        -------
+            n_moves : int
+                Number of moves written.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef int __packPawnMoves(self, int idx, short* out):
+        cdef int n_moves = 0
+        cdef int k, d, n, step
+
+        for k in range(4):
+            d = MOVE_ORDER[k]
+            n = self.numSteps(idx // BOARD_COLS, idx % BOARD_COLS, UP + d)
+            for step in range(n):
+                out[n_moves] = idx*BOARD_CELLS + MOVE_RAYS[d][idx][step]
+                n_moves += 1
+        return n_moves
+
+
+    """
+        Writes the moves of the king (none if it is black's turn) in a buffer.
+    """
+    cdef int getKingMoves(self, short* out):
+        if (not self.is_white_turn) or (self.king_idx < 0): return 0
+        return self.__packPawnMoves(self.king_idx, out)
+
+
+    """
+        Writes the moves of the pawns (king excluded) that capture an opponent's pawn in a buffer.
+        Instead of classifying every move, the cells where a capture would happen are found first
+        and the pawns that can reach them are searched backwards along the rows and columns.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    @cython.initializedcheck(False)
+    cdef int getCapturingMoves(self, short* out):
+        cdef bint[BOARD_CELLS] is_target
+        cdef int[BOARD_CELLS] targets
+        cdef int n_targets = 0, n_free
+        cdef int idx, i, j, k, cell, free_cell = -1, partner1, partner2
+        cdef char victim
+
+        for idx in range(BOARD_CELLS):
+            is_target[idx] = False
+
+        for idx in range(BOARD_CELLS):
+            i, j = idx // BOARD_COLS, idx % BOARD_COLS
+            victim = self.memv_board[i, j]
+            if victim == EMPTY or ((victim == BLACK) != self.is_white_turn): continue
+
+            if victim == KING and (idx == CASTLE_INDEX or IS_NEAR_CASTLE[idx]):
+                # The king in or near the castle has to be surrounded on all the sides
+                n_free = 0
+                for k in range(N_NEIGHBOURS[idx]):
+                    cell = NEIGHBOURS[idx][k]
+                    if cell != CASTLE_INDEX and self.memv_board[cell // BOARD_COLS, cell % BOARD_COLS] != BLACK:
+                        n_free += 1
+                        free_cell = cell
+                if n_free == 1 and self.memv_board[free_cell // BOARD_COLS, free_cell % BOARD_COLS] == EMPTY and not is_target[free_cell]:
+                    is_target[free_cell] = True
+                    targets[n_targets] = free_cell
+                    n_targets += 1
+                continue
+
+            for k in range(N_PARTNERS[idx]):
+                partner1, partner2 = CAPTURE_PARTNERS[idx][k][0], CAPTURE_PARTNERS[idx][k][1]
+                if (not is_target[partner1] and self.memv_board[partner1 // BOARD_COLS, partner1 % BOARD_COLS] == EMPTY and 
+                    self.isCapturingElementFor(i, j, partner2 // BOARD_COLS, partner2 % BOARD_COLS)):
+                    is_target[partner1] = True
+                    targets[n_targets] = partner1
+                    n_targets += 1
+                if (not is_target[partner2] and self.memv_board[partner2 // BOARD_COLS, partner2 % BOARD_COLS] == EMPTY and 
+                    self.isCapturingElementFor(i, j, partner1 // BOARD_COLS, partner1 % BOARD_COLS)):
+                    is_target[partner2] = True
+                    targets[n_targets] = partner2
+                    n_targets += 1
+
+        return self.__packMovesTo(targets, n_targets, out)
+
+
+    """
+        Writes the moves of the pawns (king excluded) of the player to move that end in the given cells in a buffer.
+        The pawns are searched backwards from the cells along the rows and columns.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    @cython.initializedcheck(False)
+    cdef int __packMovesTo(self, int* targets, int n_targets, short* out):
+        cdef char pawn = WHITE if self.is_white_turn else BLACK
+        cdef int n_moves = 0, t, k, d, dist, cell
+
+        for t in range(n_targets):
+            for k in range(4):
+                d = MOVE_ORDER[k]
+                for dist in range(RAY_LENGTH[d][targets[t]]):
+                    cell = MOVE_RAYS[d][targets[t]][dist]
+                    if self.memv_board[cell // BOARD_COLS, cell % BOARD_COLS] == EMPTY: continue
+                    if (self.memv_board[cell // BOARD_COLS, cell % BOARD_COLS] == pawn and 
+                        self.numSteps(cell // BOARD_COLS, cell % BOARD_COLS, UP + OPPOSITE_DIRECTION[d]) > dist):
+                        out[n_moves] = cell*BOARD_CELLS + targets[t]
+                        n_moves += 1
+                    break
+        return n_moves
+
+
+    """
+        Writes in a buffer the cells the king can cross to reach an escape tile with a move.
+        On each free line towards an escape tile, the cells up to the first escape tile are written
+        (a pawn in any of them stops that escape).
+
+        Returns
+        -------
+            n_cells : int
+                Number of cells written.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef int getKingEscapeCells(self, int* out):
+        if self.king_idx < 0: return 0
+        cdef int n_cells = 0, k, d, n, step, last
+
+        for k in range(4):
+            d = MOVE_ORDER[k]
+            n = self.numSteps(self.king_idx // BOARD_COLS, self.king_idx % BOARD_COLS, UP + d)
+            for last in range(n):
+                if IS_ESCAPE[MOVE_RAYS[d][self.king_idx][last]]:
+                    for step in range(last+1):
+                        out[n_cells] = MOVE_RAYS[d][self.king_idx][step]
+                        n_cells += 1
+                    break
+        return n_cells
+
+
+    """
+        Checks if the king can reach an escape tile with a move.
+    """
+    cdef bint canKingEscape(self):
+        cdef int[4*MAX_RAY_LENGTH] cells
+        return self.getKingEscapeCells(cells) > 0
+
+
+    """
+        Writes in a buffer the moves that change the position sharply and have to be searched by the quiescence search:
+            - for white, the moves that capture and the moves of the king that capture,
+              reach an escape tile or (if `king_threats`) open a free line towards one;
+            - for black, the moves that capture or, if the king can escape, only the moves that stop it
+              (i.e. that capture the king or end in its way).
+        The captures of the king are detected with `isCaptured` by applying the moves.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef int getQuiescenceMoves(self, short* out, bint king_threats=True):
+        cdef int n_moves = self.getCapturingMoves(out)
+        cdef int n_captures = n_moves, n_king, n_blocking, n_cells, k, c, start, end
+        cdef short[4*MAX_RAY_LENGTH] king_moves
+        cdef short[MAX_MOVES] blocking_moves
+        cdef int[4*MAX_RAY_LENGTH] escape_cells
+        cdef list captured
+        cdef Coord start_coord, end_coord
+        cdef bint forcing, duplicate
+
+        if self.is_white_turn:
+            n_king = self.getKingMoves(king_moves)
+            for k in range(n_king):
+                start, end = king_moves[k] // BOARD_CELLS, king_moves[k] % BOARD_CELLS
+                start_coord, end_coord = (start // BOARD_COLS, start % BOARD_COLS), (end // BOARD_COLS, end % BOARD_COLS)
+                captured = self.applyMove(start_coord, end_coord)
+                forcing = len(captured) > 0 or IS_ESCAPE[end] or (king_threats and self.canKingEscape())
+                self.revertMove(start_coord, end_coord, captured)
+                if forcing:
+                    out[n_moves] = king_moves[k]
+                    n_moves += 1
+        else:
+            n_cells = self.getKingEscapeCells(escape_cells)
+            if n_cells > 0:
+                n_moves = 0
+                for k in range(n_captures):
+                    if self.__capturesKing(out[k]):
+                        out[n_moves] = out[k]
+                        n_moves += 1
+                n_captures = n_moves
+                n_blocking = self.__packMovesTo(escape_cells, n_cells, blocking_moves)
+                for k in range(n_blocking):
+                    duplicate = False
+                    for c in range(n_captures):
+                        if out[c] == blocking_moves[k]:
+                            duplicate = True
+                            break
+                    if not duplicate:
+                        out[n_moves] = blocking_moves[k]
+                        n_moves += 1
+        return n_moves
+
+
+    """
+        Writes the moves of the pawns (king excluded) in a buffer.
+        Moves that end near the rows and columns of the king come first.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    @cython.initializedcheck(False)
+    cdef int getPawnsMoves(self, short* out):
+        cdef char pawn = WHITE if self.is_white_turn else BLACK
+        cdef int king_i = self.king_idx // BOARD_COLS if self.king_idx >= 0 else -2
+        cdef int king_j = self.king_idx % BOARD_COLS if self.king_idx >= 0 else -2
+        cdef short[MAX_MOVES] pawn_moves
+        cdef short[MAX_MOVES] other_moves
+        cdef int n_moves = 0, n_others = 0, n, idx, k, end
+
+        for idx in range(BOARD_CELLS):
+            if self.memv_board[idx // BOARD_COLS, idx % BOARD_COLS] != pawn: continue
+            n = self.__packPawnMoves(idx, pawn_moves)
+            for k in range(n):
+                end = pawn_moves[k] % BOARD_CELLS
+                if abs(end // BOARD_COLS - king_i) <= 1 or abs(end % BOARD_COLS - king_j) <= 1:
+                    out[n_moves] = pawn_moves[k]
+                    n_moves += 1
+                else:
+                    other_moves[n_others] = pawn_moves[k]
+                    n_others += 1
+
+        for k in range(n_others):
+            out[n_moves] = other_moves[k]
+            n_moves += 1
+        return n_moves
+
+
+    """
+        Checks if a move is quiet, i.e. it is not one of the critical moves of `getMoves`:
+        it does not move the king and does not end near the rows and columns of the king.
+        Captures are not detected, as they are known only after applying the move.
+    """
+    @cython.cdivision(True)
+    @cython.initializedcheck(False)
+    cdef bint isQuietMove(self, short move):
+        cdef int start = move // BOARD_CELLS, end = move % BOARD_CELLS
+        if (self.king_idx < 0) or (self.memv_board[start // BOARD_COLS, start % BOARD_COLS] == KING): return False
+        return (abs(end // BOARD_COLS - self.king_idx // BOARD_COLS) > 1) and (abs(end % BOARD_COLS - self.king_idx % BOARD_COLS) > 1)
+
+
+    @cython.cdivision(True)
+    cdef bint __capturesKing(self, short move):
+        cdef Coord start = ((move // BOARD_CELLS) // BOARD_COLS, (move // BOARD_CELLS) % BOARD_COLS)
+        cdef Coord end = ((move % BOARD_CELLS) // BOARD_COLS, (move % BOARD_CELLS) % BOARD_COLS)
+        cdef list captured = self.applyMove(start, end)
+        cdef bint king_captured = self.king_idx < 0
+        self.revertMove(start, end, captured)
+        return king_captured
+
+
+    """
+        Checks if a move (packed as start*81 + end) can be done by the player to move.
+    """
+    @cython.cdivision(True)
+    @cython.initializedcheck(False)
+    cdef bint isLegalMove(self, short move):
+        if move < 0 or move >= BOARD_CELLS*BOARD_CELLS: return False
+        cdef int start = move // BOARD_CELLS, end = move % BOARD_CELLS
+        cdef int start_i = start // BOARD_COLS, start_j = start % BOARD_COLS
+        cdef int end_i = end // BOARD_COLS, end_j = end % BOARD_COLS
+        cdef char pawn = self.memv_board[start_i, start_j]
+
+        if pawn == EMPTY or ((pawn == BLACK) == self.is_white_turn): return False
+        if start_i == end_i and start_j != end_j:
+            return self.numSteps(start_i, start_j, RIGHT if end_j > start_j else LEFT) >= abs(end_j - start_j)
+        if start_j == end_j and start_i != end_i:
+            return self.numSteps(start_i, start_j, DOWN if end_i > start_i else UP) >= abs(end_i - start_i)
+        return False
+
     """
         Applies a move in the board.
         It is assumed that the move is valid.
@@ -282,32 +733,46 @@ cdef class State:
     @cython.wraparound(False)
     @cython.cdivision(True)
     @cython.initializedcheck(False)
-    cdef list[tuple[Coord, char]] applyMove(self, Coord start, Coord end):
+    cdef list applyMove(self, Coord start, Coord end):
         cdef list[tuple[Coord, char]] captured = []
+        cdef char pawn = self.memv_board[start[0], start[1]]
 
         # Applies move
-        self.memv_board[end[0], end[1]] = self.memv_board[start[0], start[1]]
+        self.memv_board[end[0], end[1]] = pawn
         self.memv_board[start[0], start[1]] = EMPTY
+        self.updateHash(start[0], start[1], pawn)
+        self.updateHash(end[0], end[1], pawn)
+        self.updatePieces(start[0], start[1], pawn)
+        self.updatePieces(end[0], end[1], pawn)
+        if pawn == KING: self.king_idx = end[0]*self.N_COLS + end[1]
 
         # Checks if the adjacent pieces have been captured
         if self.isCaptured(end[0]+1,end[1], to_filter_axis=VERTICAL):
-            captured.append( ((end[0]+1, end[1]), self.memv_board[end[0]+1, end[1]]) )
-            self.memv_board[end[0]+1, end[1]] = EMPTY
+            self.__capture(end[0]+1, end[1], captured)
         if self.isCaptured(end[0]-1,end[1], to_filter_axis=VERTICAL):
-            captured.append( ((end[0]-1, end[1]), self.memv_board[end[0]-1, end[1]]) )
-            self.memv_board[end[0]-1, end[1]] = EMPTY
+            self.__capture(end[0]-1, end[1], captured)
         if self.isCaptured(end[0],end[1]+1, to_filter_axis=HORIZONTAL):
-            captured.append( ((end[0], end[1]+1), self.memv_board[end[0], end[1]+1]) )
-            self.memv_board[end[0], end[1]+1] = EMPTY
+            self.__capture(end[0], end[1]+1, captured)
         if self.isCaptured(end[0],end[1]-1, to_filter_axis=HORIZONTAL):
-            captured.append( ((end[0], end[1]-1), self.memv_board[end[0], end[1]-1]) )
-            self.memv_board[end[0], end[1]-1] = EMPTY
+            self.__capture(end[0], end[1]-1, captured)
 
-        self.is_white_turn = not self.is_white_turn
+        self.flipTurn()
 
         return captured
 
 
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.initializedcheck(False)
+    cdef void __capture(self, pos_t i, pos_t j, list captured):
+        cdef char pawn = self.memv_board[i, j]
+        captured.append( ((i, j), pawn) )
+        self.updateHash(i, j, pawn)
+        self.updatePieces(i, j, pawn)
+        if pawn == KING: self.king_idx = -1
+        self.memv_board[i, j] = EMPTY
+
+
     """
         Reverts a move and restores captured pawns.
         It is assumed that the parameters are correct.
@@ -330,22 +795,83 @@ cdef class State:
     @cython.wraparound(False)
     @cython.cdivision(True)
     @cython.initializedcheck(False)
-    cdef void revertMove(self, Coord old_start, Coord old_end, list[tuple[Coord, char]] captured):
+    cdef void revertMove(self, Coord old_start, Coord old_end, list captured):
         cdef tuple[Coord, char] el
         cdef Coord pos
         cdef char pawn
+        cdef char moved_pawn = self.memv_board[old_end[0], old_end[1]]
 
         # Reverts move
-        self.memv_board[old_start[0], old_start[1]] = self.memv_board[old_end[0], old_end[1]]
+        self.memv_board[old_start[0], old_start[1]] = moved_pawn
         self.memv_board[old_end[0], old_end[1]] = EMPTY
+        self.updateHash(old_start[0], old_start[1], moved_pawn)
+        self.updateHash(old_end[0], old_end[1], moved_pawn)
+        self.updatePieces(old_start[0], old_start[1], moved_pawn)
+        self.updatePieces(old_end[0], old_end[1], moved_pawn)
+        if moved_pawn == KING: self.king_idx = old_start[0]*self.N_COLS + old_start[1]
         
         # Reverts captured pawn
         for el in captured:
             pos = el[0]
             pawn = el[1]
             self.memv_board[pos[0], pos[1]] = pawn
+            self.updateHash(pos[0], pos[1], pawn)
+            self.updatePieces(pos[0], pos[1], pawn)
+            if pawn == KING: self.king_idx = pos[0]*self.N_COLS + pos[1]
 
-        self.is_white_turn = not self.is_white_turn
+        self.flipTurn()
+
+
+    """
+        Determines the move that leads from this state to another one, comparing the two boards.
+        The destination is the only cell that gets occupied and the start is the emptied cell
+        that contained the moved pawn. The other emptied cells are the captures of the move.
+
+        Parameters
+        ----------
+            next_state : State
+                State reached with a move from this one.
+
+        Returns
+        -------
+            move : tuple[Coord, Coord]|None
+                Starting and ending coordinates of the move (None if the boards are not one move away).
+
+            captures : list[Coord]
+                Coordinates of the pawns captured by the move.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.initializedcheck(False)
+    cdef tuple findMove(self, State next_state):
+        cdef int i, j, end_i = -1, end_j = -1
+        cdef char old_pawn, new_pawn
+        cdef list emptied = []
+        cdef list captures = []
+        cdef object start = None
+        cdef Coord pos
+
+        for i in range(BOARD_ROWS):
+            for j in range(BOARD_COLS):
+                old_pawn = self.memv_board[i, j]
+                new_pawn = next_state.memv_board[i, j]
+                if old_pawn == new_pawn: continue
+                if new_pawn == EMPTY:
+                    emptied.append((i, j))
+                elif old_pawn == EMPTY and end_i < 0:
+                    end_i, end_j = i, j
+                else:
+                    return None, [] # A pawn replaced by another one or more than one destination
+        if end_i < 0: return None, []
+
+        for pos in emptied:
+            if (start is None and self.memv_board[pos[0], pos[1]] == next_state.memv_board[end_i, end_j] and
+                (pos[0] == end_i or pos[1] == end_j)):
+                start = pos
+            else:
+                captures.append(pos)
+        if start is None: return None, []
+        return (start, (end_i, end_j)), captures
 
 
     """
@@ -360,11 +886,9 @@ cdef class State:
     @cython.wraparound(False)
     @cython.cdivision(True)
     cdef char getGameState(self):
-        cdef Coord pos_king = self.__findKing()
-        
-        if pos_king == NULL_COORD:
+        if self.king_idx < 0:
             return BLACK_WIN
-        elif pos_king in ESCAPE_TILES:
+        elif IS_ESCAPE[self.king_idx]:
             return WHITE_WIN
         return OPEN  
               
@@ -399,7 +923,7 @@ cdef class State:
             is_wall : bool
     """
     cdef bint isWall(self, pos_t i, pos_t j):
-        return (i, j) in CAMP_DICT.keys() or (i, j) == CASTLE_TILE
+        return IS_WALL[i*self.N_COLS + j]
     
     
     """
@@ -428,50 +952,36 @@ cdef class State:
     @cython.initializedcheck(False)
     cdef bint isCaptured(self, pos_t i, pos_t j, char to_filter_axis=VERT_HORIZ):
         cdef int cnt_black
-        cdef int k
-        cdef bint is_vertically_captured, is_horizontally_captured
+        cdef int k, idx, partner1, partner2
 
         if not self.isValidCell(i, j): return False
         
+        idx = i*self.N_COLS + j
         if self.memv_board[i, j] == EMPTY:
             return False
         # King captured in castle
-        elif (self.memv_board[i, j] == KING and (CASTLE_TILE[0] == i and CASTLE_TILE[1] == j)):
-            return (
-                self.memv_board[i+1, j] == BLACK and
-                self.memv_board[i-1, j] == BLACK and
-                self.memv_board[i, j+1] == BLACK and
-                self.memv_board[i, j-1] == BLACK
-            )
+        elif (self.memv_board[i, j] == KING and idx == CASTLE_INDEX):
+            for k in range(N_NEIGHBOURS[idx]):
+                if self.memv_board[NEIGHBOURS[idx][k] // BOARD_COLS, NEIGHBOURS[idx][k] % BOARD_COLS] != BLACK:
+                    return False
+            return True
         # King captured near castle
-        elif (self.memv_board[i, j] == KING and (i, j) in NEAR_CASTLE_TILES):
+        elif (self.memv_board[i, j] == KING and IS_NEAR_CASTLE[idx]):
             cnt_black = 0
-            for k in range(-1, 2, 2): # Coordinates increment
-                if (i+k != CASTLE_TILE[0]) or (j != CASTLE_TILE[1]):
-                    if self.memv_board[i+k, j] == BLACK:
-                        cnt_black += 1
-                if (i != CASTLE_TILE[0]) or (j+k != CASTLE_TILE[1]):
-                    if self.memv_board[i, j+k] == BLACK:
-                        cnt_black += 1
-            if cnt_black == 3:
-                return True
+            for k in range(N_NEIGHBOURS[idx]):
+                if NEIGHBOURS[idx][k] == CASTLE_INDEX: continue
+                if self.memv_board[NEIGHBOURS[idx][k] // BOARD_COLS, NEIGHBOURS[idx][k] % BOARD_COLS] == BLACK:
+                    cnt_black += 1
+            return cnt_black == 3
         # Normal capture
         else:
-            is_vertically_captured = False
-            is_horizontally_captured = False
-            
-            if (to_filter_axis == VERT_HORIZ) or (to_filter_axis == VERTICAL):
-                is_vertically_captured = (
-                    self.isValidCell(i+1, j) and self.isValidCell(i-1, j) and
-                    self.isCapturingElementFor(i, j, i+1, j) and self.isCapturingElementFor(i, j, i-1, j)
-                )
-            if (to_filter_axis == VERT_HORIZ) or (to_filter_axis == HORIZONTAL):
-                is_horizontally_captured = (
-                    self.isValidCell(i, j+1) and self.isValidCell(i, j-1) and
-                    self.isCapturingElementFor(i, j, i, j+1) and self.isCapturingElementFor(i, j, i, j-1)
-                )
-
-            return is_vertically_captured or is_horizontally_captured
+            for k in range(N_PARTNERS[idx]):
+                if (to_filter_axis != VERT_HORIZ) and (to_filter_axis != PARTNERS_AXIS[idx][k]): continue
+                partner1, partner2 = CAPTURE_PARTNERS[idx][k][0], CAPTURE_PARTNERS[idx][k][1]
+                if (self.isCapturingElementFor(i, j, partner1 // BOARD_COLS, partner1 % BOARD_COLS) and 
+                    self.isCapturingElementFor(i, j, partner2 // BOARD_COLS, partner2 % BOARD_COLS)):
+                    return True
+            return False
     
     
     """
@@ -508,10 +1018,10 @@ cdef class State:
         
         # In the case of black inside the camp, the camp in which the black is
         # is not considered an obstacle
-        if (num_camp != NO_CAMP) and CAMP_DICT.get((i, j), NO_CAMP) == num_camp:
+        if (num_camp != NO_CAMP) and CAMP_OF[i*self.N_COLS + j] == num_camp:
             return False
         else:
-            return self.isWall(i, j)
+            return IS_WALL[i*self.N_COLS + j]
         
     
     """
@@ -540,10 +1050,10 @@ cdef class State:
     cdef bint isCapturingElementFor(self, pos_t pawn_i, pos_t pawn_j, pos_t check_i, pos_t check_j):
         
         if self.memv_board[pawn_i, pawn_j] == WHITE or self.memv_board[pawn_i, pawn_j] == KING:
-            return self.memv_board[check_i, check_j] == BLACK or self.isWall(check_i, check_j)
+            return self.memv_board[check_i, check_j] == BLACK or IS_WALL[check_i*self.N_COLS + check_j]
         else:
             return (self.memv_board[check_i, check_j] == WHITE or self.memv_board[check_i, check_j] == KING or 
-                (self.isWall(check_i, check_j) and (pawn_i, pawn_j) not in CAMP_DICT))
+                (IS_WALL[check_i*self.N_COLS + check_j] and CAMP_OF[pawn_i*self.N_COLS + pawn_j] == NO_CAMP))
 
 
     """
@@ -568,7 +1078,7 @@ cdef class State:
 
         if self.memv_board[i,j] != BLACK:
             return NO_CAMP
-        return CAMP_DICT.get((i,j), NO_CAMP)        
+        return CAMP_OF[i*self.N_COLS + j]
 
 
     """
@@ -587,24 +1097,23 @@ cdef class State:
             num_steps 
                 Number of steps the pawn can make.
     """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    @cython.initializedcheck(False)
     cdef int numSteps(self, pos_t i, pos_t j, char direction):
         cdef char num_camp = self.getCampOfPawnAt(i, j)
-        cdef int num = 1
+        cdef int d = direction - UP
+        cdef int idx = i*self.N_COLS + j
+        cdef int num, target
 
-        if direction == RIGHT:
-            while(not self.isObstacle(i, j + num, num_camp)):
-                num +=1
-        elif direction == UP:
-            while(not self.isObstacle(i - num, j, num_camp)):
-                num +=1
-        elif direction == LEFT:
-            while(not self.isObstacle(i, j - num, num_camp)):
-                num +=1
-        elif direction == DOWN:
-            while(not self.isObstacle(i + num, j, num_camp)):
-                num +=1
+        for num in range(RAY_LENGTH[d][idx]):
+            target = MOVE_RAYS[d][idx][num]
+            if self.memv_board[target // BOARD_COLS, target % BOARD_COLS] != EMPTY: return num
+            # A black pawn inside a camp can move through its own camp
+            if IS_WALL[target] and (num_camp == NO_CAMP or CAMP_OF[target] != num_camp): return num
 
-        return num - 1
+        return RAY_LENGTH[d][idx]
 
 
     """
@@ -646,171 +1155,102 @@ cdef class State:
     @cython.boundscheck(False)
     @cython.wraparound(False)
     cdef score_t heuristics(self, char player_color, float[:] positive_weights, float[:] negative_weights):
-        if player_color == WHITE:
-            return (
-                (
-                    positive_weights[0] * self.__pawnRatio(WHITE) + 
-                    positive_weights[1] * self.__avgProximityToKingRatio(WHITE) + 
-                    positive_weights[2] * self.__safenessRatio(WHITE) + 
-                    positive_weights[3] * self.__minDistanceToEscapeRatio()
-                ) - (
-                    negative_weights[0] * self.__pawnRatio(BLACK) +
-                    negative_weights[1] * self.__avgProximityToKingRatio(BLACK) + 
-                    negative_weights[2] * self.__safenessRatio(BLACK) +
-                    negative_weights[3] * self.__kingDangerRatio()
-                )
-            )
-        else:
-            return (
-                (
-                    positive_weights[0] * self.__pawnRatio(BLACK) + 
-                    positive_weights[1] * self.__avgProximityToKingRatio(BLACK) + 
-                    positive_weights[2] * self.__safenessRatio(BLACK) +
-                    positive_weights[3] * self.__kingDangerRatio()
-                ) - (
-                    negative_weights[0] * self.__pawnRatio(WHITE) +
-                    negative_weights[1] * self.__avgProximityToKingRatio(WHITE) + 
-                    negative_weights[2] * self.__safenessRatio(WHITE) +
-                    negative_weights[3] * self.__minDistanceToEscapeRatio()
-                )
+        cdef score_t[N_FEATURES] features
+        cdef int* own = WHITE_FEATURES
+        cdef int* opponent = BLACK_FEATURES
+        if player_color != WHITE:
+            own = BLACK_FEATURES
+            opponent = WHITE_FEATURES
+
+        self.getFeatures(features)
+        return (
+            (
+                positive_weights[0] * features[own[0]] + 
+                positive_weights[1] * features[own[1]] + 
+                positive_weights[2] * features[own[2]] + 
+                positive_weights[3] * features[own[3]]
+            ) - (
+                negative_weights[0] * features[opponent[0]] +
+                negative_weights[1] * features[opponent[1]] + 
+                negative_weights[2] * features[opponent[2]] +
+                negative_weights[3] * features[opponent[3]]
             )
+        )
 
 
     """
-        Determines the number of pawns of a certain color (king excluded).
+        Extracts the heuristic features of this game state with a single traversal of its pieces.
+        The king has to be on the board.
+        The features are the ones of the Python `State.getFeatures`.
 
         Parameters
         ----------
-            color : WHITE|BLACK
-                Color of the pawn to check.
-
-        Returns
-        -------
-            num_pawns : int
-    """
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
-    @cython.initializedcheck(False)
-    cdef score_t __pawnRatio(self, char color):
-        cdef int count = 0
-        for i in range(self.N_ROWS):
-            for j in range(self.N_COLS):
-                if self.memv_board[i, j] == color: count += 1
-        if color == WHITE: return count / self.N_WHITES
-        else: return count / self.N_BLACKS
-
-
-    """
-        Determines the average Manhattan distance of 
-        the pawns of a certain color to the king.
-        Returns 1 if the pawns are near the king and 0 if they are far.
-
-        Parameters
-        ----------
-            color : WHITE|BLACK
-                Color of the pawn to check.
-
-        Returns
-        -------
-            avg_proximity_ratio : float
-    """
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
-    @cython.initializedcheck(False)
-    cdef score_t __avgProximityToKingRatio(self, char color):
-        cdef Coord pos_king = self.__findKing()
-        cdef list[int] dist = []
-        cdef int i, j
-        cdef float avg_dist
-
-        for i in range(self.N_ROWS):
-            for j in range(self.N_COLS):
-                if self.memv_board[i,j] == color:
-                    dist.append(abs(pos_king[0] - i) + abs(pos_king[1] - j))
-        avg_dist = self.MAX_DIST_TO_KING if len(dist) == 0 else (sum(dist)/len(dist))
-        return 1 - (avg_dist / self.MAX_DIST_TO_KING)
-
-
-    """
-        Determines the safeness ratio of the pawns of a certain color (king included).
-        The safeness ratio is 0 if all the pawns are surrounded 
-        (i.e. all pawns are missing a single opponent pawn to be captured)
-        and is 1 if none of the pawns are close to opponent pawns or walls.
-        
-        Parameters
-        ----------
-            color : WHITE|BLACK
-                Color of the pawn to check.
-
-        Returns
-        -------
-            threat_ratio : float
-    """
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
-    @cython.initializedcheck(False)
-    cdef score_t __safenessRatio(self, char color):
-        cdef int i, j
-        cdef int threats = 0
-        cdef int total_possible_threats = 0
-
-        for i in range(self.N_ROWS):
-            for j in range(self.N_COLS):
-                if (i, j) in CAMP_DICT: continue # Black pawns inside a camp are not counted
-
-                if (self.memv_board[i, j] == color) or (self.memv_board[i, j] == KING and color == WHITE):
-                    if self.isValidCell(i+1, j) and self.isValidCell(i-1, j): 
-                        total_possible_threats += 1
-                        if ((self.isCapturingElementFor(i, j, i+1, j) and self.memv_board[i-1, j] == EMPTY) or
-                            (self.isCapturingElementFor(i, j, i-1, j) and self.memv_board[i+1, j] == EMPTY)):
-                            threats += 1
-                    if self.isValidCell(i, j+1) and self.isValidCell(i, j-1): 
-                        total_possible_threats += 1
-                        if ((self.isCapturingElementFor(i, j, i, j+1) and self.memv_board[i, j-1] == EMPTY) or
-                            (self.isCapturingElementFor(i, j, i, j-1) and self.memv_board[i, j+1] == EMPTY)):
-                            threats += 1
-
-        if total_possible_threats == 0: return 1  
-        else: return 1 - (threats / total_possible_threats)
-
-
-    """
-        Determines the minimum distance between the king and the free escape tiles.
-
-        Returns
-        -------
-            min_distance : float
-    """
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
-    @cython.initializedcheck(False)
-    cdef score_t __minDistanceToEscapeRatio(self):
-        cdef Coord pos_king = self.__findKing()
-        cdef int m = self.MAX_DIST_TO_ESCAPE
-        cdef int dist
-        cdef Coord t
-
-        for t in ESCAPE_TILES:
-            if self.memv_board[t[0], t[1]] == EMPTY:
-                dist = abs(pos_king[0] - t[0]) + abs(pos_king[1] - t[1])
-                if dist < m:
-                    m = dist
-        return 1 - (m / self.MAX_DIST_TO_ESCAPE)
-
-
-    """
-        Determines how much the king is in danger.
+            features : score_t*
+                Buffer of N_FEATURES elements where the features are written,
+                indexed by the constants PAWNS_WHITE, ..., KING_DANGER.
     """
     @cython.boundscheck(False)
     @cython.wraparound(False)
+    @cython.cdivision(True)
     @cython.initializedcheck(False)
-    cdef score_t __kingDangerRatio(self):
-        cdef Coord pos_king = self.__findKing()
+    cdef void getFeatures(self, score_t* features):
+        cdef int king_i = self.king_idx // BOARD_COLS, king_j = self.king_idx % BOARD_COLS
+        cdef int n_whites = self.n_whites, n_blacks = self.n_blacks
+        cdef int whites_dist = 0, blacks_dist = 0
+        cdef int white_threats = 0, white_partners = 0
+        cdef int black_threats = 0, black_partners = 0
+        cdef int escape_dist = self.MAX_DIST_TO_ESCAPE
         cdef int blacks_around = 0
+        cdef int i, j, k, n, idx, dist, partner1, partner2
+        cdef char pawn, cell1, cell2
+        cdef bint capturing1, capturing2, threatened
+        cdef float avg_dist
 
-        if (self.isValidCell(pos_king[0]+1, pos_king[1])) and (self.memv_board[pos_king[0]+1, pos_king[1]] == BLACK): blacks_around += 1
-        if (self.isValidCell(pos_king[0]-1, pos_king[1])) and (self.memv_board[pos_king[0]-1, pos_king[1]] == BLACK): blacks_around += 1
-        if (self.isValidCell(pos_king[0], pos_king[1]+1)) and (self.memv_board[pos_king[0], pos_king[1]+1] == BLACK): blacks_around += 1
-        if (self.isValidCell(pos_king[0], pos_king[1]-1)) and (self.memv_board[pos_king[0], pos_king[1]-1] == BLACK): blacks_around += 1
-
-        return blacks_around / 4
\ No newline at end of file
+        for k in range(N_ESCAPE_TILES):
+            idx = ESCAPE_INDEXES[k]
+            i, j = idx // BOARD_COLS, idx % BOARD_COLS
+            if self.memv_board[i, j] == EMPTY:
+                dist = abs(king_i - i) + abs(king_j - j)
+                if dist < escape_dist: escape_dist = dist
+
+        for n in range(self.n_pieces):
+            idx = self.pieces[n]
+            i, j = idx // BOARD_COLS, idx % BOARD_COLS
+            pawn = self.memv_board[i, j]
+            dist = abs(king_i - i) + abs(king_j - j)
+            if pawn == BLACK:
+                blacks_dist += dist
+                if dist == 1: blacks_around += 1
+            elif pawn == WHITE:
+                whites_dist += dist
+            if CAMP_OF[idx] != NO_CAMP: continue # Black pawns inside a camp are not counted
+
+            # Threats: a capturing element on one side and an empty cell on the other
+            for k in range(N_PARTNERS[idx]):
+                partner1, partner2 = CAPTURE_PARTNERS[idx][k][0], CAPTURE_PARTNERS[idx][k][1]
+                cell1 = self.memv_board[partner1 // BOARD_COLS, partner1 % BOARD_COLS]
+                cell2 = self.memv_board[partner2 // BOARD_COLS, partner2 % BOARD_COLS]
+                if pawn == BLACK:
+                    capturing1 = (cell1 == WHITE) or (cell1 == KING) or IS_WALL[partner1]
+                    capturing2 = (cell2 == WHITE) or (cell2 == KING) or IS_WALL[partner2]
+                else:
+                    capturing1 = (cell1 == BLACK) or IS_WALL[partner1]
+                    capturing2 = (cell2 == BLACK) or IS_WALL[partner2]
+                threatened = (capturing1 and cell2 == EMPTY) or (capturing2 and cell1 == EMPTY)
+                if pawn == BLACK:
+                    black_partners += 1
+                    black_threats += threatened
+                else:
+                    white_partners += 1
+                    white_threats += threatened
+
+        features[PAWNS_WHITE] = n_whites / <double>self.N_WHITES
+        features[PAWNS_BLACK] = n_blacks / <double>self.N_BLACKS
+        avg_dist = self.MAX_DIST_TO_KING if n_whites == 0 else (whites_dist / <double>n_whites)
+        features[PROXIMITY_WHITE] = 1 - (avg_dist / self.MAX_DIST_TO_KING)
+        avg_dist = self.MAX_DIST_TO_KING if n_blacks == 0 else (blacks_dist / <double>n_blacks)
+        features[PROXIMITY_BLACK] = 1 - (avg_dist / self.MAX_DIST_TO_KING)
+        features[SAFENESS_WHITE] = 1 if white_partners == 0 else 1 - (white_threats / <double>white_partners)
+        features[SAFENESS_BLACK] = 1 if black_partners == 0 else 1 - (black_threats / <double>black_partners)
+        features[ESCAPE_PROXIMITY] = 1 - (escape_dist / <double>self.MAX_DIST_TO_ESCAPE)
+        features[KING_DANGER] = blacks_around / 4.0
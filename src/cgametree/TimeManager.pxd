@@ -0,0 +1,23 @@
+from .utils cimport *
+from .TranspositionTable cimport NO_MOVE
+
+
+cdef class TimeManager:
+    cdef double start_timestamp
+    cdef double hard_deadline
+    cdef double budget
+    cdef bint adaptive
+    cdef double soft_scale
+    cdef double iteration_start
+    cdef int n_iterations
+    cdef double[3] durations # Of the last iterations, from the most recent
+    cdef short best_move
+    cdef double wasted
+
+    cdef void startIteration(self)
+    cdef void iterationCompleted(self, short best_move)
+    cdef void iterationAborted(self)
+    cdef double softDeadline(self)
+    cdef double predictNextIteration(self)
+    cdef bint shouldStartIteration(self)
+    cdef double elapsed(self)
@@ -0,0 +1,116 @@
+from .utils cimport *
+from .TranspositionTable cimport NO_MOVE
+from libc.math cimport sqrt
+
+
+cdef double SOFT_BUDGET_RATIO = 0.6 # Fraction of the budget after which new iterations are not started (with a stable best move)
+cdef double STABILITY_REDUCTION = 0.85 # Scaling of the soft deadline when an iteration confirms the best move
+cdef double INSTABILITY_EXTENSION = 1.5 # Scaling of the soft deadline when an iteration changes the best move
+cdef double MIN_SOFT_SCALE = 0.4
+cdef double MAX_SOFT_SCALE = 1 / SOFT_BUDGET_RATIO # The soft deadline can be extended up to the hard one
+cdef double DEFAULT_BRANCHING = 4.0 # Growth of the duration between iterations when it cannot be estimated
+cdef double MIN_BRANCHING = 1.5
+cdef double MAX_BRANCHING = 10.0
+
+
+"""
+    Manages the time of the iterative deepening search of a move.
+    The hard deadline is never exceeded: the search is interrupted when it is reached.
+    The soft deadline decides if a new iteration is worth starting.
+    It is reduced while the best move is stable and extended when it changes.
+    Iterations that are predicted to end after the hard deadline are not started.
+"""
+cdef class TimeManager:
+    """
+        Parameters
+        ----------
+            budget : double
+                Seconds available for the search.
+
+            adaptive : bool
+                If False, iterations are started until the hard deadline (e.g. when the search can be interrupted).
+    """
+    def __init__(self, double budget, bint adaptive=True):
+        self.start_timestamp = getTime()
+        self.hard_deadline = self.start_timestamp + budget
+        self.budget = budget
+        self.adaptive = adaptive
+        self.soft_scale = 1.0
+        self.iteration_start = self.start_timestamp
+        self.n_iterations = 0
+        self.durations = [0.0, 0.0, 0.0]
+        self.best_move = NO_MOVE
+        self.wasted = 0.0
+
+
+    """
+        Marks the start of a new iteration.
+    """
+    cdef void startIteration(self):
+        self.iteration_start = getTime()
+
+
+    """
+        Registers a completed iteration and its best move.
+    """
+    cdef void iterationCompleted(self, short best_move):
+        if self.n_iterations > 0:
+            if best_move == self.best_move:
+                self.soft_scale = max(MIN_SOFT_SCALE, self.soft_scale * STABILITY_REDUCTION)
+            else:
+                self.soft_scale = min(MAX_SOFT_SCALE, self.soft_scale * INSTABILITY_EXTENSION)
+        self.durations[2] = self.durations[1]
+        self.durations[1] = self.durations[0]
+        self.durations[0] = getTime() - self.iteration_start
+        self.n_iterations += 1
+        self.best_move = best_move
+
+
+    """
+        Registers an iteration interrupted by the deadline.
+        Its time is wasted as its result cannot be used.
+    """
+    cdef void iterationAborted(self):
+        self.wasted += getTime() - self.iteration_start
+
+
+    """
+        Returns the time after which new iterations are not started.
+    """
+    cdef double softDeadline(self):
+        return self.start_timestamp + self.budget * SOFT_BUDGET_RATIO * self.soft_scale
+
+
+    """
+        Predicts the duration of the next iteration
+        from the growth of the duration of the previous ones (effective branching factor).
+        When possible, the growth is averaged over two iterations as alpha-beta alternates cheap and expensive depths.
+    """
+    cdef double predictNextIteration(self):
+        cdef double branching = DEFAULT_BRANCHING
+
+        if self.n_iterations == 0: return 0.0
+        if self.n_iterations >= 3 and self.durations[2] > 0:
+            branching = sqrt(self.durations[0] / self.durations[2])
+        elif self.n_iterations >= 2 and self.durations[1] > 0:
+            branching = self.durations[0] / self.durations[1]
+        return self.durations[0] * min(MAX_BRANCHING, max(MIN_BRANCHING, branching))
+
+
+    """
+        Determines if a new iteration should be started.
+    """
+    cdef bint shouldStartIteration(self):
+        cdef double now = getTime()
+
+        if now >= self.hard_deadline: return False
+        if not self.adaptive: return True
+        if now >= self.softDeadline(): return False
+        return now + self.predictNextIteration() <= self.hard_deadline
+
+
+    """
+        Seconds elapsed from the start of the search.
+    """
+    cdef double elapsed(self):
+        return getTime() - self.start_timestamp
@@ -1,26 +1,41 @@
-# distutils: language = c++
 from .State cimport State
 from .utils cimport *
-from libcpp.unordered_map cimport unordered_map
-from libcpp.queue cimport queue
 
 
 cdef char EXACT
 cdef char LOWERBOUND
 cdef char UPPERBOUND
 
+cdef enum:
+    NO_MOVE = -1
+    EMPTY_DEPTH = -1
+    # Each bucket has a depth-preferred slot and an always-replace slot
+    BUCKET_SIZE = 2
 
-cdef struct TraspositionEntry:
-    char entry_type
+
+cdef packed struct TraspositionEntry:
+    hash_t key
     score_t value
-    int depth
+    short depth
+    short best_move
+    char entry_type
+
+
+cdef inline short packMove(Coord start, Coord end):
+    return (start[0]*9 + start[1])*81 + (end[0]*9 + end[1])
+
+cdef inline Move unpackMove(short move):
+    cdef int start = move // 81, end = move % 81
+    return (start // 9, start % 9), (end // 9, end % 9)
 
 
 cdef class TranspositionTable:
-    cdef unsigned int max_size
-    cdef unsigned int curr_size
-    cdef unordered_map[int, TraspositionEntry] table
-    cdef queue[int] drop_queue
+    cdef TraspositionEntry* table
+    cdef size_t n_buckets
+    cdef hash_t bucket_mask
+    cdef object shm
+    cdef bint shm_owner
 
-    cdef void setEntry(self, State state, char entry_type, score_t value, int depth)
+    cdef void setEntry(self, State state, char entry_type, score_t value, int depth, short best_move=*)
     cdef TraspositionEntry getEntry(self, State state)
+    cdef void close(self)
@@ -1,8 +1,8 @@
-# distutils: language = c++
-from .State cimport State
+from .State cimport State, symmetricCell
 from .utils cimport *
-from libcpp.unordered_map cimport unordered_map
-from libcpp.queue cimport queue
+from libc.stdlib cimport malloc, free
+from multiprocessing.shared_memory import SharedMemory
+cimport cython
 
 
 cdef char EXACT = 0
@@ -10,43 +10,139 @@ cdef char LOWERBOUND = 1
 cdef char UPPERBOUND = 2
 
 cdef TraspositionEntry INV_ENTRY
-INV_ENTRY.depth = -1
+INV_ENTRY.key = 0
+INV_ENTRY.depth = EMPTY_DEPTH
+INV_ENTRY.best_move = NO_MOVE
 INV_ENTRY.entry_type = 0
 INV_ENTRY.value = 0
 
 
+"""
+    Expresses a move (packed with `packMove`) on the board transformed with a symmetry of `SYMMETRIES`.
+    With `inverse`, a move on the transformed board is brought back to the original one.
+"""
+cdef inline short transformMove(short move, int symmetry, bint inverse=False):
+    if move == NO_MOVE or symmetry == 0: return move
+    return symmetricCell(move // 81, symmetry, inverse)*81 + symmetricCell(move % 81, symmetry, inverse)
+
+
+"""
+    Mixes the content of an entry in a single integer.
+    Entries store their key xored with this value, so that an entry
+    partially overwritten by another process does not match any key.
+"""
+cdef inline hash_t entryChecksum(score_t value, short depth, short best_move, char entry_type):
+    return ((<unsigned int*>&value)[0]) ^ ((<hash_t><unsigned short>depth) << 32) ^ ((<hash_t><unsigned short>best_move) << 48) ^ ((<hash_t><unsigned char>entry_type) << 40)
+
+
+"""
+    Open-addressing transposition table preallocated in a single array.
+    A state is mapped to a bucket with the low bits of its normalized hash and the full hash is stored to verify hits.
+    As symmetric states share their entry, best moves are stored on the normalized board.
+    The first slot of a bucket keeps the deepest entry, the second one is always replaced.
+    The table can be allocated in shared memory to be used by multiple processes without locks.
+"""
 cdef class TranspositionTable:
     """
         Parameters
         ----------
-            max_size : int
-                The maximum number of entries the table can hold.
+            size_mb : float
+                Maximum memory (in MB) the table can use.
+
+            shared : bool
+                If True, the table is allocated in a new shared memory block.
+
+            shm_name : str|None
+                Name of an existing shared memory block to attach to.
+                It must have been created by a table with the same size.
     """
-    def __init__(self, unsigned int max_size):
-        self.max_size = max_size
-        self.curr_size = 0
+    def __init__(self, double size_mb, bint shared=False, str shm_name=None):
+        cdef size_t i
+        cdef unsigned char[::1] buffer
 
+        self.n_buckets = 1
+        while (2*self.n_buckets * BUCKET_SIZE * sizeof(TraspositionEntry)) <= (size_mb * 2**20):
+            self.n_buckets *= 2
+        self.bucket_mask = self.n_buckets - 1
 
-    cdef void setEntry(self, State state, char entry_type, score_t value, int depth):
-        cdef int board_hash = state.hash()
-        cdef TraspositionEntry entry
-        entry.entry_type = entry_type
+        self.shm = None
+        self.shm_owner = False
+        if shm_name is not None:
+            self.shm = SharedMemory(name=shm_name)
+        elif shared:
+            self.shm = SharedMemory(create=True, size=self.n_buckets * BUCKET_SIZE * sizeof(TraspositionEntry))
+            self.shm_owner = True
+
+        if self.shm is None:
+            self.table = <TraspositionEntry*> malloc(self.n_buckets * BUCKET_SIZE * sizeof(TraspositionEntry))
+            if self.table == NULL:
+                raise MemoryError()
+        else:
+            buffer = self.shm.buf
+            self.table = <TraspositionEntry*> &buffer[0]
+        if self.shm is None or self.shm_owner:
+            for i in range(self.n_buckets * BUCKET_SIZE):
+                self.table[i] = INV_ENTRY
+
+
+    def __dealloc__(self):
+        if self.shm is None:
+            free(self.table)
+
+
+    """
+        Releases the shared memory of the table (if any).
+        The block is destroyed by the table that created it.
+    """
+    cdef void close(self):
+        if self.shm is None: return
+        self.table = NULL
+        self.shm.close()
+        if self.shm_owner: self.shm.unlink()
+        self.shm = None
+
+
+    """
+        Stores the result of the search of a state.
+        It does not allocate memory.
+    """
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void setEntry(self, State state, char entry_type, score_t value, int depth, short best_move=NO_MOVE):
+        cdef hash_t key = state.hash(normalize=True)
+        cdef TraspositionEntry* deep_entry = &self.table[(key & self.bucket_mask) * BUCKET_SIZE]
+        cdef TraspositionEntry* always_entry = deep_entry + 1
+        cdef TraspositionEntry* entry
+        cdef hash_t deep_key = deep_entry.key ^ entryChecksum(deep_entry.value, deep_entry.depth, deep_entry.best_move, deep_entry.entry_type)
+
+        if deep_entry.depth == EMPTY_DEPTH or deep_key == key or depth >= deep_entry.depth:
+            if deep_entry.depth != EMPTY_DEPTH and deep_key != key:
+                # The replaced deep entry is moved in the always-replace slot
+                always_entry[0] = deep_entry[0]
+            entry = deep_entry
+        else:
+            entry = always_entry
+
+        best_move = transformMove(best_move, state.getNormalizingSymmetry())
+        entry.key = key ^ entryChecksum(value, depth, best_move, entry_type)
         entry.value = value
         entry.depth = depth
-
-        if (self.table.find(board_hash) == self.table.end()):
-            if self.curr_size+1 > self.max_size:
-                self.table.erase(self.drop_queue.front())
-                self.drop_queue.pop()
-                self.curr_size -= 1
-            self.drop_queue.push(board_hash)
-            self.curr_size += 1
-        self.table[board_hash] = entry
+        entry.best_move = best_move
+        entry.entry_type = entry_type
         
 
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
     cdef TraspositionEntry getEntry(self, State state):
-        cdef int board_hash = state.hash()
-        if (self.table.find(board_hash) == self.table.end()):
-            return INV_ENTRY
-        return self.table[board_hash]
-    
\ No newline at end of file
+        cdef hash_t key = state.hash(normalize=True)
+        cdef TraspositionEntry* bucket = &self.table[(key & self.bucket_mask) * BUCKET_SIZE]
+        cdef TraspositionEntry entry
+        cdef int k
+
+        for k in range(BUCKET_SIZE):
+            entry = bucket[k] # Copied, as other processes may overwrite the slot
+            if (entry.depth != EMPTY_DEPTH) and (entry.key ^ entryChecksum(entry.value, entry.depth, entry.best_move, entry.entry_type) == key):
+                entry.key = key
+                entry.best_move = transformMove(entry.best_move, state.getNormalizingSymmetry(), inverse=True)
+                return entry
+        return INV_ENTRY
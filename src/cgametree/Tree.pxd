@@ -3,6 +3,27 @@ from .TreeNode cimport TreeNode
 from .utils cimport *
 from libc.time cimport time_t
 from .TranspositionTable cimport TranspositionTable
+from .EvaluationCache cimport EvaluationCache
+from .MoveOrdering cimport MoveOrdering
+from .MoveGenerator cimport MoveGenerator
+from .TimeManager cimport TimeManager
+from .SearchLimits cimport SearchLimits
+
+cdef enum:
+    MAX_PLY = 64 # Maximum depth of the search
+    QUIESCENCE_MAX_DEPTH = 8 # Maximum plies of the quiescence search
+    NULL_MOVE_REDUCTION = 2 # Depth reduction of the search after passing the turn
+    NULL_MOVE_MIN_DEPTH = 3 # Minimum remaining depth to try a null move
+    LMR_FULL_MOVES = 4 # Moves of each node searched without reductions
+    LMR_MIN_DEPTH = 3 # Minimum remaining depth to reduce late moves
+    LMR_REDUCTION = 1 # Depth reduction of the late quiet moves
+    EVAL_CACHE_MB = 4 # Memory of the cache of the static evaluations
+
+# Phases of the game, each with its own weights
+cdef enum:
+    EARLY_PHASE = 0
+    MID_PHASE = 1
+    LATE_PHASE = 2
 
 
 cdef class Tree():
@@ -11,6 +32,24 @@ cdef class Tree():
     cdef TreeNode root
     cdef int turns_count
     cdef TranspositionTable tt
+    cdef MoveOrdering ordering
+    cdef list[MoveGenerator] move_generators
+
+    cdef bint compact
+    cdef short[MAX_PLY] played_moves
+    cdef short root_best_move
+    cdef list[Move] pv
+    cdef bint pvs
+    cdef bint quiescence
+    cdef bint null_move
+    cdef bint lmr
+    cdef bint[MAX_PLY] null_move_plies
+    cdef object pool
+    cdef readonly list iteration_times
+    cdef short root_pv_move
+    cdef bint partial_pv_searched
+    cdef short partial_best_move
+    cdef score_t partial_best_score
 
     cdef float[:] early_positive_weights
     cdef float[:] early_negative_weights
@@ -20,11 +59,34 @@ cdef class Tree():
     cdef float[:] late_negative_weights
     cdef float[:] curr_positive_weights
     cdef float[:] curr_negative_weights
+    cdef char weights_phase
+    cdef EvaluationCache eval_cache
 
     cdef bint __debug
     cdef int __explored_nodes
     cdef int __tt_hits
+    cdef int __evaluations
+    cdef int __eval_hits
+    cdef int __researches
+    cdef int __aspiration_fails
+    cdef int __quiescence_nodes
+    cdef int __null_cutoffs
+    cdef int __reductions
+    cdef int __lmr_researches
 
     cdef void __updateWeights(self)
-    cpdef tuple[Coord, Coord, score_t] decide(self, int timeout)
-    cdef score_t minimax(self, TreeNode tree_node, int max_depth, score_t alpha, score_t beta, double timeout_timestamp)
+    cdef score_t __evaluate(self, int max_depth)
+    cdef score_t __search(self, int depth, score_t alpha, score_t beta, SearchLimits limits)
+    cdef score_t __aspirationSearch(self, int depth, score_t prev_score, SearchLimits limits)
+    cpdef tuple[Coord, Coord, score_t] decide(self, double timeout, long long max_nodes=*, int max_depth=*, object is_interrupted=*)
+    cdef tuple[int, short, score_t] __iterativeDeepening(self, TimeManager time_manager, SearchLimits limits, int first_depth)
+    cdef void __trackRootMove(self, short move, score_t score, bint improves)
+    cdef TreeNode __rootChild(self, short move)
+    cdef score_t minimax(self, TreeNode tree_node, int max_depth, score_t alpha, score_t beta, SearchLimits limits, int ply=*)
+    cdef score_t compactMinimax(self, int max_depth, int ply, score_t alpha, score_t beta, SearchLimits limits)
+    cdef score_t quiescenceSearch(self, score_t alpha, score_t beta, SearchLimits limits, int depth=*)
+    cdef bint __canNullMove(self, int max_depth, int ply, score_t alpha, score_t beta, bint is_max)
+    cdef score_t __nullMoveSearch(self, TreeNode tree_node, int max_depth, int ply, score_t alpha, score_t beta, bint is_max, SearchLimits limits)
+    cdef bint __canReduce(self, int k, int max_depth, int ply)
+    cdef short __previousMove(self, int ply)
+    cdef list[Move] __principalVariation(self, int max_length)
@@ -1,12 +1,18 @@
 from .utils cimport *
 from .State cimport State
+from .TranspositionTable cimport NO_MOVE, packMove, unpackMove
+from .MoveGenerator cimport MoveGenerator
 
 cdef class TreeNode:
     cdef Coord start
     cdef Coord end
     cdef score_t score
     cdef list[TreeNode] children
-    cdef unsigned int critical_len
+    cdef bint expanded
 
-    cdef void generateChildren(self, State state, double timeout_timestamp)
-    cdef prioritizeChild(self, int index)
\ No newline at end of file
+    cdef void generateChildren(self, State state, short best_move=*, MoveGenerator generator=*, int ply=*)
+    cdef TreeNode getChild(self, int index, MoveGenerator generator=*)
+    cdef short packedMove(self)
+    cdef TreeNode findChild(self, short move)
+    cdef prioritizeChild(self, int index)
+    cdef void prioritizeMove(self, short move)
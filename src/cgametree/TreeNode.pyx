@@ -1,5 +1,3 @@
-from .utils cimport getTime
-
 """
     Class that represents a node in the game tree.
 """
@@ -9,24 +7,94 @@ cdef class TreeNode:
         self.end = end
         self.score = 0
         self.children = []
-        self.critical_len = 0
+        self.expanded = False # True when all the children have been generated
 
 
-    cdef void generateChildren(self, State state, double timeout_timestamp):
+    """
+        Generates the children of the node, if needed.
+        If `best_move` (packed with `packMove`) is legal, it is moved (or added) in first position.
+        If a move generator is given, children are not generated here but lazily by `getChild`,
+        so that the moves after a cutoff are not computed (they will be if the node is visited again).
+    """
+    cdef void generateChildren(self, State state, short best_move=NO_MOVE, MoveGenerator generator=None, int ply=0):
         cdef list[Move] critical_moves, other_moves
         cdef Coord start, end
+        cdef Move unpacked
         cdef TreeNode child
 
-        if len(self.children) == 0:
+        if generator is None and not self.expanded:
             critical_moves, other_moves = state.getMoves()
-            self.critical_len = len(critical_moves)
+            self.children = []
             for start, end in critical_moves + other_moves:
-                if getTime() >= timeout_timestamp:
-                    self.children = []
-                    self.critical_len = 0
-                    return
                 child = TreeNode(start, end)
                 self.children.append(child)
+            self.expanded = True
+
+        if best_move != NO_MOVE:
+            self.prioritizeMove(best_move)
+
+        if not self.expanded:
+            generator.reset(state, best_move, ply, self.packedMove())
+            if best_move != NO_MOVE and self.findChild(best_move) is None and state.isLegalMove(best_move):
+                # The generator would only produce it after the children generated so far
+                unpacked = unpackMove(best_move)
+                self.children.insert(0, TreeNode(unpacked[0], unpacked[1]))
+            for child in self.children:
+                generator.skip(packMove(child.start, child.end))
+
+
+    """
+        Returns the child in a given position (None if there are no more children).
+        Children not generated yet are requested to the generator prepared by `generateChildren`.
+    """
+    cdef TreeNode getChild(self, int index, MoveGenerator generator=None):
+        cdef short move
+        cdef Move unpacked
+
+        if index < len(self.children):
+            return self.children[index]
+        if self.expanded or generator is None:
+            return None
+
+        move = generator.next()
+        if move == NO_MOVE:
+            self.expanded = True
+            return None
+        unpacked = unpackMove(move)
+        self.children.append(TreeNode(unpacked[0], unpacked[1]))
+        return self.children[index]
+
+    """
+        Returns the move that leads to this node packed with `packMove` (NO_MOVE for the root).
+    """
+    cdef short packedMove(self):
+        return NO_MOVE if self.start[0] < 0 else packMove(self.start, self.end)
+
+    """
+        Returns the child reached with a given move (packed with `packMove`).
+        Only the packed moves of the children are compared, the board is not needed.
+
+        Returns
+        -------
+            child : TreeNode|None
+                None if the move is not among the generated children.
+    """
+    cdef TreeNode findChild(self, short move):
+        cdef TreeNode child
+        if self.children is None: return None
+        for child in self.children:
+            if child.packedMove() == move: return child
+        return None
 
     cdef prioritizeChild(self, int index):
-        self.children.insert(0, self.children.pop(index))
\ No newline at end of file
+        self.children.insert(0, self.children.pop(index))
+
+    cdef void prioritizeMove(self, short move):
+        cdef int i
+        cdef TreeNode child
+
+        for i in range(len(self.children)):
+            child = self.children[i]
+            if packMove(child.start, child.end) == move:
+                if i > 0: self.prioritizeChild(i)
+                return
\ No newline at end of file
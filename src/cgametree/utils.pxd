@@ -3,9 +3,13 @@ ctypedef tuple[pos_t, pos_t] Coord
 ctypedef tuple[Coord, Coord] Move
 
 ctypedef float score_t
+ctypedef unsigned long long hash_t
 
 
 cdef Coord NULL_COORD
 
+cdef enum:
+    MAX_MOVES = 512 # Upper bound to the number of moves in a position
+
 
 cdef double getTime()
\ No newline at end of file
@@ -1,21 +1,69 @@
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 import subprocess
+from LocalServer import MatchServer, playInProcess, WHITE_WIN_TURN, BLACK_WIN_TURN, DRAW_TURN
+from Individual import WHITE, BLACK
 
 WHITE_WIN = "white win"
 BLACK_WIN = "black win"
 DRAW = "draw"
 
+# Where the games are refereed
+JAVA_REFEREE = "java"           # Tablut server (started with ant)
+LOCAL_REFEREE = "local"         # LocalServer.MatchServer, with the players connected through sockets
+INPROCESS_REFEREE = "inprocess" # LocalServer.playInProcess, with the trees of the players in this process
+REFEREES = [JAVA_REFEREE, LOCAL_REFEREE, INPROCESS_REFEREE]
+
+TURN_TO_WINNER = { WHITE_WIN_TURN: WHITE_WIN, BLACK_WIN_TURN: BLACK_WIN, DRAW_TURN: DRAW }
+
 
 class Environment:
-    def __init__(self, server_path:str, gui:bool=False):
+    def __init__(self, server_path:str, gui:bool=False, referee:str=JAVA_REFEREE, cython:bool=False):
+        if referee not in REFEREES: raise ValueError(f"Unknown referee {referee}")
         self.server_path = server_path
         self.gui = gui
+        self.referee = referee
+        self.cython = cython
+
+    """
+        Plays a game between two individuals
+        (each one plays with the given color, regardless of its own).
+
+        Returns
+        -------
+            winner : WHITE_WIN|BLACK_WIN|DRAW|None
+                None if the game could not be played.
+
+            white_moves, black_moves : int
+                Moves done by each player.
+    """
+    def playGame(self, white, black):
+        if self.referee == JAVA_REFEREE:
+            white.play(color=WHITE)
+            black.play(color=BLACK)
+            return self.startGame()
+        elif self.referee == LOCAL_REFEREE:
+            players = []
+            try:
+                server = MatchServer(timeout=max(white.timeout, black.timeout), white_port=0, black_port=0)
+                players = [ white.play(server.white_port, delay=0, color=WHITE), black.play(server.black_port, delay=0, color=BLACK) ]
+                turn, white_moves, black_moves = server.run()
+            except OSError as e:
+                # e.g. a player that did not connect
+                print(f"Cannot play the game: {e!r}")
+                return None, 0, 0
+            finally:
+                for player in players: player.join()
+        else:
+            turn, white_moves, black_moves = playInProcess(white.export(), black.export(), timeout=white.timeout, cython=self.cython)
+        return TURN_TO_WINNER[turn], white_moves, black_moves
 
     def startGame(self):
         subprocess.run(["ant", "compile"], cwd = self.server_path, capture_output = True)
         result = subprocess.run(
-            ["ant", "gui-server" if self.gui else "server"], 
+            ["ant", "gui-server" if self.gui else "server"],
             cwd = self.server_path,
-            capture_output = True, 
+            capture_output = True,
             text = True
         )
 
@@ -31,4 +79,4 @@ class Environment:
         else:
             winner = None
 
-        return winner, white_moves, black_moves
\ No newline at end of file
+        return winner, white_moves, black_moves
@@ -23,9 +23,9 @@ class Individual:
         self.timeout = timeout
         self.fitness = None
 
-    def __startPlayer(self):
-        time.sleep(1) # Just give some time for the server to init
-        my_color_str = 'white' if self.color == WHITE else 'black'
+    def __startPlayer(self, port, delay, color):
+        time.sleep(delay) # Just give some time for the server to init
+        my_color_str = 'white' if color == WHITE else 'black'
         weights = {
             "early": {
                 "positive": self.early_positive.genes,
@@ -42,16 +42,35 @@ class Individual:
         }
         try:
             print(f"Starting {my_color_str} player")
-            player = Player(my_color_str, weights=weights, timeout=self.timeout)
+            player = Player(my_color_str, weights=weights, timeout=self.timeout, server_port=port)
             player.play()
         except Exception as e:
             print(f"Cannot start {my_color_str} player: {e}")
 
     """
         Starts the player.
+
+        Parameters
+        ----------
+            port : int|None
+                Port of the server (the default one of the color if None).
+
+            delay : float
+                Seconds to wait before connecting to the server.
+
+            color : WHITE|BLACK|None
+                Color to play with (the one of the individual if None).
+
+        Returns
+        -------
+            thread : threading.Thread
+                Thread of the player.
     """
-    def play(self):
-        threading.Thread(target=self.__startPlayer).start()
+    def play(self, port:int|None=None, delay:float=1, color:WHITE|BLACK|None=None) -> threading.Thread:
+        color = self.color if color is None else color
+        thread = threading.Thread(target=self.__startPlayer, args=(port, delay, color))
+        thread.start()
+        return thread
 
 
     """
@@ -1,6 +1,7 @@
 from Individual import Individual, BLACK, WHITE
 from Chromosome import Chromosome
-from Environment import Environment, BLACK_WIN, WHITE_WIN, DRAW
+from Environment import BLACK_WIN, WHITE_WIN, DRAW
+from Tournament import Tournament
 import numpy as np
 from utils import softmax
 
@@ -39,41 +40,44 @@ class Population:
     
     """
         Makes each individual of this population to play against a given opponent.
-        The fitness of each individual is updated.
+        The fitness of each individual is updated with the mean score of its games.
+
+        Returns
+        -------
+            num_wins : int
+                Individuals that won most of their games.
     """
-    def fight(self, env:Environment, opponent:Individual, _logger, _epoch) -> int:
+    def fight(self, tournament:Tournament, opponent:Individual, _logger, _epoch) -> int:
         num_wins = 0
 
-        for i, indiv in enumerate(self.individuals):
-            indiv.play()
-            opponent.play()
-            print(f"Starting game engine -- Individual {i}")
-            winner, white_moves, black_moves = env.startGame()
-            print(f"{'WHITE WINS' if winner == WHITE_WIN else 'BLACK WINS' if winner == BLACK_WIN else 'DRAW'} | {white_moves} white moves, {black_moves} black moves")
-            indiv.fitness = self.fitness(winner, white_moves, black_moves)
-
-            if (winner == WHITE_WIN and self.color == WHITE) or (winner == BLACK_WIN and self.color == BLACK):
+        print(f"Starting game engine -- {len(self.individuals)} individuals, {tournament.games_per_indiv} games each")
+        results = tournament.play(self.individuals, opponent)
+        for indiv, games in zip(self.individuals, results):
+            indiv.fitness = float(np.mean([ self.fitness(winner, white_moves, black_moves, color) for color, winner, white_moves, black_moves in games ]))
+            wins = sum(1 for color, winner, _, _ in games if (winner == WHITE_WIN and color == WHITE) or (winner == BLACK_WIN and color == BLACK))
+            if wins > len(games) / 2:
                 num_wins += 1
 
-            _logger.update("whites" if self.color == WHITE else "blacks", self, _epoch)
-
+        _logger.update("whites" if self.color == WHITE else "blacks", self, _epoch)
         return num_wins
             
 
     """
         Computes the fitness score given the results of a game.
+        `color` is the one the individual played with (the one of the population if None).
     """
-    def fitness(self, winner, white_moves:int, black_moves:int):
+    def fitness(self, winner, white_moves:int, black_moves:int, color=None):
         # TODO Improve
         def score_f(x):
             return max(1, -0.18*x +10)
-        if self.color == BLACK and winner == BLACK_WIN:
+        color = self.color if color is None else color
+        if color == BLACK and winner == BLACK_WIN:
             return score_f(black_moves)
-        elif self.color == BLACK and winner == WHITE_WIN:
+        elif color == BLACK and winner == WHITE_WIN:
             return -score_f(black_moves)
-        elif self.color == WHITE and winner == WHITE_WIN:
+        elif color == WHITE and winner == WHITE_WIN:
             return score_f(white_moves)
-        elif self.color == WHITE and winner == BLACK_WIN:
+        elif color == WHITE and winner == BLACK_WIN:
             return -score_f(white_moves)
         else:
             return 0
@@ -0,0 +1,74 @@
+import multiprocessing
+from Individual import Individual, WHITE, BLACK
+from Environment import Environment, JAVA_REFEREE, WHITE_WIN, BLACK_WIN
+
+
+"""
+    Plays a game of a tournament (in a process of the pool).
+
+    Returns
+    -------
+        game_id : int
+            Position of the game in the schedule.
+
+        result : tuple[WHITE_WIN|BLACK_WIN|DRAW|None, int, int]
+            Winner and moves of each player.
+"""
+def playTournamentGame(game):
+    game_id, env, white, black = game
+    return game_id, env.playGame(white, black)
+
+
+"""
+    Schedules the games of the individuals of a population against an opponent.
+    Each individual plays `games_per_indiv` games (alternating its color if `swap_colors` is set)
+    and up to `parallel_games` games are played at the same time, each in its own process
+    with its own referee (i.e. a local server on free ports or the trees in the process).
+"""
+class Tournament:
+    def __init__(self, env:Environment, parallel_games:int=1, games_per_indiv:int=1, swap_colors:bool=False):
+        if parallel_games < 1: raise ValueError("At least one game at a time is required")
+        if games_per_indiv < 1: raise ValueError("At least one game per individual is required")
+        if parallel_games > 1 and env.referee == JAVA_REFEREE: raise ValueError("The Java server cannot host parallel games")
+        self.env = env
+        self.parallel_games = parallel_games
+        self.games_per_indiv = games_per_indiv
+        self.swap_colors = swap_colors
+
+
+    """
+        Plays the games of the individuals against the opponent.
+
+        Returns
+        -------
+            results : list[list[tuple[WHITE|BLACK, WHITE_WIN|BLACK_WIN|DRAW|None, int, int]]]
+                For each individual, the color it played with, the winner and the moves of each player of its games.
+    """
+    def play(self, individuals:list[Individual], opponent:Individual) -> list[list[tuple]]:
+        schedule = []
+        for i, indiv in enumerate(individuals):
+            for k in range(self.games_per_indiv):
+                swapped = self.swap_colors and (k % 2 == 1)
+                indiv_color = indiv.color if not swapped else (BLACK if indiv.color == WHITE else WHITE)
+                white, black = (indiv, opponent) if indiv_color == WHITE else (opponent, indiv)
+                schedule.append( (i, indiv_color, white, black) )
+
+        results = [ [None] * self.games_per_indiv for _ in individuals ]
+        games = [ (game_id, self.env, white, black) for game_id, (_, _, white, black) in enumerate(schedule) ]
+        if self.parallel_games == 1:
+            outcomes = map(playTournamentGame, games)
+            self.__collect(schedule, outcomes, results)
+        else:
+            with multiprocessing.Pool(min(self.parallel_games, len(games))) as pool:
+                self.__collect(schedule, pool.imap_unordered(playTournamentGame, games), results)
+        return results
+
+
+    def __collect(self, schedule, outcomes, results):
+        for game_id, (winner, white_moves, black_moves) in outcomes:
+            i, indiv_color, _, _ = schedule[game_id]
+            results[i][game_id % self.games_per_indiv] = (indiv_color, winner, white_moves, black_moves)
+            print(
+                f"Individual {i} ({'white' if indiv_color == WHITE else 'black'}) | " +
+                f"{'WHITE WINS' if winner == WHITE_WIN else 'BLACK WINS' if winner == BLACK_WIN else 'DRAW'} | {white_moves} white moves, {black_moves} black moves"
+            )
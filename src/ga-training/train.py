@@ -1,6 +1,7 @@
 import argparse
-from Environment import Environment
+from Environment import Environment, REFEREES, JAVA_REFEREE
 from Population import Population, WHITE, BLACK
+from Tournament import Tournament
 from Logger import Logger
 import json
 import os
@@ -62,6 +63,11 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(prog="Player's parameters training")
     parser.add_argument("-s", "--server-path", type=str, default="../../tablut-server/Tablut", help="Path to the Tablut server")
     parser.add_argument("-g", "--gui", action="store_true", default=False, help="Enable board GUI")
+    parser.add_argument("--referee", type=str.lower, default=JAVA_REFEREE, choices=REFEREES, help="Referee of the games (java server, local server or in-process trees)")
+    parser.add_argument("--cython", action="store_true", default=False, help="Use the compiled modules for the in-process games")
+    parser.add_argument("--parallel-games", type=int, default=1, help="Games played at the same time (each in its own process, not with the java referee)")
+    parser.add_argument("--games-per-indiv", type=int, default=1, help="Games played by each individual in an epoch")
+    parser.add_argument("--swap-colors", action="store_true", default=False, help="Alternate the color of the individuals between their games")
     parser.add_argument("-e", "--epochs", type=int, required=True, help="Number of epochs to train")
     parser.add_argument("-i", "--indivs", type=int, required=True, help="Number of individuals per population")
     parser.add_argument("-t", "--timeout", type=int, default=15, help="Time available for an individual to make a decision")
@@ -82,7 +88,8 @@ if __name__ == "__main__":
     if args.blacks_bootstrap is not None:
         blacks_starting_weights = loadCheckpoint(args.blacks_bootstrap)["weights"]
 
-    env = Environment(args.server_path, gui=args.gui)
+    env = Environment(args.server_path, gui=args.gui, referee=args.referee, cython=args.cython)
+    tournament = Tournament(env, parallel_games=args.parallel_games, games_per_indiv=args.games_per_indiv, swap_colors=args.swap_colors)
     white_population = Population(args.indivs, whites_starting_weights, WHITE, args.timeout)
     black_population = Population(args.indivs, blacks_starting_weights, BLACK, args.timeout)
     who_is_training = WHITE
@@ -101,7 +108,7 @@ if __name__ == "__main__":
             logger.update("whites", white_population, epoch+1)
             
             opponent = black_population.getBestIndividual()
-            num_wins = white_population.fight(env, opponent, logger, epoch+1)
+            num_wins = white_population.fight(tournament, opponent, logger, epoch+1)
 
             logger.update("whites", white_population, epoch+1)
             saveCheckpoint(args.output, "whites", epoch, white_population.getBestIndividual())
@@ -118,7 +125,7 @@ if __name__ == "__main__":
             logger.update("blacks", black_population, epoch+1)
             
             opponent = white_population.getBestIndividual()
-            num_wins = black_population.fight(env, opponent, logger, epoch+1)
+            num_wins = black_population.fight(tournament, opponent, logger, epoch+1)
 
             logger.update("blacks", black_population, epoch+1)
             saveCheckpoint(args.output, "blacks", epoch, black_population.getBestIndividual())
@@ -0,0 +1,182 @@
+from .State import (
+    State, EMPTY, BLACK, WHITE, KING, MAX_SCORE, MIN_SCORE,
+    ESCAPE_TILES, CAMP_DICT, CASTLE_TILE, BOARD_ROWS, BOARD_COLS, NEIGHBOURS,
+    PAWNS_WHITE, PAWNS_BLACK, PROXIMITY_WHITE, PROXIMITY_BLACK, SAFENESS_WHITE, SAFENESS_BLACK,
+    ESCAPE_PROXIMITY, KING_DANGER, N_FEATURES, WHITE_FEATURES, BLACK_FEATURES
+)
+import numpy as np
+import numpy.typing as npt
+
+
+"""
+    Evaluation of a batch of boards (array of shape (N, 9, 9)) with vectorized NumPy operations.
+    It computes the same features of `State.getFeatures` for all the boards in a single pass,
+    e.g. to score all the children of a frontier node or the positions of a logged game.
+"""
+
+# Ashton rules (see `State`)
+N_WHITES = 8
+N_BLACKS = 16
+MAX_DIST_TO_KING = 14
+MAX_DIST_TO_ESCAPE = 13
+
+"""
+    Lookup tables of the board, built once at import.
+"""
+BOARD_CELLS = BOARD_ROWS * BOARD_COLS
+ROWS, COLS = np.indices((BOARD_ROWS, BOARD_COLS))
+WALL_MASK = np.zeros((BOARD_ROWS, BOARD_COLS), dtype=bool)
+for pos in list(CAMP_DICT) + [CASTLE_TILE]: WALL_MASK[pos] = True
+CAMP_MASK = np.zeros((BOARD_ROWS, BOARD_COLS), dtype=bool)
+for pos in CAMP_DICT: CAMP_MASK[pos] = True
+# The walls of a board padded by one cell on each side (the padding is neither a wall nor empty)
+PADDED_WALL_MASK = np.pad(WALL_MASK, 1, constant_values=False)
+# Cells with both the capturing partners inside the board, for each axis
+VERTICAL_PARTNERS_MASK = (ROWS > 0) & (ROWS < BOARD_ROWS-1)
+HORIZONTAL_PARTNERS_MASK = (COLS > 0) & (COLS < BOARD_COLS-1)
+# ESCAPE_DISTANCES[idx, t] is the Manhattan distance between a cell and the t-th escape tile
+ESCAPE_INDEXES = np.array([ i*BOARD_COLS + j for i, j in ESCAPE_TILES ])
+ESCAPE_DISTANCES = np.array([
+    [ abs(idx // BOARD_COLS - i) + abs(idx % BOARD_COLS - j) for i, j in ESCAPE_TILES ]
+    for idx in range(BOARD_CELLS)
+])
+# NEIGHBOURS_MASK[idx] marks the cells orthogonally adjacent to a cell
+NEIGHBOURS_MASK = np.zeros((BOARD_CELLS, BOARD_CELLS), dtype=bool)
+for idx in range(BOARD_CELLS):
+    for i, j in NEIGHBOURS[idx]: NEIGHBOURS_MASK[idx, i*BOARD_COLS + j] = True
+
+
+"""
+    Computes the heuristic features of a batch of boards.
+    The features of boards without the king are meaningless (the game is over).
+
+    Parameters
+    ----------
+        boards : npt.NDArray[np.byte]
+            Boards of shape (N, 9, 9).
+
+    Returns
+    -------
+        features : npt.NDArray[np.float64]
+            Features of shape (N, N_FEATURES), indexed by the constants of this module.
+"""
+def batchFeatures(boards:npt.NDArray[np.byte]) -> npt.NDArray[np.float64]:
+    boards = np.asarray(boards)
+    n_boards = boards.shape[0]
+    features = np.empty((n_boards, N_FEATURES), dtype=np.float64)
+    whites = boards == WHITE
+    blacks = boards == BLACK
+    kings = boards == KING
+    king_idx = kings.reshape(n_boards, BOARD_CELLS).argmax(axis=1)
+
+    n_whites = whites.sum(axis=(1, 2))
+    n_blacks = blacks.sum(axis=(1, 2))
+    features[:, PAWNS_WHITE] = n_whites / N_WHITES
+    features[:, PAWNS_BLACK] = n_blacks / N_BLACKS
+
+    # Average Manhattan distance of the pawns to the king
+    dist_to_king = (np.abs(ROWS - (king_idx // BOARD_COLS)[:, None, None]) +
+                    np.abs(COLS - (king_idx % BOARD_COLS)[:, None, None]))
+    for feature, pawns, n_pawns in ((PROXIMITY_WHITE, whites, n_whites), (PROXIMITY_BLACK, blacks, n_blacks)):
+        total_dist = (dist_to_king * pawns).sum(axis=(1, 2))
+        avg_dist = np.where(n_pawns > 0, total_dist / np.maximum(n_pawns, 1), MAX_DIST_TO_KING)
+        features[:, feature] = 1 - (avg_dist / MAX_DIST_TO_KING)
+
+    # Threats on the pawns: a capturing element on one side of an axis and an empty cell on the other
+    padded = np.pad(boards, ((0, 0), (1, 1), (1, 1)), constant_values=-1)
+    padded_empty = padded == EMPTY
+    up, down = (slice(0, -2), slice(1, -1)), (slice(2, None), slice(1, -1))
+    left, right = (slice(1, -1), slice(0, -2)), (slice(1, -1), slice(2, None))
+    for feature, pawns, padded_capturers in (
+        (SAFENESS_WHITE, whites | kings, (padded == BLACK) | PADDED_WALL_MASK),
+        (SAFENESS_BLACK, blacks, (padded == WHITE) | (padded == KING) | PADDED_WALL_MASK)
+    ):
+        pawns = pawns & ~CAMP_MASK # Pawns inside a camp are not counted
+        threats = 0
+        total_threats = 0
+        for partners_mask, (side1, side2) in ((VERTICAL_PARTNERS_MASK, (down, up)), (HORIZONTAL_PARTNERS_MASK, (right, left))):
+            threatened = (
+                (padded_capturers[:, side1[0], side1[1]] & padded_empty[:, side2[0], side2[1]]) |
+                (padded_capturers[:, side2[0], side2[1]] & padded_empty[:, side1[0], side1[1]])
+            )
+            threats = threats + (pawns & partners_mask & threatened).sum(axis=(1, 2))
+            total_threats = total_threats + (pawns & partners_mask).sum(axis=(1, 2))
+        features[:, feature] = np.where(total_threats > 0, 1 - threats / np.maximum(total_threats, 1), 1)
+
+    # Distance of the king from the nearest free escape tile
+    free_escapes = boards.reshape(n_boards, BOARD_CELLS)[:, ESCAPE_INDEXES] == EMPTY
+    escape_dist = np.where(free_escapes, ESCAPE_DISTANCES[king_idx], MAX_DIST_TO_ESCAPE).min(axis=1)
+    features[:, ESCAPE_PROXIMITY] = 1 - (escape_dist / MAX_DIST_TO_ESCAPE)
+
+    # Black pawns around the king
+    features[:, KING_DANGER] = (blacks.reshape(n_boards, BOARD_CELLS) & NEIGHBOURS_MASK[king_idx]).sum(axis=1) / 4
+
+    return features
+
+
+"""
+    Determines the score of a batch of boards, as `State.evaluate` does for a single one.
+
+    Parameters
+    ----------
+        boards : npt.NDArray[np.byte]
+            Boards of shape (N, 9, 9).
+
+        player_color : BLACK|WHITE
+            For which player the scores are computed.
+
+        max_depth : int
+            Remaining depth of the boards, used to prefer the nearest wins.
+
+        positive_weights, negative_weights : list[float]
+            Weights to apply to the heuristics.
+
+    Returns
+    -------
+        scores : npt.NDArray[np.float64]
+            Score of each board.
+"""
+def batchEvaluate(boards:npt.NDArray[np.byte], player_color:BLACK|WHITE, max_depth:int, positive_weights:list[float], negative_weights:list[float]) -> npt.NDArray[np.float64]:
+    boards = np.asarray(boards)
+    features = batchFeatures(boards)
+    own_features, opponent_features = (WHITE_FEATURES, BLACK_FEATURES) if player_color == WHITE else (BLACK_FEATURES, WHITE_FEATURES)
+    scores = (features[:, list(own_features)] @ np.asarray(positive_weights, dtype=np.float64) -
+              features[:, list(opponent_features)] @ np.asarray(negative_weights, dtype=np.float64))
+
+    # Ended games
+    kings = boards.reshape(boards.shape[0], BOARD_CELLS) == KING
+    black_wins = ~kings.any(axis=1)
+    white_wins = kings[:, ESCAPE_INDEXES].any(axis=1)
+    win_score, loss_score = MAX_SCORE + max_depth, MIN_SCORE - max_depth
+    scores[white_wins] = win_score if player_color == WHITE else loss_score
+    scores[black_wins] = win_score if player_color == BLACK else loss_score
+    return scores
+
+
+"""
+    Determines the score of the positions reached with each move of a state.
+    The state is left unchanged.
+
+    Parameters
+    ----------
+        state : State
+            Position to expand.
+
+        moves : list[tuple[tuple[int, int], tuple[int, int]]]
+            Moves to score.
+
+        player_color, max_depth, positive_weights, negative_weights
+            Same parameters of `batchEvaluate`, with the remaining depth of the children.
+
+    Returns
+    -------
+        scores : npt.NDArray[np.float64]
+            Score of the position after each move.
+"""
+def evaluateChildren(state:State, moves:list[tuple[tuple[int, int], tuple[int, int]]], player_color:BLACK|WHITE, max_depth:int, positive_weights:list[float], negative_weights:list[float]) -> npt.NDArray[np.float64]:
+    boards = np.empty((len(moves), BOARD_ROWS, BOARD_COLS), dtype=np.byte)
+    for k, (start, end) in enumerate(moves):
+        captured = state.applyMove(start, end)
+        boards[k] = state.board
+        state.revertMove(start, end, captured)
+    return batchEvaluate(boards, player_color, max_depth, positive_weights, negative_weights)
@@ -0,0 +1,425 @@
+from __future__ import annotations
+import numpy as np
+import numpy.typing as npt
+from .State import (
+    State, EMPTY, BLACK, WHITE, KING, WHITE_WIN, BLACK_WIN, OPEN,
+    UP, DOWN, RIGHT, LEFT, VERTICAL, HORIZONTAL,
+    ESCAPE_TILES, CAMP_DICT, CASTLE_TILE, NEAR_CASTLE_TILES
+)
+import cython
+import logging
+logger = logging.getLogger(__name__)
+if not cython.compiled: logger.warning(f"Using non-compiled {__file__} module")
+
+
+N_ROWS = 9
+N_COLS = 9
+N_CELLS = N_ROWS * N_COLS
+FULL_MASK = (1 << N_CELLS) - 1
+
+# Same order used by State to generate the moves of a pawn
+DIRECTIONS = (RIGHT, UP, LEFT, DOWN)
+DIRECTION_DELTA = { RIGHT: (0, 1), UP: (-1, 0), LEFT: (0, -1), DOWN: (1, 0) }
+OPPOSITE_DIRECTION = { RIGHT: LEFT, UP: DOWN, LEFT: RIGHT, DOWN: UP }
+
+
+def cellIndex(i:int, j:int) -> int:
+    # Coordinates may come as numpy integers, which do not support shifts over 64 bits
+    return int(i)*N_COLS + int(j)
+
+def cellMask(i:int, j:int) -> int:
+    return 1 << cellIndex(i, j)
+
+def cellsMask(cells:list[tuple[int, int]]) -> int:
+    mask = 0
+    for i, j in cells: mask |= cellMask(i, j)
+    return mask
+
+def lowestBit(mask:int) -> int:
+    return (mask & -mask).bit_length() - 1
+
+def highestBit(mask:int) -> int:
+    return mask.bit_length() - 1
+
+def popCount(mask:int) -> int:
+    return bin(mask).count("1")
+
+
+COORDS = [ (idx // N_COLS, idx % N_COLS) for idx in range(N_CELLS) ]
+ROW_MASKS = [ cellsMask([(i, j) for j in range(N_COLS)]) for i in range(N_ROWS) ]
+COL_MASKS = [ cellsMask([(i, j) for i in range(N_ROWS)]) for j in range(N_COLS) ]
+
+ESCAPE_MASK = cellsMask(ESCAPE_TILES)
+CASTLE_MASK = cellMask(*CASTLE_TILE)
+NEAR_CASTLE_MASK = cellsMask(NEAR_CASTLE_TILES)
+CAMP_MASKS = [ cellsMask([pos for pos in CAMP_DICT if CAMP_DICT[pos] == n]) for n in range(4) ]
+CAMPS_MASK = cellsMask(CAMP_DICT.keys())
+WALLS_MASK = CAMPS_MASK | CASTLE_MASK
+
+
+def __buildRays() -> dict[int, list[int]]:
+    rays = {}
+    for direction in DIRECTIONS:
+        di, dj = DIRECTION_DELTA[direction]
+        rays[direction] = []
+        for i, j in COORDS:
+            mask = 0
+            ti, tj = i + di, j + dj
+            while (0 <= ti < N_ROWS) and (0 <= tj < N_COLS):
+                mask |= cellMask(ti, tj)
+                ti, tj = ti + di, tj + dj
+            rays[direction].append(mask)
+    return rays
+
+def __buildPartners(di:int, dj:int) -> list[int]:
+    partners = []
+    for i, j in COORDS:
+        if (0 <= i-di) and (i+di < N_ROWS) and (0 <= j-dj) and (j+dj < N_COLS):
+            partners.append(cellMask(i-di, j-dj) | cellMask(i+di, j+dj))
+        else:
+            partners.append(0)
+    return partners
+
+# Cells reachable from a cell towards a direction on an empty board (the cell itself excluded)
+RAYS = __buildRays()
+# The two cells that can capture a pawn along an axis (0 if the pawn is on the border of that axis)
+VERTICAL_PARTNERS = __buildPartners(1, 0)
+HORIZONTAL_PARTNERS = __buildPartners(0, 1)
+# The orthogonally adjacent cells of a cell
+ADJACENT_MASKS = [
+    sum( cellMask(i+di, j+dj) for di, dj in DIRECTION_DELTA.values() if (0 <= i+di < N_ROWS) and (0 <= j+dj < N_COLS) )
+    for i, j in COORDS
+]
+
+
+"""
+    Moves each cell of a mask by one step towards a direction.
+    Cells that go out of the board are dropped.
+"""
+def shiftMask(mask:int, direction:RIGHT|UP|LEFT|DOWN) -> int:
+    if direction == RIGHT:
+        return (mask << 1) & ~COL_MASKS[0] & FULL_MASK
+    elif direction == LEFT:
+        return (mask >> 1) & ~COL_MASKS[N_COLS-1]
+    elif direction == DOWN:
+        return (mask << N_COLS) & FULL_MASK
+    else:
+        return mask >> N_COLS
+
+
+"""
+    State of the game represented with bitboards.
+    Each type of piece is stored as a 81-bit mask (bit i*9+j represents the cell (i, j))
+    and move generation, captures and end of game are computed with mask operations.
+    The byte matrix of `State` is kept in sync so that the heuristics and
+    the rest of the code can use this class as a drop-in replacement.
+"""
+class BitboardState(State):
+    def __init__(self, board: npt.NDArray[np.byte], is_white_turn: bool, rules="ashton"):
+        if rules != "ashton":
+            raise ValueError("Bitboards are only available for the ashton rules")
+        super().__init__(board, is_white_turn, rules)
+
+        self.white_mask = 0
+        self.black_mask = 0
+        self.king_mask = 0
+        for i, j in zip(*np.nonzero(board)):
+            mask = cellMask(i, j)
+            if board[i, j] == WHITE: self.white_mask |= mask
+            elif board[i, j] == BLACK: self.black_mask |= mask
+            elif board[i, j] == KING: self.king_mask |= mask
+
+
+    """
+        Determines the possible allowed moves from the current state of the booard.
+        Moves are grouped in the same way as `State.getMoves`.
+
+        Returns
+        -------
+            critical_moves : list[tuple[tuple[int, int], tuple[int, int]]]
+                List of tuples (from, start) of critical moves.
+
+            other_moves : list[tuple[tuple[int, int], tuple[int, int]]]
+                List of tuples (from, start) of the remaining moves.
+    """
+    def getMoves(self) -> tuple[list[tuple[tuple[int, int], tuple[int, int]]], list[tuple[tuple[int, int], tuple[int, int]]]]:
+        king_idx = highestBit(self.king_mask)
+        king_i, king_j = COORDS[king_idx]
+        occupied = self.white_mask | self.black_mask | self.king_mask
+
+        king_moves = []
+        same_king_axis_moves = []
+        near_king_moves = []
+        capturing_moves = []
+        other_moves = []
+
+        same_axis_mask = ROW_MASKS[king_i] | COL_MASKS[king_j]
+        near_axis_mask = 0
+        if king_i > 0: near_axis_mask |= ROW_MASKS[king_i-1]
+        if king_i < N_ROWS-1: near_axis_mask |= ROW_MASKS[king_i+1]
+        if king_j > 0: near_axis_mask |= COL_MASKS[king_j-1]
+        if king_j < N_COLS-1: near_axis_mask |= COL_MASKS[king_j+1]
+        near_axis_mask &= ~same_axis_mask
+        capture_mask = self.__capturingCells() & ~(same_axis_mask | near_axis_mask)
+        other_mask = ~(same_axis_mask | near_axis_mask | capture_mask)
+
+        if self.is_white_turn:
+            # If White turn, check KING moves
+            for direction in DIRECTIONS:
+                self.__appendMoves(king_moves, king_idx, direction, self.__movesMask(king_idx, direction, occupied | WALLS_MASK))
+            pawns = self.white_mask
+        else:
+            pawns = self.black_mask
+
+        while pawns:
+            idx = lowestBit(pawns)
+            pawns ^= 1 << idx
+            obstacles = occupied | self.__wallsFor(idx)
+            for direction in DIRECTIONS:
+                moves = self.__movesMask(idx, direction, obstacles)
+                if moves == 0: continue
+                self.__appendMoves(same_king_axis_moves, idx, direction, moves & same_axis_mask)
+                self.__appendMoves(near_king_moves, idx, direction, moves & near_axis_mask)
+                self.__appendMoves(capturing_moves, idx, direction, moves & capture_mask)
+                self.__appendMoves(other_moves, idx, direction, moves & other_mask)
+
+        return king_moves + same_king_axis_moves + near_king_moves + capturing_moves, other_moves
+
+
+    """
+        Mask of the walls that block a pawn in a given cell.
+        A black pawn inside a camp can move through its own camp.
+    """
+    def __wallsFor(self, idx:int) -> int:
+        pawn_mask = 1 << idx
+        if (self.black_mask & pawn_mask) and (CAMPS_MASK & pawn_mask):
+            return WALLS_MASK & ~CAMP_MASKS[CAMP_DICT[COORDS[idx]]]
+        return WALLS_MASK
+
+
+    """
+        Mask of the cells reachable by sliding from a cell towards a direction
+        until the first obstacle.
+    """
+    def __movesMask(self, idx:int, direction:RIGHT|UP|LEFT|DOWN, obstacles:int) -> int:
+        ray = RAYS[direction][idx]
+        blockers = ray & obstacles
+        if blockers == 0: return ray
+        if direction == RIGHT or direction == DOWN:
+            first_blocker = lowestBit(blockers)
+        else:
+            first_blocker = highestBit(blockers)
+        return ray & ~(RAYS[direction][first_blocker] | (1 << first_blocker))
+
+
+    """
+        Appends the moves in a mask to a list following the order of the steps.
+    """
+    def __appendMoves(self, out:list, idx:int, direction:RIGHT|UP|LEFT|DOWN, moves:int):
+        start = COORDS[idx]
+        if direction == RIGHT or direction == DOWN:
+            while moves:
+                target = lowestBit(moves)
+                moves ^= 1 << target
+                out.append((start, COORDS[target]))
+        else:
+            while moves:
+                target = highestBit(moves)
+                moves ^= 1 << target
+                out.append((start, COORDS[target]))
+
+
+    """
+        Determines the empty cells where a pawn of the player to move
+        would capture an opponent pawn with a normal (two sided) capture.
+    """
+    def __capturingCells(self) -> int:
+        if self.is_white_turn:
+            allies = self.white_mask | self.king_mask
+            victims_groups = (
+                (self.black_mask & ~CAMPS_MASK, allies | WALLS_MASK),
+                (self.black_mask & CAMPS_MASK, allies),
+            )
+        else:
+            allies = self.black_mask | WALLS_MASK
+            victims_groups = (
+                (self.white_mask | (self.king_mask & ~(CASTLE_MASK | NEAR_CASTLE_MASK)), allies),
+            )
+
+        cells = 0
+        for victims, partners in victims_groups:
+            if victims == 0: continue
+            for direction in DIRECTIONS:
+                opposite = OPPOSITE_DIRECTION[direction]
+                # Victims with a partner on the other side, moved to the cell to reach
+                cells |= shiftMask(victims & shiftMask(partners, opposite), opposite)
+        return cells & ~(self.white_mask | self.black_mask | self.king_mask)
+
+
+    """
+        Applies a move in the board.
+        It is assumed that the move is valid.
+
+        Parameters
+        ----------
+            start : tuple[int, int]
+                Coordinates of the starting position.
+
+            end : tuple[int, int]
+                Coordinates of the destination.
+
+        Returns
+        -------
+            captures : list[tuple[tuple[int, int], BLACK|WHITE|KING]]
+                List of the pawns captured with this move.
+    """
+    def applyMove(self, start:tuple[int, int], end:tuple[int, int]) -> list[tuple[tuple[int, int], BLACK|WHITE|KING]]:
+        captured = []
+        pawn = self.board[start[0], start[1]]
+        self.__togglePawn(pawn, (1 << cellIndex(start[0], start[1])) | (1 << cellIndex(end[0], end[1])))
+
+        # Applies move
+        self.board[end[0], end[1]] = pawn
+        self.board[start[0], start[1]] = EMPTY
+        self.updateHash(start[0], start[1], pawn)
+        self.updateHash(end[0], end[1], pawn)
+        self.updatePieces(start[0], start[1], pawn)
+        self.updatePieces(end[0], end[1], pawn)
+        if pawn == KING: self.king_pos = end
+
+        # Checks if the adjacent pieces have been captured
+        for di, dj, axis in ((1, 0, VERTICAL), (-1, 0, VERTICAL), (0, 1, HORIZONTAL), (0, -1, HORIZONTAL)):
+            i, j = end[0]+di, end[1]+dj
+            if self.isCaptured(i, j, to_filter_axis=axis):
+                captured_pawn = self.board[i, j]
+                captured.append( ((i, j), captured_pawn) )
+                self.__togglePawn(captured_pawn, 1 << cellIndex(i, j))
+                self.updateHash(i, j, captured_pawn)
+                self.updatePieces(i, j, captured_pawn)
+                if captured_pawn == KING: self.king_pos = None
+                self.board[i, j] = EMPTY
+
+        self.flipTurn()
+
+        return captured
+
+
+    """
+        Reverts a move and restores captured pawns.
+        It is assumed that the parameters are correct.
+
+        Parameters
+        ----------
+            old_start : tuple[int, int]
+                Old starting point of the move to revert.
+
+            old_end : tuple[int, int]
+                Old destination of the move to revert.
+
+            captured : list[tuple[tuple[int, int], BLACK|WHITE|KING]]
+                List of pawns the move to revert captured.
+    """
+    def revertMove(self, old_start:tuple[int, int], old_end:tuple[int, int], captured:list[tuple[tuple[int, int], BLACK|WHITE|KING]]):
+        pawn = self.board[old_end[0], old_end[1]]
+        self.__togglePawn(pawn, (1 << cellIndex(old_start[0], old_start[1])) | (1 << cellIndex(old_end[0], old_end[1])))
+
+        # Reverts move
+        self.board[old_start[0], old_start[1]] = pawn
+        self.board[old_end[0], old_end[1]] = EMPTY
+        self.updateHash(old_start[0], old_start[1], pawn)
+        self.updateHash(old_end[0], old_end[1], pawn)
+        self.updatePieces(old_start[0], old_start[1], pawn)
+        self.updatePieces(old_end[0], old_end[1], pawn)
+        if pawn == KING: self.king_pos = old_start
+
+        # Reverts captured pawn
+        for pos, captured_pawn in captured:
+            self.__togglePawn(captured_pawn, 1 << cellIndex(pos[0], pos[1]))
+            self.board[pos[0], pos[1]] = captured_pawn
+            self.updateHash(pos[0], pos[1], captured_pawn)
+            self.updatePieces(pos[0], pos[1], captured_pawn)
+            if captured_pawn == KING: self.king_pos = pos
+
+        self.flipTurn()
+
+
+    def __togglePawn(self, pawn:BLACK|WHITE|KING, mask:int):
+        if pawn == WHITE: self.white_mask ^= mask
+        elif pawn == BLACK: self.black_mask ^= mask
+        elif pawn == KING: self.king_mask ^= mask
+
+
+    """
+        Determines the status of the current board.
+
+        Returns
+        -------
+            game_state : BLACK_WIN | WHITE_WIN | OPEN
+    """
+    def getGameState(self) -> BLACK_WIN | WHITE_WIN | OPEN:
+        if self.king_mask == 0:
+            return BLACK_WIN
+        elif self.king_mask & ESCAPE_MASK:
+            return WHITE_WIN
+        return OPEN
+
+
+    def isWall(self, i: int, j: int) -> bool:
+        return (WALLS_MASK >> cellIndex(i, j)) & 1 == 1
+
+
+    """
+        Checks if there is a capture in a given position (i, j).
+        Same rules of `State.isCaptured`, computed on the masks.
+    """
+    def isCaptured(self, i: int, j: int, to_filter_axis:None|VERTICAL|HORIZONTAL=None) -> bool:
+        if not self.isValidCell(i, j): return False
+
+        idx = cellIndex(i, j)
+        pawn_mask = 1 << idx
+
+        if self.king_mask & pawn_mask:
+            # King captured in castle
+            if pawn_mask & CASTLE_MASK:
+                return (ADJACENT_MASKS[idx] & self.black_mask) == ADJACENT_MASKS[idx]
+            # King captured near castle
+            if pawn_mask & NEAR_CASTLE_MASK:
+                return popCount(ADJACENT_MASKS[idx] & self.black_mask) == 3
+            hostile = self.black_mask | WALLS_MASK
+        elif self.white_mask & pawn_mask:
+            hostile = self.black_mask | WALLS_MASK
+        elif self.black_mask & pawn_mask:
+            hostile = self.white_mask | self.king_mask
+            if not (pawn_mask & CAMPS_MASK): hostile |= WALLS_MASK
+        else:
+            return False
+
+        # Normal capture
+        if to_filter_axis is None or to_filter_axis == VERTICAL:
+            partners = VERTICAL_PARTNERS[idx]
+            if partners != 0 and (hostile & partners) == partners: return True
+        if to_filter_axis is None or to_filter_axis == HORIZONTAL:
+            partners = HORIZONTAL_PARTNERS[idx]
+            if partners != 0 and (hostile & partners) == partners: return True
+        return False
+
+
+    """
+        Determines the number of steps a pawn can do towards a direction.
+
+        Parameters
+        ----------
+            i, j: int
+                Row and column of the pawn.
+
+            direction : RIGHT | UP | LEFT | DOWN
+                Direction to check.
+
+        Returns
+        -------
+            num_steps : int
+    """
+    def numSteps(self, i:int, j:int, direction:RIGHT|UP|LEFT|DOWN) -> int:
+        idx = cellIndex(i, j)
+        occupied = self.white_mask | self.black_mask | self.king_mask
+        return popCount(self.__movesMask(idx, direction, occupied | self.__wallsFor(idx)))
@@ -0,0 +1,92 @@
+from .State import State
+import numpy as np
+import cython
+import logging
+logger = logging.getLogger(__name__)
+if not cython.compiled: logger.warning(f"Using non-compiled {__file__} module")
+
+
+EMPTY_PHASE = -1
+
+# Layout of an entry of the cache
+ENTRY_DTYPE = np.dtype([
+    ("key", np.int64),
+    ("value", np.float64),
+    ("phase", np.int8),
+])
+
+
+"""
+    Direct-mapped cache of the static evaluations of the states, preallocated in a single array.
+    A state is mapped to a slot with the low bits of its normalized hash (the heuristics do not change with the symmetries of the board)
+    and a new score always replaces the one in its slot.
+    Scores are stored with the phase of the weights they have been computed with, so that
+    the entries of the previous phases are not reused when the weights change.
+    Unlike the transposition table, the scores do not depend on the depth of the search.
+"""
+class EvaluationCache:
+    """
+        Parameters
+        ----------
+            size_mb : float
+                Maximum memory (in MB) the cache can use.
+    """
+    def __init__(self, size_mb:float):
+        n_slots = 1
+        while (2*n_slots * ENTRY_DTYPE.itemsize) <= (size_mb * 2**20):
+            n_slots *= 2
+        self.n_slots = n_slots
+        self.slot_mask = n_slots - 1
+
+        self.table = np.zeros(n_slots, dtype=ENTRY_DTYPE)
+        self.table["phase"] = EMPTY_PHASE
+        self.keys = self.table["key"]
+        self.values = self.table["value"]
+        self.phases = self.table["phase"]
+
+
+    """
+        Stores the static evaluation of a state.
+        It does not allocate memory.
+
+        Parameters
+        ----------
+            state : State
+
+            phase : int
+                Phase of the weights used to evaluate the state.
+
+            value : float
+    """
+    def setScore(self, state:State, phase:int, value:float):
+        key = state.hash(normalize=True)
+        slot = key & self.slot_mask
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.phases[slot] = phase
+
+
+    """
+        Returns the static evaluation of a state, if cached.
+
+        Parameters
+        ----------
+            state : State
+
+            phase : int
+                Phase of the weights in use.
+
+        Returns
+        -------
+            value : float|None
+    """
+    def getScore(self, state:State, phase:int) -> float|None:
+        key = state.hash(normalize=True)
+        slot = key & self.slot_mask
+        if (self.phases[slot] == phase) and (self.keys[slot] == key):
+            return float(self.values[slot])
+        return None
+
+
+    def __str__(self):
+        return f"{np.sum(self.phases != EMPTY_PHASE)}/{len(self.table)} entries, {self.table.nbytes / 2**20:.1f} MB"
@@ -0,0 +1,119 @@
+from .State import State
+from .TranspositionTable import NO_MOVE, packMove, unpackMove
+from .MoveOrdering import MoveOrdering
+import cython
+import logging
+logger = logging.getLogger(__name__)
+if not cython.compiled: logger.warning(f"Using non-compiled {__file__} module")
+
+
+# Stages of the generation
+STAGE_TT = 0
+STAGE_CRITICAL = 1
+STAGE_KILLERS = 2
+STAGE_QUIET = 3
+STAGE_DONE = 4
+
+
+"""
+    Staged generator of the moves of a position.
+    Moves are produced one at a time in the order:
+        1. Best move of the transposition table.
+        2. Moves of the king and moves that capture.
+        3. Killer moves and countermove.
+        4. Remaining moves sorted by the history heuristic.
+    Each stage is computed only when the previous ones are exhausted,
+    so positions that cut off early do not pay for the full generation.
+"""
+class MoveGenerator:
+    """
+        Parameters
+        ----------
+            ordering : MoveOrdering
+                Source of the killer moves and of the history scores.
+    """
+    def __init__(self, ordering:MoveOrdering):
+        self.ordering = ordering
+        self.state = None
+        self.stage = STAGE_DONE
+        self.tt_move = NO_MOVE
+        self.ply = 0
+        self.prev_move = NO_MOVE
+        self.moves = []
+        self.next_index = 0
+        self.generated = set()
+
+
+    """
+        Starts the generation of the moves of a position.
+
+        Parameters
+        ----------
+            state : State
+                Position to generate the moves of. It must not change while the generator is used.
+
+            tt_move : int
+                Move (packed with `packMove`) of the transposition table.
+
+            ply : int
+                Distance of the position from the root.
+
+            prev_move : int
+                Move of the opponent that lead to the position (NO_MOVE if unknown).
+    """
+    def reset(self, state:State, tt_move:int=NO_MOVE, ply:int=0, prev_move:int=NO_MOVE):
+        self.state = state
+        self.stage = STAGE_TT
+        self.tt_move = tt_move
+        self.ply = ply
+        self.prev_move = prev_move
+        self.moves = []
+        self.next_index = 0
+        self.generated.clear()
+
+
+    """
+        Marks a move as already generated (e.g. because already known by the caller), so that it is skipped.
+    """
+    def skip(self, move:int):
+        self.generated.add(move)
+
+
+    """
+        Returns the next move packed with `packMove` (NO_MOVE when all the moves have been generated).
+    """
+    def next(self) -> int:
+        while True:
+            # Moves already computed by the current stage
+            while self.next_index < len(self.moves):
+                move = self.moves[self.next_index]
+                self.next_index += 1
+                if move not in self.generated:
+                    self.generated.add(move)
+                    return move
+
+            if self.stage == STAGE_TT:
+                self.stage = STAGE_CRITICAL
+                if self.tt_move != NO_MOVE and self.__isLegal(self.tt_move):
+                    self.moves = [self.tt_move]
+                else:
+                    self.moves = []
+            elif self.stage == STAGE_CRITICAL:
+                self.stage = STAGE_KILLERS
+                self.moves = [ packMove(start, end) for start, end in self.state.getKingMoves() + self.state.getCapturingMoves() ]
+            elif self.stage == STAGE_KILLERS:
+                self.stage = STAGE_QUIET
+                killers = self.ordering.getKillers(self.ply, self.state.is_white_turn, self.prev_move)
+                self.moves = [ move for move in killers if (move not in self.generated) and self.__isLegal(move) ]
+            elif self.stage == STAGE_QUIET:
+                self.stage = STAGE_DONE
+                self.moves = [ packMove(start, end) for start, end in self.state.getPawnsMoves() ]
+                self.ordering.sortMoves(self.moves, 0, len(self.moves), self.ply, self.state.is_white_turn, self.prev_move)
+            else:
+                return NO_MOVE
+            self.next_index = 0
+
+
+    def __isLegal(self, move:int) -> bool:
+        start, end = unpackMove(move)
+        return self.state.isLegalMove(start, end)
@@ -0,0 +1,132 @@
+from .TranspositionTable import NO_MOVE
+import cython
+import logging
+logger = logging.getLogger(__name__)
+if not cython.compiled: logger.warning(f"Using non-compiled {__file__} module")
+
+
+KILLERS_PER_PLY = 2
+HISTORY_SIZE = 81*81 # Indexed by packed move (from/to)
+HISTORY_MAX = 1 << 20 # When reached, the history table is halved
+KILLER_SCORE = 1 << 22
+COUNTERMOVE_SCORE = 1 << 21
+
+
+"""
+    Dynamic ordering of the quiet moves of the search.
+    Moves that caused a beta cutoff are remembered as killer moves of their ply,
+    rewarded in a from/to history table and as reply (countermove) to the previous move.
+    Tables are kept separately for each side.
+"""
+class MoveOrdering:
+    """
+        Parameters
+        ----------
+            max_ply : int
+                Maximum distance from the root the killer moves are stored for.
+    """
+    def __init__(self, max_ply:int):
+        self.max_ply = max_ply
+        self.killers = [ [NO_MOVE] * KILLERS_PER_PLY for _ in range(max_ply) ]
+        self.history = [ [0] * HISTORY_SIZE for _ in range(2) ]
+        self.countermoves = [ [NO_MOVE] * HISTORY_SIZE for _ in range(2) ]
+
+
+    """
+        Prepares the tables for the search of a new turn.
+        Killer moves are tied to the distance from the root so they are cleared,
+        the history is aged so that recent cutoffs weight more.
+    """
+    def decay(self):
+        for killers in self.killers:
+            for k in range(KILLERS_PER_PLY):
+                killers[k] = NO_MOVE
+        for history in self.history:
+            for move in range(HISTORY_SIZE):
+                history[move] >>= 1
+
+
+    """
+        Rewards a quiet move that caused a beta cutoff.
+
+        Parameters
+        ----------
+            move : int
+                Move packed with `packMove`.
+
+            ply : int
+                Distance from the root.
+
+            depth : int
+                Remaining depth of the search at the cutoff.
+
+            is_white_turn : bool
+                Side that played the move.
+
+            prev_move : int
+                Move of the opponent that lead to the position (NO_MOVE if unknown).
+    """
+    def recordCutoff(self, move:int, ply:int, depth:int, is_white_turn:bool, prev_move:int=NO_MOVE):
+        side = 0 if is_white_turn else 1
+
+        if ply < self.max_ply and self.killers[ply][0] != move:
+            killers = self.killers[ply]
+            for k in range(KILLERS_PER_PLY-1, 0, -1):
+                killers[k] = killers[k-1]
+            killers[0] = move
+
+        history = self.history[side]
+        history[move] += depth*depth
+        if history[move] >= HISTORY_MAX:
+            for m in range(HISTORY_SIZE):
+                history[m] >>= 1
+
+        if prev_move != NO_MOVE:
+            self.countermoves[side][prev_move] = move
+
+
+    """
+        Returns the killer moves of a ply followed by the countermove of the previous move.
+        Moves may repeat and are not guaranteed to be legal in the current position.
+    """
+    def getKillers(self, ply:int, is_white_turn:bool, prev_move:int=NO_MOVE) -> list[int]:
+        killers = self.killers[ply] if ply < self.max_ply else []
+        countermove = self.countermoves[0 if is_white_turn else 1][prev_move] if prev_move != NO_MOVE else NO_MOVE
+        return [ move for move in (*killers, countermove) if move != NO_MOVE ]
+
+
+    """
+        Sorts (in place) a range of packed moves from the most to the least promising.
+        Killer moves come first, then the countermove and then the others by history score.
+        The relative order of moves with the same score is kept.
+
+        Parameters
+        ----------
+            moves : list[int]
+                Moves packed with `packMove`.
+
+            start, end : int
+                Range of `moves` to sort.
+
+            ply : int
+                Distance from the root.
+
+            is_white_turn : bool
+                Side to move.
+
+            prev_move : int
+                Move of the opponent that lead to the position (NO_MOVE if unknown).
+    """
+    def sortMoves(self, moves:list[int], start:int, end:int, ply:int, is_white_turn:bool, prev_move:int=NO_MOVE):
+        side = 0 if is_white_turn else 1
+        history = self.history[side]
+        killers = self.killers[ply] if ply < self.max_ply else [NO_MOVE] * KILLERS_PER_PLY
+        countermove = self.countermoves[side][prev_move] if prev_move != NO_MOVE else NO_MOVE
+
+        def score(move):
+            for k in range(KILLERS_PER_PLY):
+                if move == killers[k]: return KILLER_SCORE - k
+            if move == countermove: return COUNTERMOVE_SCORE
+            return history[move]
+
+        moves[start:end] = sorted(moves[start:end], key=score, reverse=True)
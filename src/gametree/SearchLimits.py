@@ -0,0 +1,100 @@
+import numpy as np
+import time
+import cython
+import logging
+logger = logging.getLogger(__name__)
+if not cython.compiled: logger.warning(f"Using non-compiled {__file__} module")
+
+
+NO_LIMIT = 0
+POLL_PERIOD = 0.002 # Seconds between two checks of the clock (and of the interruption)
+MIN_POLL_INTERVAL = 16
+MAX_POLL_INTERVAL = 1 << 16
+
+# Nodes searched between two checks of the clock.
+# It is calibrated on the speed of the search, so that the clock is read about every `POLL_PERIOD` seconds,
+# and kept between searches.
+poll_interval = MIN_POLL_INTERVAL
+
+
+"""
+    Limits of a search: deadline, number of nodes, depth and external interruption.
+    The search counts its nodes with `tick` and the clock is read only every `poll_interval` nodes,
+    so that the deadline check does not cost a system call for each node.
+    The node limit is checked exactly, making fixed nodes searches reproducible.
+"""
+class SearchLimits:
+    """
+        Parameters
+        ----------
+            deadline : float
+                Timestamp at which the search stops.
+
+            max_nodes : int
+                Maximum number of nodes to search (NO_LIMIT for unlimited).
+
+            max_depth : int
+                Maximum depth of the iterative deepening (NO_LIMIT for unlimited).
+
+            is_interrupted : Callable[[], bool]|None
+                Polled with the clock, the search stops as soon as it returns True.
+    """
+    def __init__(self, deadline:float=np.inf, max_nodes:int=NO_LIMIT, max_depth:int=NO_LIMIT, is_interrupted=None):
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.is_interrupted = is_interrupted
+        self.nodes = 0
+        self.stopped = False
+        self.last_poll_nodes = 0
+        self.last_poll_time = time.time()
+        self.next_poll = self.__nextPoll()
+
+
+    """
+        Counts a searched node.
+
+        Returns
+        -------
+            stopped : bool
+                True if the search has to stop.
+    """
+    def tick(self) -> bool:
+        self.nodes += 1
+        if self.nodes >= self.next_poll: self.__poll()
+        return self.stopped
+
+
+    """
+        Checks all the limits and recalibrates the polling interval.
+    """
+    def __poll(self):
+        global poll_interval
+        now = time.time()
+        if now > self.last_poll_time:
+            nodes_per_second = (self.nodes - self.last_poll_nodes) / (now - self.last_poll_time)
+            poll_interval = int(min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, nodes_per_second * POLL_PERIOD)))
+        self.last_poll_nodes = self.nodes
+        self.last_poll_time = now
+
+        if ((now >= self.deadline) or
+            (self.max_nodes != NO_LIMIT and self.nodes >= self.max_nodes) or
+            (self.is_interrupted is not None and self.is_interrupted())):
+            self.stopped = True
+        self.next_poll = self.__nextPoll()
+
+
+    """
+        Returns the node count at which the limits are checked again.
+    """
+    def __nextPoll(self) -> int:
+        if self.max_nodes != NO_LIMIT:
+            return min(self.nodes + poll_interval, self.max_nodes)
+        return self.nodes + poll_interval
+
+
+    """
+        Returns the deepest iteration allowed.
+    """
+    def depthLimit(self, max_ply:int) -> int:
+        return max_ply if self.max_depth == NO_LIMIT else min(max_ply, self.max_depth)
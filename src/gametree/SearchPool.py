@@ -0,0 +1,122 @@
+import multiprocessing
+import time
+import cython
+import logging
+logger = logging.getLogger(__name__)
+if not cython.compiled: logger.warning(f"Using non-compiled {__file__} module")
+
+
+COLLECT_GRACE = 0.2 # Seconds the helpers are waited for after they are stopped
+STOP = "stop" # Message that interrupts the current search of the helpers
+
+
+"""
+    Main loop of a helper process.
+    The helper owns a compact tree attached to the shared transposition table
+    and searches the positions it receives.
+    A search is interrupted as soon as a new message is available (the stop request of the main search).
+"""
+def searchHelper(conn, helper_id:int, tree_class, state_class, player_color, weights:dict, tt_mb:float, tt_name:str, search:str, quiescence:bool, null_move:bool, lmr:bool):
+    tree = tree_class(None, player_color, weights, tt_mb, compact=True, search=search, tt_name=tt_name, quiescence=quiescence, null_move=null_move, lmr=lmr)
+    try:
+        while (job := conn.recv()) is not None:
+            if job == STOP: continue # The search already ended
+            job_id, board, is_white_turn, turns_count, end_timestamp = job
+            # Helpers with an odd id search one ply deeper to desynchronize from the main search
+            depth, best_move, best_score = tree.searchPosition(state_class(board, is_white_turn), turns_count, end_timestamp, 1 + helper_id % 2, conn.poll)
+            conn.send( (job_id, depth, best_move, best_score) )
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        tree.close()
+
+
+"""
+    Pool of helper processes for the Lazy SMP search.
+    Every helper searches the same position of the main search independently
+    and they cooperate only through the shared transposition table.
+"""
+class SearchPool:
+    """
+        Parameters
+        ----------
+            n_helpers : int
+                Number of helper processes.
+
+            tree_class, state_class : type
+                Classes used by the helpers to build their tree and the positions to search.
+
+            player_color, weights, tt_mb, search, quiescence, null_move, lmr
+                Same parameters of the main tree.
+
+            tt_name : str
+                Name of the shared memory block of the transposition table.
+    """
+    def __init__(self, n_helpers:int, tree_class, state_class, player_color, weights:dict, tt_mb:float, tt_name:str, search:str, quiescence:bool, null_move:bool, lmr:bool):
+        self.job_id = 0
+        self.connections = []
+        self.processes = []
+        for i in range(n_helpers):
+            conn, helper_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target = searchHelper,
+                args = (helper_conn, i+1, tree_class, state_class, player_color, weights, tt_mb, tt_name, search, quiescence, null_move, lmr),
+                daemon = True
+            )
+            process.start()
+            self.connections.append(conn)
+            self.processes.append(process)
+
+
+    """
+        Starts the search of a position on all the helpers.
+    """
+    def start(self, board, is_white_turn:bool, turns_count:int, end_timestamp:float):
+        self.job_id += 1
+        for conn in self.connections:
+            conn.send( (self.job_id, board, is_white_turn, turns_count, end_timestamp) )
+
+
+    """
+        Interrupts the search of the helpers.
+    """
+    def stop(self):
+        for conn in self.connections:
+            conn.send(STOP)
+
+
+    """
+        Waits for the results of the last search.
+        Results that are late or belong to older searches are discarded.
+
+        Returns
+        -------
+            results : list[tuple[int, int, float]]
+                Depth, best move (packed) and score found by each helper that answered.
+    """
+    def collect(self, grace:float=COLLECT_GRACE) -> list[tuple[int, int, float]]:
+        results = []
+        deadline = time.time() + grace
+        for conn in self.connections:
+            while conn.poll(max(0, deadline - time.time())):
+                job_id, depth, best_move, best_score = conn.recv()
+                if job_id == self.job_id:
+                    results.append( (depth, best_move, best_score) )
+                    break
+        return results
+
+
+    """
+        Stops the helpers.
+    """
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive(): process.terminate()
+        self.connections = []
+        self.processes = []
@@ -29,6 +29,7 @@ UP = 7
 DOWN = 8
 RIGHT = 9
 LEFT = 10
+OPPOSITE_DIRECTION = { RIGHT: LEFT, UP: DOWN, LEFT: RIGHT, DOWN: UP }
 
 VERTICAL = 11
 HORIZONTAL = 12
@@ -62,8 +63,68 @@ CAMP_DICT = {
 CASTLE_TILE = (4, 4)
 NEAR_CASTLE_TILES = [(3, 4), (5, 4), (4, 3), (4, 5)]
 
-zobrist_table = np.random.randint(-1e8, 1e8, size=(9, 9, 3))
-zobrist_black = random.randint(-1e8, 1e8)
+"""
+    Lookup tables of the board, built once at import.
+    Each table is indexed by the index of a cell (i*9 + j).
+"""
+BOARD_ROWS = 9
+BOARD_COLS = 9
+BOARD_CELLS = [ (idx // BOARD_COLS, idx % BOARD_COLS) for idx in range(BOARD_ROWS*BOARD_COLS) ]
+CASTLE_INDEX = CASTLE_TILE[0]*BOARD_COLS + CASTLE_TILE[1]
+
+IS_ESCAPE = [ pos in ESCAPE_TILES for pos in BOARD_CELLS ]
+ESCAPE_INDEXES = [ i*BOARD_COLS + j for i, j in ESCAPE_TILES ]
+IS_WALL = [ (pos in CAMP_DICT) or (pos == CASTLE_TILE) for pos in BOARD_CELLS ]
+IS_NEAR_CASTLE = [ pos in NEAR_CASTLE_TILES for pos in BOARD_CELLS ]
+CAMP_OF = [ CAMP_DICT.get(pos, None) for pos in BOARD_CELLS ]
+
+def __isInBoard(i:int, j:int) -> bool:
+    return (0 <= i < BOARD_ROWS) and (0 <= j < BOARD_COLS)
+
+def __buildRay(i:int, j:int, di:int, dj:int) -> list[tuple[int, int, int]]:
+    ray = []
+    i, j = i + di, j + dj
+    while __isInBoard(i, j):
+        ray.append( (i, j, i*BOARD_COLS + j) )
+        i, j = i + di, j + dj
+    return ray
+
+# MOVE_RAYS[direction][idx] contains the cells (i, j, idx) crossed moving from a cell towards a direction, ordered by distance
+MOVE_RAYS = {
+    direction: [ __buildRay(i, j, di, dj) for i, j in BOARD_CELLS ]
+    for direction, (di, dj) in ((RIGHT, (0, 1)), (UP, (-1, 0)), (LEFT, (0, -1)), (DOWN, (1, 0)))
+}
+# NEIGHBOURS[idx] contains the orthogonally adjacent cells (i, j) in the order DOWN, UP, RIGHT, LEFT
+NEIGHBOURS = [
+    [ (i+di, j+dj) for di, dj in ((1, 0), (-1, 0), (0, 1), (0, -1)) if __isInBoard(i+di, j+dj) ]
+    for i, j in BOARD_CELLS
+]
+# CAPTURE_PARTNERS[idx] contains the tuples (axis, (i1, j1), (i2, j2)) of the pairs of cells that can capture a pawn in a cell
+CAPTURE_PARTNERS = [
+    [ 
+        (axis, (i+di, j+dj), (i-di, j-dj)) for axis, di, dj in ((VERTICAL, 1, 0), (HORIZONTAL, 0, 1))
+        if __isInBoard(i+di, j+dj) and __isInBoard(i-di, j-dj)
+    ]
+    for i, j in BOARD_CELLS
+]
+
+# Indexes of the heuristic features (see `State.getFeatures`)
+PAWNS_WHITE = 0
+PAWNS_BLACK = 1
+PROXIMITY_WHITE = 2
+PROXIMITY_BLACK = 3
+SAFENESS_WHITE = 4
+SAFENESS_BLACK = 5
+ESCAPE_PROXIMITY = 6
+KING_DANGER = 7
+N_FEATURES = 8
+# Features weighted for each player, in the order of the weights
+WHITE_FEATURES = (PAWNS_WHITE, PROXIMITY_WHITE, SAFENESS_WHITE, ESCAPE_PROXIMITY)
+BLACK_FEATURES = (PAWNS_BLACK, PROXIMITY_BLACK, SAFENESS_BLACK, KING_DANGER)
+
+
+zobrist_table = np.random.randint(np.iinfo(np.int64).min, np.iinfo(np.int64).max, size=(9, 9, 3), dtype=np.int64)
+zobrist_black = random.randint(np.iinfo(np.int64).min, np.iinfo(np.int64).max)
 
 
 def zobristHash(board, n_rows, n_cols, is_white_turn):
@@ -79,6 +140,118 @@ def zobristHash(board, n_rows, n_cols, is_white_turn):
     return int(state_hash)
 
 
+# Rotations and flips of the board (the first one is the identity)
+SYMMETRIES = [
+    lambda board: board,
+    lambda board: np.rot90(board, k=1),
+    lambda board: np.flip(board, axis=1),
+    lambda board: np.rot90(board, k=2),
+    lambda board: np.rot90(np.flip(board, axis=0), k=1),
+    lambda board: np.rot90(board, k=3),
+    lambda board: np.flip(board, axis=0),
+    lambda board: np.rot90(np.flip(board, axis=1), k=1),
+]
+N_SYMMETRIES = len(SYMMETRIES)
+
+
+"""
+    Determines the symmetry that moves the king in the first upper-quadrant.
+
+    Parameters
+    ----------
+        pos_king : tuple[int, int]
+            Position of the king.
+
+    Returns
+    -------
+        symmetry : int
+            Index of the symmetry in `SYMMETRIES`.
+"""
+def normalizingSymmetry(pos_king, n_rows, n_cols) -> int:
+    if (pos_king[0] <= math.floor(n_rows/2)) and (pos_king[1] >= math.ceil(n_cols/2)):
+        if pos_king[0] + pos_king[1] >= n_cols-1:
+            return 1
+        else:
+            return 2
+    elif (pos_king[0] >= math.ceil(n_rows/2)) and (pos_king[1] >= math.floor(n_cols/2)):
+        if pos_king[0] >= pos_king[1]:
+            return 3
+        else:
+            return 4
+    elif (pos_king[0] >= math.floor(n_rows/2)) and (pos_king[1] <= (math.floor(n_cols/2)-1)):
+        if pos_king[0] + pos_king[1] <= n_cols-1:
+            return 5
+        else:
+            return 6
+    elif (pos_king[0] <= (math.floor(n_rows/2)-1)) and (pos_king[1] <= (math.floor(n_cols/2)-2)):
+        if pos_king[0] > pos_king[1]:
+            return 7
+        else:
+            return 0
+    else:
+        return 0
+
+
+"""
+    The hashes of the state under all the symmetries are packed in a single integer,
+    one lane of HASH_BITS bits for each symmetry (lane k is the hash of the board transformed with SYMMETRIES[k]).
+    As XOR works bitwise, all the variants are updated with a single operation.
+"""
+HASH_BITS = 64
+HASH_LANE_MASK = (1 << HASH_BITS) - 1
+
+def __packLanes(values) -> int:
+    packed = 0
+    for k, value in enumerate(values):
+        packed |= (int(value) & HASH_LANE_MASK) << (k * HASH_BITS)
+    return packed
+
+def __buildZobristKeys() -> list[list[int]]:
+    n_rows, n_cols = zobrist_table.shape[0], zobrist_table.shape[1]
+    cells = np.arange(n_rows*n_cols).reshape(n_rows, n_cols)
+    # Position of each cell after applying each symmetry
+    transformed_pos = [ {} for _ in range(N_SYMMETRIES) ]
+    for k, symmetry in enumerate(SYMMETRIES):
+        transformed = symmetry(cells)
+        for i in range(n_rows):
+            for j in range(n_cols):
+                transformed_pos[k][int(transformed[i, j])] = (i, j)
+
+    keys = [ [0] * (n_rows*n_cols) for _ in range(max(EMPTY, BLACK, WHITE, KING)+1) ]
+    for pawn, zobrist_index in ((KING, 0), (WHITE, 1), (BLACK, 2)):
+        keys[pawn] = [
+            __packLanes([ zobrist_table[transformed_pos[k][idx]][zobrist_index] for k in range(N_SYMMETRIES) ])
+            for idx in range(n_rows*n_cols)
+        ]
+    return keys
+
+# ZOBRIST_KEYS[pawn][i*9 + j] contains the packed keys of a pawn in (i, j) for each symmetry
+ZOBRIST_KEYS = __buildZobristKeys()
+ZOBRIST_BLACK_KEY = __packLanes([zobrist_black] * N_SYMMETRIES)
+NORMALIZING_SYMMETRY = [ normalizingSymmetry((idx // 9, idx % 9), 9, 9) for idx in range(81) ]
+
+def __buildSymmetricCells() -> tuple[list[list[int]], list[list[int]]]:
+    inverse = [ symmetry(np.arange(81).reshape(9, 9)).flatten().tolist() for symmetry in SYMMETRIES ]
+    symmetric = [ [0] * 81 for _ in range(N_SYMMETRIES) ]
+    for k in range(N_SYMMETRIES):
+        for transformed_idx, idx in enumerate(inverse[k]):
+            symmetric[k][idx] = transformed_idx
+    return symmetric, inverse
+
+# SYMMETRIC_CELLS[k][i*9 + j] is the index of the cell (i, j) after applying the k-th symmetry
+# and INVERSE_SYMMETRIC_CELLS[k] maps it back
+SYMMETRIC_CELLS, INVERSE_SYMMETRIC_CELLS = __buildSymmetricCells()
+
+
+"""
+    Extracts the hash of a given symmetry from the packed hashes.
+    The value is the same computed by `zobristHash` on the transformed board.
+"""
+def unpackHash(packed_hashes:int, symmetry:int) -> int:
+    value = (packed_hashes >> (symmetry * HASH_BITS)) & HASH_LANE_MASK
+    return value - (1 << HASH_BITS) if value >> (HASH_BITS-1) else value
+
+
 """
     Simple class to represent the state of the game.
     The state is represented by a matrix of bytes of dimensions 9x9.
@@ -98,6 +271,17 @@ class State():
         else:
             raise ValueError("Unknown rules")
 
+        pos_king = np.argwhere(self.board == KING)
+        self.king_pos = tuple(pos_king[0]) if len(pos_king) > 0 else None
+        self.packed_hashes = ZOBRIST_BLACK_KEY if not is_white_turn else 0
+        self.pieces = set() # Indexes of the cells occupied by a pawn or the king
+        self.n_whites = 0
+        self.n_blacks = 0
+        for i, j in zip(*np.nonzero(self.board)):
+            i, j = int(i), int(j)
+            self.updateHash(i, j, self.board[i, j])
+            self.updatePieces(i, j, self.board[i, j])
+
 
     def __str__(self):
         return f"WhiteTurn = {self.is_white_turn}\n {str(self.board)}"
@@ -108,7 +292,8 @@ class State():
 
 
     """
-        Computes the Zobrist hash of the current state.
+        Returns the Zobrist hash of the current state.
+        Hashes are kept updated by `applyMove` and `revertMove`.
 
         Parameters
         ----------
@@ -121,10 +306,64 @@ class State():
             hash : int
     """
     def hash(self, normalize=False):
-        if normalize:
-            return zobristHash(self.getNormalizedBoard(), self.N_ROWS, self.N_COLS, self.is_white_turn)
+        return unpackHash(self.packed_hashes, self.getNormalizingSymmetry() if normalize else 0)
+
+
+    """
+        Returns the index in `SYMMETRIES` of the symmetry used to normalize the board
+        (the identity if there is no king).
+    """
+    def getNormalizingSymmetry(self) -> int:
+        if self.king_pos is None: return 0
+        return NORMALIZING_SYMMETRY[self.king_pos[0]*self.N_COLS + self.king_pos[1]]
+
+
+    """
+        Adds or removes a pawn in a given position from the hashes of the state.
+
+        Parameters
+        ----------
+            i, j : int
+                Position of the pawn.
+
+            pawn : BLACK|WHITE|KING
+                Pawn to add or remove.
+    """
+    def updateHash(self, i:int, j:int, pawn:BLACK|WHITE|KING):
+        self.packed_hashes ^= ZOBRIST_KEYS[pawn][i*self.N_COLS + j]
+
+
+    """
+        Adds or removes a pawn in a given position from the pieces of the state and from the pawns count.
+        As the hashes, pieces are kept updated by `applyMove` and `revertMove`,
+        so that the features of the state are extracted without traversing the whole board.
+
+        Parameters
+        ----------
+            i, j : int
+                Position of the pawn.
+
+            pawn : BLACK|WHITE|KING
+                Pawn to add or remove.
+    """
+    def updatePieces(self, i:int, j:int, pawn:BLACK|WHITE|KING):
+        idx = i*self.N_COLS + j
+        if idx in self.pieces:
+            self.pieces.remove(idx)
+            delta = -1
         else:
-            return zobristHash(self.board, self.N_ROWS, self.N_COLS, self.is_white_turn)
+            self.pieces.add(idx)
+            delta = 1
+        if pawn == WHITE: self.n_whites += delta
+        elif pawn == BLACK: self.n_blacks += delta
+
+
+    """
+        Passes the turn to the other player, updating the hashes.
+    """
+    def flipTurn(self):
+        self.is_white_turn = not self.is_white_turn
+        self.packed_hashes ^= ZOBRIST_BLACK_KEY
 
     
     """
@@ -140,28 +379,7 @@ class State():
         if len(pos_king) == 0: return self.board
         pos_king = tuple(pos_king[0])
 
-        if (pos_king[0] <= math.floor(self.N_ROWS/2)) and (pos_king[1] >= math.ceil(self.N_COLS/2)):
-            if pos_king[0] + pos_king[1] >= self.N_COLS-1:
-                return np.rot90(self.board, k=1)
-            else:
-                return np.flip(self.board, axis=1)
-        elif (pos_king[0] >= math.ceil(self.N_ROWS/2)) and (pos_king[1] >= math.floor(self.N_COLS/2)):
-            if pos_king[0] >= pos_king[1]:
-                return np.rot90(self.board, k=2)
-            else:
-                return np.rot90(np.flip(self.board, axis=0), k=1)
-        elif (pos_king[0] >= math.floor(self.N_ROWS/2)) and (pos_king[1] <= (math.floor(self.N_COLS/2)-1)):
-            if pos_king[0] + pos_king[1] <= self.N_COLS-1:
-                return np.rot90(self.board, k=3)
-            else:
-                return np.flip(self.board, axis=0)
-        elif (pos_king[0] <= (math.floor(self.N_ROWS/2)-1)) and (pos_king[1] <= (math.floor(self.N_COLS/2)-2)):
-            if pos_king[0] > pos_king[1]:
-                return np.rot90(np.flip(self.board, axis=1), k=1)
-            else:
-                return self.board
-        else:
-            return self.board
+        return SYMMETRIES[normalizingSymmetry(pos_king, self.N_ROWS, self.N_COLS)](self.board)
 
 
     """
@@ -177,7 +395,7 @@ class State():
                 
     """
     def getMoves(self) -> tuple[list[tuple[tuple[int, int], tuple[int, int]]], list[tuple[tuple[int, int], tuple[int, int]]]]:
-        pos_king = tuple(np.argwhere(self.board == KING)[0])
+        pos_king = self.king_pos
         pawn = WHITE if self.is_white_turn else BLACK
 
         king_moves = []
@@ -210,20 +428,164 @@ class State():
 
 
     def __getPawnMoves(self, i:int, j:int) -> Generator[tuple[tuple[int, int], tuple[int, int]]]:
+        idx = i*self.N_COLS + j
         for direction in [RIGHT, UP, LEFT, DOWN]:
             n = self.numSteps(i, j, direction)
-            for step in range(1, n+1):
-                if direction == RIGHT:
-                    target = (i, j + step)
-                elif direction == UP:
-                    target = (i - step, j)
-                elif direction == LEFT:
-                    target = (i, j - step)
-                elif direction == DOWN:
-                    target = (i + step, j)
-                
-                if self.isValidCell(target[0], target[1]):
-                    yield ((i, j), target)
+            for target_i, target_j, _ in MOVE_RAYS[direction][idx][:n]:
+                yield ((i, j), (target_i, target_j))
+
+
+    """
+        Determines the moves of the king (none if it is black's turn).
+    """
+    def getKingMoves(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        if (not self.is_white_turn) or (self.king_pos is None): return []
+        return [ *self.__getPawnMoves(self.king_pos[0], self.king_pos[1]) ]
+
+
+    """
+        Determines the moves of the pawns (king excluded) that capture an opponent's pawn.
+        Instead of classifying every move, the cells where a capture would happen are found first
+        and the pawns that can reach them are searched backwards along the rows and columns.
+    """
+    def getCapturingMoves(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        victims = (self.board == BLACK) if self.is_white_turn else ((self.board == WHITE) | (self.board == KING))
+        targets = {}
+
+        for i, j in zip(*np.nonzero(victims)):
+            i, j = int(i), int(j)
+            idx = i*self.N_COLS + j
+            if self.board[i, j] == KING and (idx == CASTLE_INDEX or IS_NEAR_CASTLE[idx]):
+                # The king in or near the castle has to be surrounded on all the sides
+                free_cells = [ pos for pos in NEIGHBOURS[idx] if pos != CASTLE_TILE and self.board[pos] != BLACK ]
+                if len(free_cells) == 1 and self.board[free_cells[0]] == EMPTY:
+                    targets[free_cells[0]] = True
+                continue
+            for _, partner1, partner2 in CAPTURE_PARTNERS[idx]:
+                if self.board[partner1] == EMPTY and self.isCapturingElementFor(i, j, partner2[0], partner2[1]): targets[partner1] = True
+                if self.board[partner2] == EMPTY and self.isCapturingElementFor(i, j, partner1[0], partner1[1]): targets[partner2] = True
+
+        return self.__movesTo(targets)
+
+
+    """
+        Determines the moves of the pawns (king excluded) of the player to move that end in the given cells.
+        The pawns are searched backwards from the cells along the rows and columns.
+    """
+    def __movesTo(self, targets) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        pawn = WHITE if self.is_white_turn else BLACK
+        moves = []
+        for target in targets:
+            for direction in [RIGHT, UP, LEFT, DOWN]:
+                for dist, (i, j, _) in enumerate(MOVE_RAYS[direction][target[0]*self.N_COLS + target[1]], 1):
+                    if self.board[i, j] == EMPTY: continue
+                    if self.board[i, j] == pawn and self.numSteps(i, j, OPPOSITE_DIRECTION[direction]) >= dist:
+                        moves.append( ((i, j), target) )
+                    break
+        return moves
+
+
+    """
+        Determines the cells the king can cross to reach an escape tile with a move.
+        On each free line towards an escape tile, the cells up to the first escape tile are returned
+        (a pawn in any of them stops that escape).
+    """
+    def getKingEscapeCells(self) -> list[tuple[int, int]]:
+        if self.king_pos is None: return []
+        cells = []
+        for direction in [RIGHT, UP, LEFT, DOWN]:
+            n = self.numSteps(self.king_pos[0], self.king_pos[1], direction)
+            ray = MOVE_RAYS[direction][self.king_pos[0]*self.N_COLS + self.king_pos[1]][:n]
+            for k, (_, _, target_idx) in enumerate(ray):
+                if IS_ESCAPE[target_idx]:
+                    cells += [ (i, j) for i, j, _ in ray[:k+1] ]
+                    break
+        return cells
+
+
+    """
+        Checks if the king can reach an escape tile with a move.
+    """
+    def canKingEscape(self) -> bool:
+        return len(self.getKingEscapeCells()) > 0
+
+
+    """
+        Determines the moves that change the position sharply and have to be searched by the quiescence search:
+            - for white, the moves that capture and the moves of the king that capture,
+              reach an escape tile or (if `king_threats`) open a free line towards one;
+            - for black, the moves that capture or, if the king can escape, only the moves that stop it
+              (i.e. that capture the king or end in its way).
+        The captures of the king are detected with `isCaptured` by applying the moves.
+    """
+    def getQuiescenceMoves(self, king_threats:bool=True) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        moves = self.getCapturingMoves()
+        if self.is_white_turn:
+            for start, end in self.getKingMoves():
+                captured = self.applyMove(start, end)
+                if captured or IS_ESCAPE[end[0]*self.N_COLS + end[1]] or (king_threats and self.canKingEscape()):
+                    moves.append( (start, end) )
+                self.revertMove(start, end, captured)
+        else:
+            escape_cells = self.getKingEscapeCells()
+            if escape_cells:
+                moves = [ (start, end) for start, end in moves if self.__capturesKing(start, end) ]
+                moves += [ move for move in self.__movesTo(escape_cells) if move not in moves ]
+        return moves
+
+
+    def __capturesKing(self, start:tuple[int, int], end:tuple[int, int]) -> bool:
+        captured = self.applyMove(start, end)
+        king_captured = self.king_pos is None
+        self.revertMove(start, end, captured)
+        return king_captured
+
+
+    """
+        Determines the moves of the pawns (king excluded).
+        Moves that end near the rows and columns of the king come first.
+    """
+    def getPawnsMoves(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        pawn = WHITE if self.is_white_turn else BLACK
+        king_i, king_j = self.king_pos if self.king_pos is not None else (-2, -2)
+        near_king_moves = []
+        other_moves = []
+
+        for i, j in zip(*np.nonzero(self.board == pawn)):
+            for start, end in self.__getPawnMoves(int(i), int(j)):
+                if abs(end[0] - king_i) <= 1 or abs(end[1] - king_j) <= 1:
+                    near_king_moves.append((start, end))
+                else:
+                    other_moves.append((start, end))
+        return near_king_moves + other_moves
+
+
+    """
+        Checks if a move is quiet, i.e. it is not one of the critical moves of `getMoves`:
+        it does not move the king and does not end near the rows and columns of the king.
+        Captures are not detected, as they are known only after applying the move.
+    """
+    def isQuietMove(self, start:tuple[int, int], end:tuple[int, int]) -> bool:
+        if (self.king_pos is None) or (self.board[start[0], start[1]] == KING): return False
+        return abs(end[0] - self.king_pos[0]) > 1 and abs(end[1] - self.king_pos[1]) > 1
+
+
+    """
+        Checks if a move can be done by the player to move.
+    """
+    def isLegalMove(self, start:tuple[int, int], end:tuple[int, int]) -> bool:
+        pawn = self.board[start[0], start[1]]
+        if (pawn == BLACK) == self.is_white_turn or pawn == EMPTY: return False
+
+        if start[0] == end[0] and start[1] != end[1]:
+            direction = RIGHT if end[1] > start[1] else LEFT
+            dist = abs(end[1] - start[1])
+        elif start[1] == end[1] and start[0] != end[0]:
+            direction = DOWN if end[0] > start[0] else UP
+            dist = abs(end[0] - start[0])
+        else:
+            return False
+        return self.numSteps(start[0], start[1], direction) >= dist
 
     """
         Applies a move in the board.
@@ -248,26 +610,27 @@ class State():
     """
     def applyMove(self, start:tuple[int, int], end:tuple[int, int]) -> list[tuple[tuple[int, int], BLACK|WHITE|KING]]:
         captured = []
+        pawn = self.board[start[0], start[1]]
         
         # Applies move
-        self.board[end[0], end[1]] = self.board[start[0], start[1]]
+        self.board[end[0], end[1]] = pawn
         self.board[start[0], start[1]] = EMPTY
+        self.updateHash(start[0], start[1], pawn)
+        self.updateHash(end[0], end[1], pawn)
+        self.updatePieces(start[0], start[1], pawn)
+        self.updatePieces(end[0], end[1], pawn)
+        if pawn == KING: self.king_pos = end
 
         # Checks if the adjacent pieces have been captured
-        if self.isCaptured(end[0]+1,end[1], to_filter_axis=VERTICAL):
-            captured.append( ((end[0]+1, end[1]), self.board[end[0]+1, end[1]]) )
-            self.board[end[0]+1, end[1]] = EMPTY
-        if self.isCaptured(end[0]-1,end[1], to_filter_axis=VERTICAL):
-            captured.append( ((end[0]-1, end[1]), self.board[end[0]-1, end[1]]) )
-            self.board[end[0]-1, end[1]] = EMPTY
-        if self.isCaptured(end[0],end[1]+1, to_filter_axis=HORIZONTAL):
-            captured.append( ((end[0], end[1]+1), self.board[end[0], end[1]+1]) )
-            self.board[end[0], end[1]+1] = EMPTY
-        if self.isCaptured(end[0],end[1]-1, to_filter_axis=HORIZONTAL):
-            captured.append( ((end[0], end[1]-1), self.board[end[0], end[1]-1]) )
-            self.board[end[0], end[1]-1] = EMPTY
+        for i, j, axis in ((end[0]+1, end[1], VERTICAL), (end[0]-1, end[1], VERTICAL), (end[0], end[1]+1, HORIZONTAL), (end[0], end[1]-1, HORIZONTAL)):
+            if self.isCaptured(i, j, to_filter_axis=axis):
+                captured.append( ((i, j), self.board[i, j]) )
+                self.updateHash(i, j, self.board[i, j])
+                self.updatePieces(i, j, self.board[i, j])
+                if self.board[i, j] == KING: self.king_pos = None
+                self.board[i, j] = EMPTY
 
-        self.is_white_turn = not self.is_white_turn
+        self.flipTurn()
 
         return captured
 
@@ -291,17 +654,68 @@ class State():
                 They are restored.
     """
     def revertMove(self, old_start:tuple[int, int], old_end:tuple[int, int], captured:list[tuple[tuple[int, int], BLACK|WHITE|KING]]):
+        moved_pawn = self.board[old_end[0], old_end[1]]
+
         # Reverts move
-        self.board[old_start[0], old_start[1]] = self.board[old_end[0], old_end[1]]
+        self.board[old_start[0], old_start[1]] = moved_pawn
         self.board[old_end[0], old_end[1]] = EMPTY
+        self.updateHash(old_start[0], old_start[1], moved_pawn)
+        self.updateHash(old_end[0], old_end[1], moved_pawn)
+        self.updatePieces(old_start[0], old_start[1], moved_pawn)
+        self.updatePieces(old_end[0], old_end[1], moved_pawn)
+        if moved_pawn == KING: self.king_pos = old_start
         
         # Reverts captured pawn
         for el in captured:
             pos = el[0]
             pawn = el[1]
             self.board[pos[0], pos[1]] = pawn
+            self.updateHash(pos[0], pos[1], pawn)
+            self.updatePieces(pos[0], pos[1], pawn)
+            if pawn == KING: self.king_pos = pos
 
-        self.is_white_turn = not self.is_white_turn
+        self.flipTurn()
+
+
+    """
+        Determines the move that leads from this state to another one, comparing the two boards.
+        The destination is the only cell that gets occupied and the start is the emptied cell
+        that contained the moved pawn. The other emptied cells are the captures of the move.
+
+        Parameters
+        ----------
+            next_state : State
+                State reached with a move from this one.
+
+        Returns
+        -------
+            move : tuple[tuple[int, int], tuple[int, int]]|None
+                Starting and ending coordinates of the move (None if the boards are not one move away).
+
+            captures : list[tuple[int, int]]
+                Coordinates of the pawns captured by the move.
+    """
+    def findMove(self, next_state:State) -> tuple[tuple[tuple[int, int], tuple[int, int]]|None, list[tuple[int, int]]]:
+        start, end = None, None
+        emptied = []
+        for idx in np.flatnonzero(self.board != next_state.board).tolist():
+            i, j = BOARD_CELLS[idx]
+            if next_state.board[i, j] == EMPTY:
+                emptied.append((i, j))
+            elif self.board[i, j] == EMPTY and end is None:
+                end = (i, j)
+            else:
+                return None, [] # A pawn replaced by another one or more than one destination
+        if end is None: return None, []
+
+        captures = []
+        for i, j in emptied:
+            if start is None and self.board[i, j] == next_state.board[end] and (i == end[0] or j == end[1]):
+                start = (i, j)
+            else:
+                captures.append((i, j))
+        if start is None: return None, []
+        return (start, end), captures
 
 
     """
@@ -313,10 +727,9 @@ class State():
                 The status of the board.
     """
     def getGameState(self) -> BLACK_WIN | WHITE_WIN | OPEN:
-        pos_king = np.argwhere(self.board==KING)
-        if len(pos_king)==0:
+        if self.king_pos is None:
             return BLACK_WIN
-        elif ((pos_king[0][0], pos_king[0][1]) in ESCAPE_TILES):
+        elif IS_ESCAPE[self.king_pos[0]*self.N_COLS + self.king_pos[1]]:
             return WHITE_WIN
         return OPEN  
               
@@ -351,7 +764,7 @@ class State():
             is_wall : bool
     """
     def isWall(self, i: int, j: int)->bool:
-        return (i, j) in CAMP_DICT.keys() or (i, j) == CASTLE_TILE
+        return IS_WALL[i*self.N_COLS + j]
     
     
     """
@@ -377,45 +790,26 @@ class State():
     def isCaptured(self, i: int, j: int, to_filter_axis:None|VERTICAL|HORIZONTAL=None)->bool:
         if not self.isValidCell(i, j): return False
         
+        idx = i*self.N_COLS + j
         if self.board[i, j] == EMPTY:
             return False
         # King captured in castle
-        elif (self.board[i, j] == KING and (i, j) == CASTLE_TILE):
-            return (
-                self.board[i+1, j] == BLACK and
-                self.board[i-1, j] == BLACK and
-                self.board[i, j+1] == BLACK and
-                self.board[i, j-1] == BLACK
-            )
+        elif (self.board[i, j] == KING and idx == CASTLE_INDEX):
+            return all( self.board[pos] == BLACK for pos in NEIGHBOURS[idx] )
         # King captured near castle
-        elif (self.board[i, j] == KING and (i, j) in NEAR_CASTLE_TILES):
+        elif (self.board[i, j] == KING and IS_NEAR_CASTLE[idx]):
             cnt_black = 0
-            for k in (+1, -1): # Coordinates increment
-                if (i+k, j) != CASTLE_TILE:
-                    if self.board[i+k, j] == BLACK:
-                        cnt_black += 1
-                if (i, j+k) != CASTLE_TILE:
-                    if self.board[i, j+k] == BLACK:
-                        cnt_black += 1
-            if cnt_black == 3:
-                return True
+            for pos in NEIGHBOURS[idx]:
+                if pos != CASTLE_TILE and self.board[pos] == BLACK:
+                    cnt_black += 1
+            return cnt_black == 3
         # Normal capture
         else:
-            is_vertically_captured = False
-            is_horizontally_captured = False
-            
-            if to_filter_axis is None or to_filter_axis == VERTICAL:
-                is_vertically_captured = (
-                    self.isValidCell(i+1, j) and self.isValidCell(i-1, j) and
-                    self.isCapturingElementFor(i, j, i+1, j) and self.isCapturingElementFor(i, j, i-1, j)
-                )
-            if to_filter_axis is None or to_filter_axis == HORIZONTAL:
-                is_horizontally_captured = (
-                    self.isValidCell(i, j+1) and self.isValidCell(i, j-1) and
-                    self.isCapturingElementFor(i, j, i, j+1) and self.isCapturingElementFor(i, j, i, j-1)
-                )
-
-            return is_vertically_captured or is_horizontally_captured
+            for axis, partner1, partner2 in CAPTURE_PARTNERS[idx]:
+                if to_filter_axis is not None and to_filter_axis != axis: continue
+                if self.isCapturingElementFor(i, j, partner1[0], partner1[1]) and self.isCapturingElementFor(i, j, partner2[0], partner2[1]):
+                    return True
+            return False
     
     
     """
@@ -448,10 +842,10 @@ class State():
         
         # In the case of black inside the camp, the camp in which the black is
         # is not considered an obstacle
-        if (num_camp is not None) and CAMP_DICT.get((i, j), None) == num_camp:
+        if (num_camp is not None) and CAMP_OF[i*self.N_COLS + j] == num_camp:
             return False
         else:
-            return self.isWall(i, j)
+            return IS_WALL[i*self.N_COLS + j]
         
     
     """
@@ -475,10 +869,10 @@ class State():
     """
     def isCapturingElementFor(self, pawn_i:int, pawn_j:int, check_i:int, check_j:int) -> bool:
         if self.board[pawn_i, pawn_j] == WHITE or self.board[pawn_i, pawn_j] == KING:
-            return self.board[check_i, check_j] == BLACK or self.isWall(check_i, check_j)
+            return self.board[check_i, check_j] == BLACK or IS_WALL[check_i*self.N_COLS + check_j]
         else:
             return (self.board[check_i, check_j] == WHITE or self.board[check_i, check_j] == KING or 
-                (self.isWall(check_i, check_j) and (pawn_i, pawn_j) not in CAMP_DICT))
+                (IS_WALL[check_i*self.N_COLS + check_j] and CAMP_OF[pawn_i*self.N_COLS + pawn_j] is None))
 
 
     """
@@ -498,7 +892,7 @@ class State():
     def getCampOfPawnAt(self, i:int, j:int) -> None|int:
         if self.board[i,j] != BLACK:
             return None
-        return CAMP_DICT.get((i,j), None)        
+        return CAMP_OF[i*self.N_COLS + j]
 
 
     """
@@ -519,20 +913,13 @@ class State():
     """
     def numSteps(self, i:int, j:int, direction:RIGHT|UP|LEFT|DOWN) -> int:
         num_camp = self.getCampOfPawnAt(i, j)
-        num = 1
-        if direction == RIGHT:
-            while(not self.isObstacle(i, j + num, num_camp)):
-                num +=1
-        elif direction == UP:
-            while(not self.isObstacle(i - num, j, num_camp)):
-                num +=1
-        elif direction == LEFT:
-            while(not self.isObstacle(i, j - num, num_camp)):
-                num +=1
-        elif direction == DOWN:
-            while(not self.isObstacle(i + num, j, num_camp)):
-                num +=1
-        return num - 1
+        num = 0
+        for target_i, target_j, target_idx in MOVE_RAYS[direction][i*self.N_COLS + j]:
+            if self.board[target_i, target_j] != EMPTY: break
+            # A black pawn inside a camp can move through its own camp
+            if IS_WALL[target_idx] and (num_camp is None or CAMP_OF[target_idx] != num_camp): break
+            num += 1
+        return num
 
 
     """
@@ -591,145 +978,95 @@ class State():
             positive_weights:list[float],
             negative_weights:list[float],
         ) -> float:
-        if player_color == WHITE:
-            return (
-                (
-                    positive_weights[0] * self.__pawnRatio(WHITE) + 
-                    positive_weights[1] * self.__avgProximityToKingRatio(WHITE) + 
-                    positive_weights[2] * self.__safenessRatio(WHITE) + 
-                    positive_weights[3] * self.__minDistanceToEscapeRatio()
-                ) - (
-                    negative_weights[0] * self.__pawnRatio(BLACK) +
-                    negative_weights[1] * self.__avgProximityToKingRatio(BLACK) + 
-                    negative_weights[2] * self.__safenessRatio(BLACK) +
-                    negative_weights[3] * self.__kingDangerRatio()
-                )
-            )
-        else:
-            return (
-                (
-                    positive_weights[0] * self.__pawnRatio(BLACK) + 
-                    positive_weights[1] * self.__avgProximityToKingRatio(BLACK) + 
-                    positive_weights[2] * self.__safenessRatio(BLACK) +
-                    positive_weights[3] * self.__kingDangerRatio()
-                ) - (
-                    negative_weights[0] * self.__pawnRatio(WHITE) +
-                    negative_weights[1] * self.__avgProximityToKingRatio(WHITE) + 
-                    negative_weights[2] * self.__safenessRatio(WHITE) +
-                    negative_weights[3] * self.__minDistanceToEscapeRatio()
-                )
+        features = self.getFeatures()
+        own, opponent = (WHITE_FEATURES, BLACK_FEATURES) if player_color == WHITE else (BLACK_FEATURES, WHITE_FEATURES)
+        return (
+            (
+                positive_weights[0] * features[own[0]] + 
+                positive_weights[1] * features[own[1]] + 
+                positive_weights[2] * features[own[2]] + 
+                positive_weights[3] * features[own[3]]
+            ) - (
+                negative_weights[0] * features[opponent[0]] +
+                negative_weights[1] * features[opponent[1]] + 
+                negative_weights[2] * features[opponent[2]] +
+                negative_weights[3] * features[opponent[3]]
             )
+        )
 
 
     """
-        Determines the number of pawns of a certain color (king excluded).
-
-        Parameters
-        ----------
-            color : WHITE|BLACK
-                Color of the pawn to check.
-
-        Returns
-        -------
-            num_pawns : int
-    """
-    def __pawnRatio(self, color:WHITE|BLACK) -> int:
-        count = np.sum(self.board == color)
-        if color == WHITE: return count / self.N_WHITES
-        else: return count / self.N_BLACKS
-
-
-    """
-        Determines the average Manhattan distance of 
-        the pawns of a certain color to the king.
-        Returns 1 if the pawns are near the king and 0 if they are far.
-
-        Parameters
-        ----------
-            color : WHITE|BLACK
-                Color of the pawn to check.
+        Extracts the heuristic features of this game state with a single traversal of its pieces.
+        The pawns count is kept updated by `applyMove` and `revertMove`,
+        the remaining features depend on the position of the king or on the neighbours of the pawns.
+        The king has to be on the board.
+
+        Features (all in [0, 1]):
+            - PAWNS_WHITE, PAWNS_BLACK: ratio of the remaining pawns (king excluded);
+            - PROXIMITY_WHITE, PROXIMITY_BLACK: 1 if the pawns are near the king and 0 if they are far (average Manhattan distance);
+            - SAFENESS_WHITE, SAFENESS_BLACK: 0 if all the pawns (king included for white) miss a single opponent to be captured
+              and 1 if none of them is close to opponent pawns or walls (black pawns inside a camp are not counted);
+            - ESCAPE_PROXIMITY: 1 if the king is near a free escape tile and 0 if it is far;
+            - KING_DANGER: ratio of the sides of the king occupied by black pawns.
 
         Returns
         -------
-            avg_proximity_ratio : float
+            features : list[float]
+                Features indexed by the constants PAWNS_WHITE, ..., KING_DANGER.
     """
-    def __avgProximityToKingRatio(self, color:WHITE|BLACK)->float:
-        pos_king = tuple(np.argwhere(self.board == KING)[0])
-        dist = []
-        for i in range(self.N_ROWS):
-            for j in range(self.N_COLS):
-                if self.board[i,j] == color:
-                    dist.append(abs(pos_king[0] - i) + abs(pos_king[1] - j))
-        avg_dist = self.MAX_DIST_TO_KING if len(dist) == 0 else (sum(dist)/len(dist))
-        return 1 - (avg_dist / self.MAX_DIST_TO_KING)
-
-
-    """
-        Determines the safeness ratio of the pawns of a certain color (king included).
-        The safeness ratio is 0 if all the pawns are surrounded 
-        (i.e. all pawns are missing a single opponent pawn to be captured)
-        and is 1 if none of the pawns are close to opponent pawns or walls.
-        
-        Parameters
-        ----------
-            color : WHITE|BLACK
-                Color of the pawn to check.
-
-        Returns
-        -------
-            threat_ratio : float
-    """
-    def __safenessRatio(self, color:WHITE|BLACK) -> float:
-        threats = 0
-        total_possible_threats = 0
-        for i in range(self.N_ROWS):
-            for j in range(self.N_COLS):
-                if (i, j) in CAMP_DICT: continue # Black pawns inside a camp are not counted
-
-                if (self.board[i, j] == color) or (self.board[i, j] == KING and color == WHITE):
-                    if self.isValidCell(i+1, j) and self.isValidCell(i-1, j): 
-                        total_possible_threats += 1
-                        if ((self.isCapturingElementFor(i, j, i+1, j) and self.board[i-1, j] == EMPTY) or
-                            (self.isCapturingElementFor(i, j, i-1, j) and self.board[i+1, j] == EMPTY)):
-                            threats += 1
-                    if self.isValidCell(i, j+1) and self.isValidCell(i, j-1): 
-                        total_possible_threats += 1
-                        if ((self.isCapturingElementFor(i, j, i, j+1) and self.board[i, j-1] == EMPTY) or
-                            (self.isCapturingElementFor(i, j, i, j-1) and self.board[i, j+1] == EMPTY)):
-                            threats += 1
-
-        if total_possible_threats == 0: return 1  
-        else: return 1 - (threats / total_possible_threats)
-
-
-    """
-        Determines the minimum distance between the king and the free escape tiles.
-
-        Returns
-        -------
-            min_distance : float
-    """
-    def __minDistanceToEscapeRatio(self) -> float:
-        pos_king = tuple(np.argwhere(self.board == KING)[0])
-        m = self.MAX_DIST_TO_ESCAPE
-        for t in ESCAPE_TILES:
-            if self.board[t[0], t[1]] == EMPTY:
-                dist = abs(pos_king[0] - t[0]) + abs(pos_king[1] - t[1])
-                if dist < m:
-                    m = dist
-        return 1 - (m / self.MAX_DIST_TO_ESCAPE)
-    
-
-    """
-        Determines how much the king is in danger.
-    """
-    def __kingDangerRatio(self) -> float:
-        pos_king = tuple(np.argwhere(self.board == KING)[0])
+    def getFeatures(self) -> list[float]:
+        cells = self.board.ravel().tolist()
+        king_i, king_j = self.king_pos if self.king_pos is not None else (-2, -2) # Without the king, its features are meaningless
+        n_whites, n_blacks = self.n_whites, self.n_blacks
+        whites_dist, blacks_dist = 0, 0
+        white_threats, white_partners = 0, 0
+        black_threats, black_partners = 0, 0
+        escape_dist = self.MAX_DIST_TO_ESCAPE
         blacks_around = 0
 
-        if (self.isValidCell(pos_king[0]+1, pos_king[1])) and (self.board[pos_king[0]+1, pos_king[1]] == BLACK): blacks_around += 1
-        if (self.isValidCell(pos_king[0]-1, pos_king[1])) and (self.board[pos_king[0]-1, pos_king[1]] == BLACK): blacks_around += 1
-        if (self.isValidCell(pos_king[0], pos_king[1]+1)) and (self.board[pos_king[0], pos_king[1]+1] == BLACK): blacks_around += 1
-        if (self.isValidCell(pos_king[0], pos_king[1]-1)) and (self.board[pos_king[0], pos_king[1]-1] == BLACK): blacks_around += 1
-
-        return blacks_around / 4
\ No newline at end of file
+        for idx in ESCAPE_INDEXES:
+            if cells[idx] == EMPTY:
+                i, j = BOARD_CELLS[idx]
+                dist = abs(king_i - i) + abs(king_j - j)
+                if dist < escape_dist: escape_dist = dist
+
+        for idx in self.pieces:
+            pawn = cells[idx]
+            i, j = BOARD_CELLS[idx]
+            dist = abs(king_i - i) + abs(king_j - j)
+            if pawn == BLACK:
+                blacks_dist += dist
+                if dist == 1: blacks_around += 1
+            elif pawn == WHITE:
+                whites_dist += dist
+            if CAMP_OF[idx] is not None: continue # Black pawns inside a camp are not counted
+
+            # Threats: a capturing element on one side and an empty cell on the other
+            for _, (i1, j1), (i2, j2) in CAPTURE_PARTNERS[idx]:
+                partner1, partner2 = cells[i1*BOARD_COLS + j1], cells[i2*BOARD_COLS + j2]
+                if pawn == BLACK:
+                    capturing1 = (partner1 == WHITE) or (partner1 == KING) or IS_WALL[i1*BOARD_COLS + j1]
+                    capturing2 = (partner2 == WHITE) or (partner2 == KING) or IS_WALL[i2*BOARD_COLS + j2]
+                else:
+                    capturing1 = (partner1 == BLACK) or IS_WALL[i1*BOARD_COLS + j1]
+                    capturing2 = (partner2 == BLACK) or IS_WALL[i2*BOARD_COLS + j2]
+                threatened = (capturing1 and partner2 == EMPTY) or (capturing2 and partner1 == EMPTY)
+                if pawn == BLACK:
+                    black_partners += 1
+                    black_threats += threatened
+                else:
+                    white_partners += 1
+                    white_threats += threatened
+
+        avg_whites_dist = self.MAX_DIST_TO_KING if n_whites == 0 else (whites_dist / n_whites)
+        avg_blacks_dist = self.MAX_DIST_TO_KING if n_blacks == 0 else (blacks_dist / n_blacks)
+        return [
+            n_whites / self.N_WHITES,                                           # PAWNS_WHITE
+            n_blacks / self.N_BLACKS,                                           # PAWNS_BLACK
+            1 - (avg_whites_dist / self.MAX_DIST_TO_KING),                      # PROXIMITY_WHITE
+            1 - (avg_blacks_dist / self.MAX_DIST_TO_KING),                      # PROXIMITY_BLACK
+            1 if white_partners == 0 else 1 - (white_threats / white_partners), # SAFENESS_WHITE
+            1 if black_partners == 0 else 1 - (black_threats / black_partners), # SAFENESS_BLACK
+            1 - (escape_dist / self.MAX_DIST_TO_ESCAPE),                        # ESCAPE_PROXIMITY
+            blacks_around / 4                                                   # KING_DANGER
+        ]
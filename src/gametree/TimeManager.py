@@ -0,0 +1,114 @@
+from .TranspositionTable import NO_MOVE
+import time
+import cython
+import logging
+logger = logging.getLogger(__name__)
+if not cython.compiled: logger.warning(f"Using non-compiled {__file__} module")
+
+
+SOFT_BUDGET_RATIO = 0.6 # Fraction of the budget after which new iterations are not started (with a stable best move)
+STABILITY_REDUCTION = 0.85 # Scaling of the soft deadline when an iteration confirms the best move
+INSTABILITY_EXTENSION = 1.5 # Scaling of the soft deadline when an iteration changes the best move
+MIN_SOFT_SCALE = 0.4
+MAX_SOFT_SCALE = 1 / SOFT_BUDGET_RATIO # The soft deadline can be extended up to the hard one
+DEFAULT_BRANCHING = 4.0 # Growth of the duration between iterations when it cannot be estimated
+MIN_BRANCHING = 1.5
+MAX_BRANCHING = 10.0
+
+
+"""
+    Manages the time of the iterative deepening search of a move.
+    The hard deadline is never exceeded: the search is interrupted when it is reached.
+    The soft deadline decides if a new iteration is worth starting.
+    It is reduced while the best move is stable and extended when it changes.
+    Iterations that are predicted to end after the hard deadline are not started.
+"""
+class TimeManager:
+    """
+        Parameters
+        ----------
+            budget : float
+                Seconds available for the search.
+
+            adaptive : bool
+                If False, iterations are started until the hard deadline (e.g. when the search can be interrupted).
+    """
+    def __init__(self, budget:float, adaptive:bool=True):
+        self.start_timestamp = time.time()
+        self.hard_deadline = self.start_timestamp + budget
+        self.budget = budget
+        self.adaptive = adaptive
+        self.soft_scale = 1.0
+        self.iteration_start = self.start_timestamp
+        self.iteration_durations = []
+        self.best_move = NO_MOVE
+        self.wasted = 0.0
+
+
+    """
+        Marks the start of a new iteration.
+    """
+    def startIteration(self):
+        self.iteration_start = time.time()
+
+
+    """
+        Registers a completed iteration and its best move.
+    """
+    def iterationCompleted(self, best_move:int):
+        if len(self.iteration_durations) > 0:
+            if best_move == self.best_move:
+                self.soft_scale = max(MIN_SOFT_SCALE, self.soft_scale * STABILITY_REDUCTION)
+            else:
+                self.soft_scale = min(MAX_SOFT_SCALE, self.soft_scale * INSTABILITY_EXTENSION)
+        self.iteration_durations.append(time.time() - self.iteration_start)
+        self.best_move = best_move
+
+
+    """
+        Registers an iteration interrupted by the deadline.
+        Its time is wasted as its result cannot be used.
+    """
+    def iterationAborted(self):
+        self.wasted += time.time() - self.iteration_start
+
+
+    """
+        Returns the time after which new iterations are not started.
+    """
+    def softDeadline(self) -> float:
+        return self.start_timestamp + self.budget * SOFT_BUDGET_RATIO * self.soft_scale
+
+
+    """
+        Predicts the duration of the next iteration
+        from the growth of the duration of the previous ones (effective branching factor).
+        When possible, the growth is averaged over two iterations as alpha-beta alternates cheap and expensive depths.
+    """
+    def predictNextIteration(self) -> float:
+        durations = self.iteration_durations
+        if len(durations) == 0: return 0.0
+        branching = DEFAULT_BRANCHING
+        if len(durations) >= 3 and durations[-3] > 0:
+            branching = (durations[-1] / durations[-3]) ** 0.5
+        elif len(durations) >= 2 and durations[-2] > 0:
+            branching = durations[-1] / durations[-2]
+        return durations[-1] * min(MAX_BRANCHING, max(MIN_BRANCHING, branching))
+
+
+    """
+        Determines if a new iteration should be started.
+    """
+    def shouldStartIteration(self) -> bool:
+        now = time.time()
+        if now >= self.hard_deadline: return False
+        if not self.adaptive: return True
+        if now >= self.softDeadline(): return False
+        return now + self.predictNextIteration() <= self.hard_deadline
+
+
+    """
+        Seconds elapsed from the start of the search.
+    """
+    def elapsed(self) -> float:
+        return time.time() - self.start_timestamp
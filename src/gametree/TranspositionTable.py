@@ -1,4 +1,6 @@
-from .State import State
+from .State import State, SYMMETRIC_CELLS, INVERSE_SYMMETRIC_CELLS
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
 import cython
 import logging
 logger = logging.getLogger(__name__)
@@ -9,44 +11,192 @@ EXACT = 0
 LOWERBOUND = 1
 UPPERBOUND = 2
 
+NO_MOVE = -1
+EMPTY_DEPTH = -1
+
+# Layout of a packed entry of the table
+ENTRY_DTYPE = np.dtype([
+    ("key", np.int64),
+    ("value", np.float64),
+    ("depth", np.int16),
+    ("best_move", np.int16),
+    ("type", np.int8),
+])
+# Each bucket has a depth-preferred slot and an always-replace slot
+BUCKET_SIZE = 2
+
+
+"""
+    Encodes a move as a single integer.
+"""
+def packMove(start:tuple[int, int], end:tuple[int, int]) -> int:
+    return (start[0]*9 + start[1])*81 + (end[0]*9 + end[1])
+
+"""
+    Decodes a move encoded with `packMove`.
+"""
+def unpackMove(move:int) -> tuple[tuple[int, int], tuple[int, int]]:
+    start, end = divmod(move, 81)
+    return (start // 9, start % 9), (end // 9, end % 9)
+
+"""
+    Expresses a move (packed with `packMove`) on the board transformed with a symmetry of `SYMMETRIES`.
+    With `inverse`, a move on the transformed board is brought back to the original one.
+"""
+def transformMove(move:int, symmetry:int, inverse:bool=False) -> int:
+    if move == NO_MOVE or symmetry == 0: return move
+    cells = INVERSE_SYMMETRIC_CELLS[symmetry] if inverse else SYMMETRIC_CELLS[symmetry]
+    start, end = divmod(move, 81)
+    return cells[start]*81 + cells[end]
+
+"""
+    Mixes the content of an entry in a single integer.
+    Entries store their key xored with this value, so that an entry
+    partially overwritten by another process does not match any key.
+"""
+def entryChecksum(value:float, depth:int, best_move:int, entry_type:int) -> int:
+    return int(np.float64(value).view(np.int64)) ^ (int(depth) << 16) ^ (int(best_move) << 32) ^ (int(entry_type) << 48)
+
 
 class TraspositionEntry:
-    def __init__(self, entry_type:EXACT|LOWERBOUND|UPPERBOUND, value:float, depth:int):
+    def __init__(self, entry_type:EXACT|LOWERBOUND|UPPERBOUND, value:float, depth:int, best_move:int=NO_MOVE):
         self.type = entry_type
         self.value = value
         self.depth = depth
+        self.best_move = best_move
 
     def __str__(self):
         return f"{'E' if self.type == EXACT else 'L' if self.type == LOWERBOUND else 'U'}, {self.value}"
 
 
+"""
+    Open-addressing transposition table preallocated in a single array.
+    A state is mapped to a bucket with the low bits of its normalized hash and the full hash is stored to verify hits.
+    As symmetric states share their entry, best moves are stored on the normalized board.
+    The first slot of a bucket keeps the deepest entry, the second one is always replaced.
+    The table can be allocated in shared memory to be used by multiple processes without locks.
+"""
 class TranspositionTable:
     """
         Parameters
         ----------
-            max_size : int
-                The maximum number of entries the table can hold.
-    """
-    def __init__(self, max_size:int):
-        self.max_size = max_size
-        self.table = {} # Dictionary keys follows the insertion order
-
-    def __setitem__(self, state:State, entry:TraspositionEntry):
-        board_hash = hash(state)
-        
-        if board_hash in self.table:
-            # Renew the entry
-            del self.table[board_hash]
-            self.table[board_hash] = entry
+            size_mb : float
+                Maximum memory (in MB) the table can use.
+
+            shared : bool
+                If True, the table is allocated in a new shared memory block.
+
+            shm_name : str|None
+                Name of an existing shared memory block to attach to.
+                It must have been created by a table with the same size.
+    """
+    def __init__(self, size_mb:float, shared:bool=False, shm_name:str|None=None):
+        n_buckets = 1
+        while (2*n_buckets * BUCKET_SIZE * ENTRY_DTYPE.itemsize) <= (size_mb * 2**20):
+            n_buckets *= 2
+        self.n_buckets = n_buckets
+        self.bucket_mask = n_buckets - 1
+
+        self.shm = None
+        self.shm_owner = False
+        if shm_name is not None:
+            self.shm = SharedMemory(name=shm_name)
+        elif shared:
+            self.shm = SharedMemory(create=True, size=n_buckets * BUCKET_SIZE * ENTRY_DTYPE.itemsize)
+            self.shm_owner = True
+
+        if self.shm is None:
+            self.table = np.zeros(n_buckets * BUCKET_SIZE, dtype=ENTRY_DTYPE)
         else:
-            # Drop the oldest entry if needed
-            if len(self.table) >= self.max_size:
-                oldest_board = next(iter(self.table.keys()))
-                del self.table[oldest_board]
-            self.table[board_hash] = entry
+            self.table = np.ndarray(n_buckets * BUCKET_SIZE, dtype=ENTRY_DTYPE, buffer=self.shm.buf)
+        if self.shm is None or self.shm_owner:
+            self.table["depth"] = EMPTY_DEPTH
+        self.keys = self.table["key"]
+        self.values = self.table["value"]
+        self.depths = self.table["depth"]
+        self.best_moves = self.table["best_move"]
+        self.types = self.table["type"]
+        self.entry = TraspositionEntry(EXACT, 0.0, EMPTY_DEPTH) # Filled by the lookups
+
+
+    """
+        Stores the result of the search of a state.
+        It does not allocate memory.
+
+        Parameters
+        ----------
+            state : State
+
+            entry_type : EXACT|LOWERBOUND|UPPERBOUND
+
+            value : float
 
+            depth : int
+                Depth the state has been searched to.
+
+            best_move : int
+                Best move found packed with `packMove`.
+    """
+    def setEntry(self, state:State, entry_type:EXACT|LOWERBOUND|UPPERBOUND, value:float, depth:int, best_move:int=NO_MOVE):
+        key = state.hash(normalize=True)
+        best_move = transformMove(best_move, state.getNormalizingSymmetry())
+        deep_slot = (key & self.bucket_mask) * BUCKET_SIZE
+        always_slot = deep_slot + 1
+
+        deep_key = self.__slotKey(deep_slot)
+        if self.depths[deep_slot] == EMPTY_DEPTH or deep_key == key or depth >= self.depths[deep_slot]:
+            if self.depths[deep_slot] != EMPTY_DEPTH and deep_key != key:
+                # The replaced deep entry is moved in the always-replace slot
+                self.table[always_slot] = self.table[deep_slot]
+            slot = deep_slot
+        else:
+            slot = always_slot
+
+        self.keys[slot] = key ^ entryChecksum(value, depth, best_move, entry_type)
+        self.values[slot] = value
+        self.depths[slot] = depth
+        self.best_moves[slot] = best_move
+        self.types[slot] = entry_type
+
+
+    """
+        Looks up the entry of a state.
+        It does not allocate memory: the same entry object is filled by every lookup.
+
+        Returns
+        -------
+            entry : TraspositionEntry|None
+                Entry of the state (valid until the next lookup) or None if the state is not stored.
+    """
     def __getitem__(self, state:State) -> TraspositionEntry|None:
-        return self.table.get(hash(state), None)
-    
+        key = state.hash(normalize=True)
+        slot = (key & self.bucket_mask) * BUCKET_SIZE
+        for slot in (slot, slot+1):
+            entry_type, value, depth, best_move = int(self.types[slot]), float(self.values[slot]), int(self.depths[slot]), int(self.best_moves[slot])
+            if (depth != EMPTY_DEPTH) and (int(self.keys[slot]) ^ entryChecksum(value, depth, best_move, entry_type) == key):
+                best_move = transformMove(best_move, state.getNormalizingSymmetry(), inverse=True)
+                self.entry.type, self.entry.value, self.entry.depth, self.entry.best_move = entry_type, value, depth, best_move
+                return self.entry
+        return None
+
+
+    """
+        Returns the key of the state stored in a slot.
+    """
+    def __slotKey(self, slot:int) -> int:
+        return int(self.keys[slot]) ^ entryChecksum(self.values[slot], self.depths[slot], self.best_moves[slot], self.types[slot])
+
+
+    """
+        Releases the shared memory of the table (if any).
+        The block is destroyed by the table that created it.
+    """
+    def close(self):
+        if self.shm is None: return
+        self.table = self.keys = self.values = self.depths = self.best_moves = self.types = None
+        self.shm.close()
+        if self.shm_owner: self.shm.unlink()
+        self.shm = None
+
     def __str__(self):
-        return str(f"{len(self.table)}/{self.max_size} {[f'({k} | {self.table[k]})' for k in self.table]}")
+        return f"{np.sum(self.depths != EMPTY_DEPTH)}/{len(self.table)} entries, {self.table.nbytes / 2**20:.1f} MB"
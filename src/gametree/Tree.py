@@ -1,24 +1,84 @@
 from .State import State, OPEN, WHITE, BLACK, KING, EMPTY, MAX_SCORE, MIN_SCORE
 import numpy as np
 from .TreeNode import TreeNode
+from .MoveOrdering import MoveOrdering
+from .MoveGenerator import MoveGenerator
+from .SearchPool import SearchPool
+from .TimeManager import TimeManager
+from .SearchLimits import SearchLimits, NO_LIMIT
 import time
-from .TranspositionTable import TranspositionTable, TraspositionEntry, EXACT, LOWERBOUND, UPPERBOUND
+from .TranspositionTable import TranspositionTable, EXACT, LOWERBOUND, UPPERBOUND, NO_MOVE, packMove, unpackMove
+from .EvaluationCache import EvaluationCache
 import cython
 import random
 import logging
 logger = logging.getLogger(__name__)
 if not cython.compiled: logger.warning(f"Using non-compiled {__file__} module")
 
+MAX_PLY = 64 # Maximum depth of the search
+
+ALPHABETA = "alphabeta"
+PVS = "pvs"
+SEARCH_ALGORITHMS = [ALPHABETA, PVS]
+NULL_WINDOW = 1e-4 # Width of the window used to test if a move is worse than the current best one
+ASPIRATION_WINDOW = 0.05 # Initial half-width of the window around the score of the previous iteration
+ASPIRATION_ATTEMPTS = 3 # Failed aspiration searches before using a full window
+QUIESCENCE_MAX_DEPTH = 8 # Maximum plies of the quiescence search
+NULL_MOVE_REDUCTION = 2 # Depth reduction of the search after passing the turn
+NULL_MOVE_MIN_DEPTH = 3 # Minimum remaining depth to try a null move
+LMR_FULL_MOVES = 4 # Moves of each node searched without reductions
+LMR_MIN_DEPTH = 3 # Minimum remaining depth to reduce late moves
+LMR_REDUCTION = 1 # Depth reduction of the late quiet moves
+EVAL_CACHE_MB = 4 # Memory of the cache of the static evaluations
+
+# Phases of the game, each with its own weights
+EARLY_PHASE = 0
+MID_PHASE = 1
+LATE_PHASE = 2
+
 """
     Class that represents the whole game tree.
 """
 class Tree():
-    def __init__(self, initial_state, player_color, weights: dict, tt_size=1e6, debug=False):
+    def __init__(self, initial_state, player_color, weights: dict, tt_mb=64, compact=False, search=ALPHABETA, workers=1, tt_name=None, quiescence=False, null_move=False, lmr=False, debug=False):
         self.state: State = initial_state
         self.player_color = player_color
         self.root = TreeNode(None, None)
         self.turns_count = 0
-        self.tt = TranspositionTable(tt_size)
+        if workers < 1: raise ValueError("At least one worker is required")
+        self.tt = TranspositionTable(tt_mb, shared=(workers > 1), shm_name=tt_name)
+        self.ordering = MoveOrdering(MAX_PLY)
+        self.move_generators = [ MoveGenerator(self.ordering) for _ in range(MAX_PLY) ]
+
+        # In compact mode, the tree is not kept in memory and moves are ordered using the transposition table
+        self.compact = compact
+        self.played_moves = [NO_MOVE] * MAX_PLY
+        self.root_best_move = NO_MOVE
+        self.pv = []
+
+        # Principal variation search: only the first move of each node is searched with a full window
+        if search not in SEARCH_ALGORITHMS: raise ValueError(f"Unknown search algorithm {search}")
+        self.pvs = (search == PVS)
+
+        # Quiescence search: the leaves are extended with the captures and the threats of the king
+        self.quiescence = quiescence
+
+        # Selective search: null move pruning and late move reductions
+        self.null_move = null_move
+        self.lmr = lmr
+        self.null_move_plies = [False] * MAX_PLY # Plies at which the turn has been passed
+
+        # Lazy SMP: helper processes search the same position and share the transposition table
+        self.pool = None
+        if workers > 1:
+            self.pool = SearchPool(workers-1, type(self), type(initial_state), player_color, weights, tt_mb, self.tt.shm.name, search, quiescence, null_move, lmr)
+        self.iteration_times = []
+
+        # Progress of the root search, used to salvage iterations interrupted by the timeout
+        self.root_pv_move = NO_MOVE
+        self.partial_pv_searched = False
+        self.partial_best_move = NO_MOVE
+        self.partial_best_score = 0
 
         self.early_positive_weights = weights["early"]["positive"]
         self.early_negative_weights = weights["early"]["negative"]
@@ -28,11 +88,23 @@ class Tree():
         self.late_negative_weights = weights["late"]["negative"]
         self.curr_positive_weights = self.early_positive_weights
         self.curr_negative_weights = self.early_negative_weights
+        self.weights_phase = EARLY_PHASE
+
+        # Static evaluations of the leaves, reused when a position is reached again
+        self.eval_cache = EvaluationCache(EVAL_CACHE_MB)
 
         self.__debug = debug
         if self.__debug:
             self.__explored_nodes = 0
             self.__tt_hit = 0
+            self.__evaluations = 0
+            self.__eval_hits = 0
+            self.__researches = 0
+            self.__aspiration_fails = 0
+            self.__quiescence_nodes = 0
+            self.__null_cutoffs = 0
+            self.__reductions = 0
+            self.__lmr_researches = 0
 
 
     """
@@ -43,6 +115,15 @@ class Tree():
             timeout : float
                 Seconds available to make a choice.
 
+            max_nodes : int
+                Maximum number of nodes to search (NO_LIMIT for unlimited).
+
+            max_depth : int
+                Maximum depth to search (NO_LIMIT for unlimited).
+
+            is_interrupted : Callable[[], bool]|None
+                Polled during the search, it stops as soon as it returns True.
+
         Returns
         -------
             from : tuple[int, int]
@@ -54,32 +135,40 @@ class Tree():
             best_score : float
                 Score of the chosen move.
     """
-    def decide(self, timeout):
+    def decide(self, timeout, max_nodes=NO_LIMIT, max_depth=NO_LIMIT, is_interrupted=None):
         if self.__debug: 
             self.__explored_nodes = 0
             self.__tt_hit = 0
+            self.__evaluations = 0
+            self.__eval_hits = 0
+            self.__researches = 0
+            self.__aspiration_fails = 0
+            self.__quiescence_nodes = 0
+            self.__null_cutoffs = 0
+            self.__reductions = 0
+            self.__lmr_researches = 0
 
         self.turns_count += 1
-        end_timestamp = time.time() + timeout
-        best_child = None
-        depth = 0
+        time_manager = TimeManager(timeout)
+        limits = SearchLimits(time_manager.hard_deadline, max_nodes, max_depth, is_interrupted)
+        if self.pool is not None:
+            self.pool.start(self.state.board, self.state.is_white_turn, self.turns_count, time_manager.hard_deadline)
 
-        self.__updateWeights()
-        
+        # The history is aged once per turn (not by the pondering, that prepares the reply)
+        self.ordering.decay()
         try:
-            while time.time() < end_timestamp:
-                depth += 1
-                curr_best_score = self.minimax(self.root, depth, -np.inf, +np.inf, end_timestamp)
-                if curr_best_score is None:
-                    depth -= 1
-                    break
-                best_score = curr_best_score
+            depth, best_move, best_score = self.__iterativeDeepening(time_manager, limits, 1)
+            if self.pool is not None:
+                self.pool.stop()
+                helper_results = self.pool.collect()
+                for helper_depth, helper_move, helper_score in helper_results:
+                    # The deepest completed search is the most reliable
+                    if (helper_move != NO_MOVE) and (helper_depth > depth):
+                        depth, best_move, best_score = helper_depth, helper_move, helper_score
+            if best_move == NO_MOVE:
+                raise Exception("No search iteration completed")
+            best_child = self.__rootChild(best_move)
 
-                for child in self.root.children:
-                    if child.score == best_score:
-                        best_child = child
-                        break
-            
             to_move_pawn = self.state.board[best_child.start[0], best_child.start[1]]
             if ((self.player_color == WHITE and to_move_pawn == BLACK) or
                 (self.player_color == BLACK and (to_move_pawn == WHITE or to_move_pawn == KING)) or
@@ -88,13 +177,21 @@ class Tree():
             
             if self.__debug:
                 logger.debug(f"Explored depth = {depth}")
-                logger.debug(f"Explored nodes: {self.__explored_nodes}, {self.__explored_nodes/(timeout):.2f} nodes/s | {self.__tt_hit} TT hits")
+                logger.debug(f"Explored nodes: {self.__explored_nodes}, {self.__explored_nodes/time_manager.elapsed():.2f} nodes/s | {self.__tt_hit} TT hits | {self.__eval_hits}/{self.__evaluations} evaluation cache hits ({self.__eval_hits/max(1, self.__evaluations):.1%})")
+                logger.debug(f"Search time: {time_manager.elapsed():.2f}/{timeout} s | {time_manager.wasted:.2f} s wasted on aborted iterations")
+                if self.quiescence: logger.debug(f"Quiescence nodes: {self.__quiescence_nodes}")
+                if self.null_move: logger.debug(f"Null move cutoffs: {self.__null_cutoffs}")
+                if self.lmr: logger.debug(f"Late move reductions: {self.__reductions} ({self.__lmr_researches} re-searched)")
+                if self.pvs: logger.debug(f"Re-searches: {self.__researches} null window, {self.__aspiration_fails} aspiration")
+                if self.compact: logger.debug(f"Principal variation: {self.pv}")
+                if self.pool is not None: logger.debug(f"Helpers depth: {[ result[0] for result in helper_results ]}")
             
-            self.root = best_child
+            self.root = best_child if not self.compact else TreeNode(None, None)
             _ = self.state.applyMove(best_child.start, best_child.end)
             return best_child.start, best_child.end, best_score
         except:
             logger.error("Cannot find a move. Going in emergency mode.")
+            if self.pool is not None: self.pool.stop()
             self.root = TreeNode(None, None)
             self.root.children = [*self.root.getChildren(self.state)]
             child = random.choice(self.root.children)
@@ -102,9 +199,175 @@ class Tree():
             return child.start, child.end, 0
 
 
+    """
+        Searches the current state while the opponent is thinking, until interrupted.
+        The explored tree and the transposition table are kept for the next decision.
+
+        Parameters
+        ----------
+            is_interrupted : Callable[[], bool]
+                Polled during the search, pondering stops as soon as it returns True.
+
+        Returns
+        -------
+            depth : int
+                Deepest completed iteration.
+    """
+    def ponder(self, is_interrupted) -> int:
+        depth, _, _ = self.__iterativeDeepening(TimeManager(np.inf, adaptive=False), SearchLimits(is_interrupted=is_interrupted), 1)
+        if self.__debug: logger.debug(f"Pondered depth = {depth}")
+        return depth
+
+
+    """
+        Searches a position without playing the best move.
+        Used by the helper processes of the Lazy SMP search.
+
+        Parameters
+        ----------
+            state : State
+                Position to search.
+
+            turns_count : int
+                Turn of the position (to select the weights).
+
+            end_timestamp : float
+                Time at which the search stops.
+
+            first_depth : int
+                Depth of the first iteration.
+
+            is_interrupted : Callable[[], bool]|None
+                Polled during the search, it stops as soon as it returns True.
+
+        Returns
+        -------
+            depth : int
+                Deepest completed iteration.
+
+            best_move : int
+                Best move packed with `packMove` (NO_MOVE if no iteration completed).
+
+            best_score : float
+                Score of the best move.
+    """
+    def searchPosition(self, state:State, turns_count:int, end_timestamp:float, first_depth:int=1, is_interrupted=None) -> tuple[int, int, float]:
+        self.state = state
+        self.root = TreeNode(None, None)
+        self.turns_count = turns_count
+        self.ordering.decay()
+        return self.__iterativeDeepening(TimeManager(end_timestamp - time.time(), adaptive=False), SearchLimits(end_timestamp, is_interrupted=is_interrupted), first_depth)
+
+
+    """
+        Stops the helper processes and releases the shared transposition table.
+    """
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        self.tt.close()
+
+
+    """
+        Searches the current state with iterative deepening, as long as the time manager allows new iterations.
+        The time at which each iteration completed is stored in `iteration_times`.
+        Iterations are also interrupted (and not started) when the search limits are reached.
+
+        Returns
+        -------
+            depth : int
+                Deepest completed iteration.
+
+            best_move : int
+                Best move packed with `packMove` (NO_MOVE if no iteration completed).
+
+            best_score : float
+                Score of the best move.
+    """
+    def __iterativeDeepening(self, time_manager:TimeManager, limits:SearchLimits, first_depth:int) -> tuple[int, int, float]:
+        depth_limit = limits.depthLimit(MAX_PLY)
+        depth = first_depth - 1
+        best_move = NO_MOVE
+        best_score = MIN_SCORE
+        self.iteration_times = []
+
+        self.__updateWeights()
+
+        while depth < depth_limit and time_manager.shouldStartIteration():
+            depth += 1
+            time_manager.startIteration()
+            self.root_pv_move = best_move
+            if self.pvs and best_move != NO_MOVE:
+                curr_best_score = self.__aspirationSearch(depth, best_score, limits)
+            else:
+                curr_best_score = self.__search(depth, -np.inf, +np.inf, limits)
+            if curr_best_score is None:
+                if self.partial_pv_searched and (self.partial_best_move != NO_MOVE):
+                    # The partial iteration already searched the previous best move, its best move is used
+                    best_move, best_score = self.partial_best_move, self.partial_best_score
+                    if self.compact:
+                        self.root_best_move = best_move
+                        self.pv = self.__principalVariation(depth)
+                    if self.__debug: logger.debug(f"Salvaged interrupted iteration at depth {depth}")
+                else:
+                    time_manager.iterationAborted()
+                depth -= 1
+                break
+            best_score = curr_best_score
+
+            if self.compact:
+                best_move = self.root_best_move
+                self.pv = self.__principalVariation(depth)
+            else:
+                for child in self.root.children:
+                    if child.score == best_score:
+                        best_move = child.packedMove()
+                        break
+            time_manager.iterationCompleted(best_move)
+            self.iteration_times.append(time_manager.elapsed())
+
+        return depth, best_move, best_score
+
+
+    """
+        Keeps track of the moves completely searched at the root in the current iteration.
+        If the iteration is interrupted after the best move of the previous one has been searched,
+        the best move found so far is at least as good as it at the new depth.
+
+        Parameters
+        ----------
+            move : int
+                Move searched.
+
+            score : float
+                Score of the move.
+
+            improves : bool
+                Whether the move is better than the ones searched before (i.e. its score is inside the window).
+    """
+    def __trackRootMove(self, move:int, score:float, improves:bool):
+        if move == self.root_pv_move: self.partial_pv_searched = True
+        if improves:
+            self.partial_best_move = move
+            self.partial_best_score = score
+
+
+    """
+        Returns the child of the root reached with a given move.
+        In compact mode (or if the child does not exist), a new node is created.
+    """
+    def __rootChild(self, move:int) -> TreeNode:
+        child = None if self.compact else self.root.findChild(move)
+        return child if child is not None else TreeNode(*unpackMove(move))
+
+
     """
         Moves the root of the tree to the node containing the opponent's move.
-        If it does not exist, the tree is resetted.
+        The move is recovered from the difference between the boards and applied to the current state.
+        If it is not among the children of the root, the tree is resetted.
+        If the new board cannot be reached with a move (or the captures differ),
+        the state is out of sync with the game: it is reported and replaced.
 
         Parameters
         ----------
@@ -113,25 +376,64 @@ class Tree():
     """
     def applyOpponentMove(self, next_state: State):
         try:
-            for child in self.root.children:
-                captured = self.state.applyMove(child.start, child.end)
-                if np.all(self.state.board == next_state.board):
-                    logger.debug("Not dropping tree")
-                    # Move found, update the root and
-                    # leave the board status as is (do not need to revert).
-                    self.root = child
+            move, expected_captures = self.state.findMove(next_state)
+            if move is None:
+                logger.error("Desync: the new board is not reachable with a single move")
+            else:
+                start, end = move
+                captured = self.state.applyMove(start, end)
+                captured_cells = sorted( (int(i), int(j)) for (i, j), _ in captured )
+                if captured_cells != sorted(expected_captures) or self.state.is_white_turn != next_state.is_white_turn:
+                    logger.error(f"Desync: the move {start} -> {end} captures {captured_cells} instead of {sorted(expected_captures)}")
+                else:
+                    child = self.root.findChild(packMove(start, end))
+                    if child is not None:
+                        logger.debug("Not dropping tree")
+                        self.root = child
+                    else:
+                        # Move not found among the children of the root, the current tree is deleted.
+                        logger.debug("Dropping tree")
+                        self.root = TreeNode(None, None)
                     return
-                self.state.revertMove(child.start, child.end, captured)
         except:
             logger.error("Error in applying opponent move")
-        
-        # Move not found among the children of the root,
-        # the current tree is deleted.
-        logger.debug("Dropping tree")
+
         self.state = next_state
         self.root = TreeNode(None, None)
 
 
+    """
+        Searches the root up to a given depth with the configured algorithm.
+    """
+    def __search(self, depth:int, alpha:float, beta:float, limits:SearchLimits) -> float|None:
+        self.partial_pv_searched = False
+        self.partial_best_move = NO_MOVE
+        if self.compact:
+            return self.compactMinimax(depth, 0, alpha, beta, limits)
+        return self.minimax(self.root, depth, alpha, beta, limits)
+
+
+    """
+        Searches the root with a window centered on the score of the previous iteration.
+        If the score falls outside the window, the failing side is widened and the search is repeated.
+
+        Returns
+        -------
+            best_score : float|None
+                Best score found (None on timeout).
+    """
+    def __aspirationSearch(self, depth:int, prev_score:float, limits:SearchLimits) -> float|None:
+        delta_low = delta_high = ASPIRATION_WINDOW
+        for _ in range(ASPIRATION_ATTEMPTS):
+            alpha, beta = prev_score - delta_low, prev_score + delta_high
+            score = self.__search(depth, alpha, beta, limits)
+            if (score is None) or (alpha < score < beta): return score
+            if self.__debug: self.__aspiration_fails += 1
+            if score <= alpha: delta_low *= 4
+            else: delta_high *= 4
+        return self.__search(depth, -np.inf, +np.inf, limits)
+
+
     """
         Updates the weights used to compute the heuristics.
     """
@@ -139,12 +441,42 @@ class Tree():
         if self.turns_count <= 5:
             self.curr_positive_weights = self.early_positive_weights
             self.curr_negative_weights = self.early_negative_weights
+            self.weights_phase = EARLY_PHASE
         elif self.turns_count <= 15:
             self.curr_positive_weights = self.mid_positive_weights
             self.curr_negative_weights = self.mid_negative_weights
+            self.weights_phase = MID_PHASE
         else:
             self.curr_positive_weights = self.late_positive_weights
             self.curr_negative_weights = self.late_negative_weights
+            self.weights_phase = LATE_PHASE
+
+
+    """
+        Evaluates the current state, reusing the scores of the evaluation cache.
+        The scores of the ended games depend on the depth and are not cached.
+
+        Parameters
+        ----------
+            max_depth : int
+                Remaining depth of the state.
+
+        Returns
+        -------
+            score : float
+    """
+    def __evaluate(self, max_depth:int) -> float:
+        if self.state.getGameState() != OPEN:
+            return self.state.evaluate(self.player_color, max_depth, self.curr_positive_weights, self.curr_negative_weights)
+
+        if self.__debug: self.__evaluations += 1
+        score = self.eval_cache.getScore(self.state, self.weights_phase)
+        if score is None:
+            score = self.state.heuristics(self.player_color, self.curr_positive_weights, self.curr_negative_weights)
+            self.eval_cache.setScore(self.state, self.weights_phase, score)
+        elif self.__debug:
+            self.__eval_hits += 1
+        return score
 
 
     """
@@ -161,6 +493,9 @@ class Tree():
             alpha, beta : float
                 Alpha and beta for pruning
 
+            ply : int
+                Distance of the node from the root.
+
         Returns
         -------
             best_score : float
@@ -170,15 +505,19 @@ class Tree():
         tree_node:TreeNode, 
         max_depth:int, 
         alpha:float, beta:float, 
-        timeout_timestamp:float) -> tuple[float|None, TreeNode|None]:
+        limits:SearchLimits,
+        ply:int=0) -> tuple[float|None, TreeNode|None]:
+        if limits.tick(): return None # Timeout
         if self.__debug:
             self.__explored_nodes += 1
 
         alpha_orig = alpha
         beta_orig = beta
+        best_move = NO_MOVE
 
         # Transposition table lookup
         tt_entry = self.tt[self.state]
+        tt_move = NO_MOVE if tt_entry is None else tt_entry.best_move
         if (tt_entry is not None) and (tt_entry.depth >= max_depth):
             if self.__debug: self.__tt_hit += 1
             if tt_entry.type == EXACT:
@@ -193,59 +532,383 @@ class Tree():
                 tree_node.score = tt_entry.value
                 return tt_entry.value
 
-        if self.state.getGameState() != OPEN or max_depth == 0:
-            eval = self.state.evaluate(
-                self.player_color,
-                max_depth,
-                self.curr_positive_weights,
-                self.curr_negative_weights,
-            )
+        if self.state.getGameState() != OPEN or (max_depth == 0 and not self.quiescence):
+            eval = self.__evaluate(max_depth)
+        elif max_depth == 0:
+            eval = self.quiescenceSearch(alpha, beta, limits)
+            if eval is None: return None # Timeout
         else:
-            if ((self.state.is_white_turn and self.player_color == WHITE) or
-                (not self.state.is_white_turn and self.player_color == BLACK)):
+            is_max = ((self.state.is_white_turn and self.player_color == WHITE) or
+                      (not self.state.is_white_turn and self.player_color == BLACK))
+            if self.__canNullMove(max_depth, ply, alpha, beta, is_max):
+                eval_null = self.__nullMoveSearch(tree_node, max_depth, ply, alpha, beta, is_max, limits)
+                if eval_null is None: return None # Timeout
+                if (eval_null >= beta) if is_max else (eval_null <= alpha):
+                    if self.__debug: self.__null_cutoffs += 1
+                    tree_node.score = eval_null
+                    return eval_null
+
+            if is_max:
                 # Max
                 eval = -np.inf
-                for i, child in enumerate(tree_node.getChildren(self.state)):
-                    if time.time() >= timeout_timestamp: return None # Timeout
-                    
+                for i, child in enumerate(tree_node.getChildren(self.state, tt_move, self.move_generators[ply], ply)):
+                    reducible = self.__canReduce(i, max_depth, ply) and self.state.isQuietMove(child.start, child.end)
                     captured = self.state.applyMove(child.start, child.end)
-                    eval_minimax = self.minimax(child, max_depth-1, alpha, beta, timeout_timestamp)
+                    full_search = True
+                    if reducible and not captured:
+                        # Late quiet moves are searched at a reduced depth, and fully only if they fail high
+                        eval_minimax = self.minimax(child, max_depth-1-LMR_REDUCTION, alpha, alpha+NULL_WINDOW, limits, ply+1)
+                        full_search = (eval_minimax is not None) and (eval_minimax > alpha)
+                        if self.__debug:
+                            self.__reductions += 1
+                            if full_search: self.__lmr_researches += 1
+                    if full_search and self.pvs and i > 0:
+                        # Null window search to prove that the move is not better than the current best
+                        eval_minimax = self.minimax(child, max_depth-1, alpha, alpha+NULL_WINDOW, limits, ply+1)
+                        if (eval_minimax is not None) and (alpha < eval_minimax < beta):
+                            if self.__debug: self.__researches += 1
+                            eval_minimax = self.minimax(child, max_depth-1, alpha, beta, limits, ply+1)
+                    elif full_search:
+                        eval_minimax = self.minimax(child, max_depth-1, alpha, beta, limits, ply+1)
                     self.state.revertMove(child.start, child.end, captured)
                     
                     if eval_minimax is None: return None # Timeout
                     
+                    if ply == 0: self.__trackRootMove(packMove(child.start, child.end), eval_minimax, eval_minimax > alpha)
+
                     # eval = max(eval, eval_minimax)
                     if eval_minimax > eval:
                         eval = eval_minimax
+                        best_move = packMove(child.start, child.end)
                         tree_node.prioritizeChild(i)
                     alpha = max(eval, alpha)
-                    if eval >= beta: break # cutoff
+                    if eval >= beta: # cutoff
+                        if not captured: self.ordering.recordCutoff(packMove(child.start, child.end), ply, max_depth, self.state.is_white_turn, tree_node.packedMove())
+                        break
             else:
                 # Min
                 eval = np.inf
-                for i, child in enumerate(tree_node.getChildren(self.state)):
-                    if time.time() >= timeout_timestamp: return None # Timeout
-
+                for i, child in enumerate(tree_node.getChildren(self.state, tt_move, self.move_generators[ply], ply)):
+                    reducible = self.__canReduce(i, max_depth, ply) and self.state.isQuietMove(child.start, child.end)
                     captured = self.state.applyMove(child.start, child.end)
-                    eval_minimax = self.minimax(child, max_depth-1, alpha, beta, timeout_timestamp)
+                    full_search = True
+                    if reducible and not captured:
+                        # Late quiet moves are searched at a reduced depth, and fully only if they fail high
+                        eval_minimax = self.minimax(child, max_depth-1-LMR_REDUCTION, beta-NULL_WINDOW, beta, limits, ply+1)
+                        full_search = (eval_minimax is not None) and (eval_minimax < beta)
+                        if self.__debug:
+                            self.__reductions += 1
+                            if full_search: self.__lmr_researches += 1
+                    if full_search and self.pvs and i > 0:
+                        # Null window search to prove that the move is not better than the current best
+                        eval_minimax = self.minimax(child, max_depth-1, beta-NULL_WINDOW, beta, limits, ply+1)
+                        if (eval_minimax is not None) and (alpha < eval_minimax < beta):
+                            if self.__debug: self.__researches += 1
+                            eval_minimax = self.minimax(child, max_depth-1, alpha, beta, limits, ply+1)
+                    elif full_search:
+                        eval_minimax = self.minimax(child, max_depth-1, alpha, beta, limits, ply+1)
                     self.state.revertMove(child.start, child.end, captured)
                     
                     if eval_minimax is None: return None # Timeout
 
+                    if ply == 0: self.__trackRootMove(packMove(child.start, child.end), eval_minimax, eval_minimax < beta)
+
                     # eval = min(eval, eval_minimax)
                     if eval_minimax < eval:
                         eval = eval_minimax
+                        best_move = packMove(child.start, child.end)
                         tree_node.prioritizeChild(i)
                     beta = min(eval, beta)
-                    if eval <= alpha: break # cutoff
+                    if eval <= alpha: # cutoff
+                        if not captured: self.ordering.recordCutoff(packMove(child.start, child.end), ply, max_depth, self.state.is_white_turn, tree_node.packedMove())
+                        break
 
         # Store in transposition table
-        self.tt[self.state] = TraspositionEntry(
+        self.tt.setEntry(self.state,
             entry_type = UPPERBOUND if eval <= alpha_orig else LOWERBOUND if eval >= beta_orig else EXACT,
             value = eval,
-            depth = max_depth
+            depth = max_depth,
+            best_move = best_move
         )
 
         tree_node.score = eval
         return eval
-        
+
+
+    """
+        Runs minimax with alpha-beta pruning without building the tree.
+        The moves of each ply are produced by a preallocated staged move generator
+        and the best move of each position is retrieved from the transposition table.
+
+        Parameters
+        ----------
+            max_depth : int
+                Maximum reachable depth before evaluating the node.
+
+            ply : int
+                Distance from the root.
+
+            alpha, beta : float
+                Alpha and beta for pruning
+
+        Returns
+        -------
+            best_score : float|None
+                Best score found (None on timeout).
+    """
+    def compactMinimax(self, max_depth:int, ply:int, alpha:float, beta:float, limits:SearchLimits) -> float|None:
+        if limits.tick(): return None # Timeout
+        if self.__debug:
+            self.__explored_nodes += 1
+
+        alpha_orig = alpha
+        beta_orig = beta
+        best_move = NO_MOVE
+
+        # Transposition table lookup (the root is always searched to determine its best move)
+        tt_entry = self.tt[self.state]
+        tt_move = NO_MOVE if tt_entry is None else tt_entry.best_move
+        if (ply > 0) and (tt_entry is not None) and (tt_entry.depth >= max_depth):
+            if self.__debug: self.__tt_hit += 1
+            if tt_entry.type == EXACT:
+                return tt_entry.value
+            if tt_entry.type == LOWERBOUND:
+                alpha = max(alpha, tt_entry.value)
+            elif tt_entry.type == UPPERBOUND:
+                beta = min(beta, tt_entry.value)
+
+            if alpha >= beta: 
+                return tt_entry.value
+
+        if self.state.getGameState() != OPEN or (max_depth == 0 and not self.quiescence):
+            eval = self.__evaluate(max_depth)
+        elif max_depth == 0:
+            eval = self.quiescenceSearch(alpha, beta, limits)
+            if eval is None: return None # Timeout
+        else:
+            is_max = ((self.state.is_white_turn and self.player_color == WHITE) or
+                      (not self.state.is_white_turn and self.player_color == BLACK))
+            if self.__canNullMove(max_depth, ply, alpha, beta, is_max):
+                eval_null = self.__nullMoveSearch(None, max_depth, ply, alpha, beta, is_max, limits)
+                if eval_null is None: return None # Timeout
+                if (eval_null >= beta) if is_max else (eval_null <= alpha):
+                    if self.__debug: self.__null_cutoffs += 1
+                    return eval_null
+
+            generator = self.move_generators[ply]
+            generator.reset(self.state, tt_move, ply, self.__previousMove(ply))
+            eval = -np.inf if is_max else np.inf
+
+            k = 0
+            while (move := generator.next()) != NO_MOVE:
+                start, end = unpackMove(move)
+                reducible = self.__canReduce(k, max_depth, ply) and self.state.isQuietMove(start, end)
+                self.played_moves[ply] = move
+                captured = self.state.applyMove(start, end)
+                full_search = True
+                if reducible and not captured:
+                    # Late quiet moves are searched at a reduced depth, and fully only if they fail high
+                    if is_max:
+                        eval_minimax = self.compactMinimax(max_depth-1-LMR_REDUCTION, ply+1, alpha, alpha+NULL_WINDOW, limits)
+                    else:
+                        eval_minimax = self.compactMinimax(max_depth-1-LMR_REDUCTION, ply+1, beta-NULL_WINDOW, beta, limits)
+                    full_search = (eval_minimax is not None) and ((eval_minimax > alpha) if is_max else (eval_minimax < beta))
+                    if self.__debug:
+                        self.__reductions += 1
+                        if full_search: self.__lmr_researches += 1
+                if full_search and self.pvs and k > 0:
+                    # Null window search to prove that the move is not better than the current best
+                    if is_max:
+                        eval_minimax = self.compactMinimax(max_depth-1, ply+1, alpha, alpha+NULL_WINDOW, limits)
+                    else:
+                        eval_minimax = self.compactMinimax(max_depth-1, ply+1, beta-NULL_WINDOW, beta, limits)
+                    if (eval_minimax is not None) and (alpha < eval_minimax < beta):
+                        if self.__debug: self.__researches += 1
+                        eval_minimax = self.compactMinimax(max_depth-1, ply+1, alpha, beta, limits)
+                elif full_search:
+                    eval_minimax = self.compactMinimax(max_depth-1, ply+1, alpha, beta, limits)
+                self.state.revertMove(start, end, captured)
+
+                if eval_minimax is None: return None # Timeout
+
+                if ply == 0: self.__trackRootMove(move, eval_minimax, (eval_minimax > alpha) if is_max else (eval_minimax < beta))
+
+                if is_max:
+                    if eval_minimax > eval:
+                        eval = eval_minimax
+                        best_move = move
+                    alpha = max(eval, alpha)
+                    if eval >= beta: # cutoff
+                        if not captured: self.ordering.recordCutoff(move, ply, max_depth, self.state.is_white_turn, self.__previousMove(ply))
+                        break
+                else:
+                    if eval_minimax < eval:
+                        eval = eval_minimax
+                        best_move = move
+                    beta = min(eval, beta)
+                    if eval <= alpha: # cutoff
+                        if not captured: self.ordering.recordCutoff(move, ply, max_depth, self.state.is_white_turn, self.__previousMove(ply))
+                        break
+                k += 1
+
+        # Store in transposition table
+        self.tt.setEntry(self.state,
+            entry_type = UPPERBOUND if eval <= alpha_orig else LOWERBOUND if eval >= beta_orig else EXACT,
+            value = eval,
+            depth = max_depth,
+            best_move = best_move
+        )
+
+        if ply == 0: self.root_best_move = best_move
+        return eval
+
+
+    """
+        Searches only the moves that change the position sharply (see `State.getQuiescenceMoves`),
+        so that the leaves are not evaluated in the middle of a sequence of captures or before an escape of the king.
+        The player to move can stop the sequence by keeping the static evaluation (stand pat),
+        unless black has to stop an escape of the king.
+
+        Parameters
+        ----------
+            alpha, beta : float
+                Alpha and beta for pruning
+
+            depth : int
+                Plies already searched by the quiescence search.
+
+        Returns
+        -------
+            best_score : float|None
+                Best score found (None on timeout).
+    """
+    def quiescenceSearch(self, alpha:float, beta:float, limits:SearchLimits, depth:int=0) -> float|None:
+        if limits.tick(): return None # Timeout
+        if self.__debug:
+            self.__quiescence_nodes += 1
+
+        if self.state.getGameState() != OPEN or depth == QUIESCENCE_MAX_DEPTH:
+            return self.__evaluate(0)
+
+        is_max = ((self.state.is_white_turn and self.player_color == WHITE) or
+                  (not self.state.is_white_turn and self.player_color == BLACK))
+        threatened = (not self.state.is_white_turn) and self.state.canKingEscape()
+        if threatened:
+            # Black cannot stand pat
+            eval = -np.inf if is_max else np.inf
+        else:
+            eval = self.__evaluate(0)
+            if is_max:
+                if eval >= beta: return eval
+                alpha = max(eval, alpha)
+            else:
+                if eval <= alpha: return eval
+                beta = min(eval, beta)
+
+        # The threats of the king are searched only at the first ply, the following ones only resolve them
+        moves = self.state.getQuiescenceMoves(king_threats=(depth == 0))
+        if threatened and len(moves) == 0:
+            # The escape cannot be stopped
+            return MAX_SCORE if self.player_color == WHITE else MIN_SCORE
+        for start, end in moves:
+            captured = self.state.applyMove(start, end)
+            eval_quiescence = self.quiescenceSearch(alpha, beta, limits, depth+1)
+            self.state.revertMove(start, end, captured)
+
+            if eval_quiescence is None: return None # Timeout
+
+            if is_max:
+                eval = max(eval, eval_quiescence)
+                alpha = max(eval, alpha)
+                if eval >= beta: break # cutoff
+            else:
+                eval = min(eval, eval_quiescence)
+                beta = min(eval, beta)
+                if eval <= alpha: break # cutoff
+        return eval
+
+
+    """
+        Checks if the player to move can pass the turn to prune the node (null move pruning).
+        The null move is not tried at the root, after another null move, without a bound to prove
+        and when black has to stop an escape of the king (passing would never be good enough).
+    """
+    def __canNullMove(self, max_depth:int, ply:int, alpha:float, beta:float, is_max:bool) -> bool:
+        if (not self.null_move) or (ply == 0) or (max_depth < NULL_MOVE_MIN_DEPTH) or self.null_move_plies[ply-1]:
+            return False
+        if (beta >= MAX_SCORE) if is_max else (alpha <= MIN_SCORE):
+            return False
+        return self.state.is_white_turn or not self.state.canKingEscape()
+
+
+    """
+        Searches the position with the turn passed to the opponent at a reduced depth.
+        If the player is still above beta (below alpha for min) without moving,
+        a real move is assumed to be even better and the node is cut off with the returned bound.
+
+        Parameters
+        ----------
+            tree_node : TreeNode|None
+                Node of the position (None in compact mode).
+
+        Returns
+        -------
+            bound : float|None
+                Score of the null move search, clamped to the tested bound on cutoff (None on timeout).
+    """
+    def __nullMoveSearch(self, tree_node:TreeNode|None, max_depth:int, ply:int, alpha:float, beta:float, is_max:bool, limits:SearchLimits) -> float|None:
+        depth = max_depth - 1 - NULL_MOVE_REDUCTION
+        low, high = (beta-NULL_WINDOW, beta) if is_max else (alpha, alpha+NULL_WINDOW)
+
+        self.state.flipTurn()
+        self.null_move_plies[ply] = True
+        if tree_node is None:
+            self.played_moves[ply] = NO_MOVE
+            eval_null = self.compactMinimax(depth, ply+1, low, high, limits)
+        else:
+            eval_null = self.minimax(TreeNode(None, None), depth, low, high, limits, ply+1)
+        self.null_move_plies[ply] = False
+        self.state.flipTurn()
+
+        if eval_null is None: return None # Timeout
+        # Passing the turn does not prove a win or a loss, only the bound is returned
+        if is_max and eval_null >= beta: return beta
+        if (not is_max) and eval_null <= alpha: return alpha
+        return eval_null
+
+
+    """
+        Checks if the k-th move of a node can be searched at a reduced depth (late move reduction).
+        The first moves of each node and the moves of the root are never reduced.
+        The critical moves are excluded by the caller with `State.isQuietMove` and by not reducing captures.
+    """
+    def __canReduce(self, k:int, max_depth:int, ply:int) -> bool:
+        return self.lmr and (ply > 0) and (k >= LMR_FULL_MOVES) and (max_depth >= LMR_MIN_DEPTH)
+
+
+    """
+        Returns the move that lead to the position at a given ply of the compact search.
+    """
+    def __previousMove(self, ply:int) -> int:
+        return self.played_moves[ply-1] if ply > 0 else NO_MOVE
+
+
+    """
+        Extracts the principal variation from the transposition table.
+    """
+    def __principalVariation(self, max_length:int) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        pv = []
+        history = []
+        move = self.root_best_move
+        while (move != NO_MOVE) and (len(pv) < max_length):
+            start, end = unpackMove(move)
+            critical_moves, other_moves = self.state.getMoves()
+            if (start, end) not in critical_moves and (start, end) not in other_moves: break
+            pv.append( (start, end) )
+            history.append( (start, end, self.state.applyMove(start, end)) )
+            if self.state.getGameState() != OPEN: break
+            tt_entry = self.tt[self.state]
+            move = NO_MOVE if tt_entry is None else tt_entry.best_move
+        for start, end, captured in reversed(history):
+            self.state.revertMove(start, end, captured)
+        return pv
@@ -1,5 +1,7 @@
 from __future__ import annotations
 from .State import State
+from .TranspositionTable import NO_MOVE, packMove, unpackMove
+from .MoveGenerator import MoveGenerator
 from typing import Generator
 import cython
 import logging
@@ -15,38 +17,104 @@ class TreeNode():
         self.end = end
         self.score: float = None
         self.children: list[TreeNode] = None
-        self.critical_len = 0
+        self.expanded = False # True when all the children have been generated
 
 
     """
         Returns a generator of the children of the node with a given state.
         Children are generated if needed.
+        With a move generator, children are generated lazily one at a time,
+        so that the moves after a cutoff are not computed (they will be if the node is visited again).
 
         Parameters
         ----------
             state : State
                 State of the board. Needed to generate the children if needed.
 
+            best_move : int
+                Move (packed with `packMove`) to try first, if it is legal.
+                Usually the best move stored in the transposition table.
+
+            generator : MoveGenerator|None
+                Staged move generator to use. If not given, all the children are generated at once.
+
+            ply : int
+                Distance of the node from the root.
+
         Returns
         -------
             children_generator : Generator[TreeNode]
                 Children of this node.
     """
-    def getChildren(self, state: State) -> Generator[TreeNode]:
-        if self.children is None:
+    def getChildren(self, state: State, best_move:int=NO_MOVE, generator:MoveGenerator|None=None, ply:int=0) -> Generator[TreeNode]:
+        if generator is None and not self.expanded:
             # Children of this node haven't been generated yet
-            self.children = []
-            
             critical_moves, other_moves = state.getMoves()
-            self.critical_len = len(critical_moves)
-            for start, end in critical_moves + other_moves:
-                child = TreeNode(start, end)
-                self.children.append(child)
-                
-        # Children of this node already generated
-        for child in self.children:
-            yield child
+            self.children = [ TreeNode(start, end) for start, end in critical_moves + other_moves ]
+            self.expanded = True
+        elif self.children is None:
+            self.children = []
+
+        if best_move != NO_MOVE:
+            self.prioritizeMove(best_move)
+
+        if not self.expanded:
+            generator.reset(state, best_move, ply, self.packedMove())
+            if best_move != NO_MOVE and self.findChild(best_move) is None:
+                # The generator would only produce it after the children generated so far
+                start, end = unpackMove(best_move)
+                if state.isLegalMove(start, end): self.children.insert(0, TreeNode(start, end))
+            for child in self.children:
+                generator.skip(packMove(child.start, child.end))
+
+        # Children already generated first, then the new ones
+        i = 0
+        while True:
+            if i < len(self.children):
+                yield self.children[i]
+                i += 1
+            elif self.expanded:
+                return
+            else:
+                move = generator.next()
+                if move == NO_MOVE:
+                    self.expanded = True
+                    return
+                self.children.append(TreeNode(*unpackMove(move)))
+
+
+    """
+        Returns the move that leads to this node packed with `packMove` (NO_MOVE for the root).
+    """
+    def packedMove(self) -> int:
+        return NO_MOVE if self.start is None else packMove(self.start, self.end)
+
+
+    """
+        Returns the child reached with a given move (packed with `packMove`).
+        Only the packed moves of the children are compared, the board is not needed.
+
+        Returns
+        -------
+            child : TreeNode|None
+                None if the move is not among the generated children.
+    """
+    def findChild(self, move:int) -> TreeNode|None:
+        for child in (self.children or []):
+            if child.packedMove() == move: return child
+        return None
 
 
     def prioritizeChild(self, index:int):
-        self.children.insert(0, self.children.pop(index))
\ No newline at end of file
+        self.children.insert(0, self.children.pop(index))
+
+
+    """
+        Moves the child with a given move in first position.
+        Nothing is done if the move is not among the children.
+    """
+    def prioritizeMove(self, move:int):
+        for i, child in enumerate(self.children):
+            if packMove(child.start, child.end) == move:
+                if i > 0: self.prioritizeChild(i)
+                return
\ No newline at end of file
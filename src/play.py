@@ -1,5 +1,5 @@
 import argparse
-from Player import Player
+from Player import Player, AsyncPlayer
 import json
 import logging
 logging.basicConfig(level=logging.DEBUG)
@@ -13,8 +13,17 @@ if __name__ == "__main__":
     parser.add_argument("-c", "--color", type=str.lower, required=True, choices=["white", "black"], help="Color of the player")
     parser.add_argument("-t", "--timeout", type=int, default=60, help="Time available to make a decision")
     parser.add_argument("-w", "--weights", type=str, default="./weights.json", help="Weights to load")
-    parser.add_argument("--tt-size", type=int, default=1_000_000, help="Number of entries in the transposition table")
+    parser.add_argument("--tt-mb", type=float, default=64, help="Memory (in MB) of the transposition table")
+    parser.add_argument("--compact", action="store_true", default=False, help="Search without keeping the game tree in memory")
+    parser.add_argument("--search", type=str.lower, default="alphabeta", choices=["alphabeta", "pvs"], help="Search algorithm (pvs uses null windows and aspiration windows)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes of the search (Lazy SMP)")
+    parser.add_argument("--quiescence", action="store_true", default=False, help="Extend the leaves with the quiescence search")
+    parser.add_argument("--null-move", action="store_true", default=False, help="Enable the null move pruning")
+    parser.add_argument("--lmr", action="store_true", default=False, help="Enable the late move reductions")
+    parser.add_argument("--ponder", action="store_true", default=False, help="Search while the opponent is thinking")
     parser.add_argument("--tol", type=int, default=3, help="Tolerance on the timeout")
+    parser.add_argument("--asyncio", action="store_true", default=False, help="Handle the server on an event loop, concurrently with the search")
+    parser.add_argument("--bitboard", action="store_true", default=False, help="Use the bitboard representation of the board")
     parser.add_argument("--debug", action="store_true", default=False, help="Enable debug logs")
     args = parser.parse_args()
 
@@ -22,14 +31,22 @@ if __name__ == "__main__":
     with open(args.weights, "r") as f:
         weights = json.load(f)
 
-    player = Player(
+    player = (AsyncPlayer if args.asyncio else Player)(
         my_color = args.color,
         timeout = args.timeout,
         timeout_tol = args.tol,
         weights = weights[args.color],
-        tt_size = args.tt_size,
+        tt_mb = args.tt_mb,
+        compact = args.compact,
+        search = args.search,
+        workers = args.workers,
+        quiescence = args.quiescence,
+        null_move = args.null_move,
+        lmr = args.lmr,
+        ponder = args.ponder,
         server_ip = args.ip,
         server_port = args.port,
+        bitboard = args.bitboard,
         debug = args.debug,
     )
 
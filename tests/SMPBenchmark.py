@@ -0,0 +1,86 @@
+"""
+    Measures how the Lazy SMP search scales with the number of processes.
+    For each number of workers, every position is searched for a fixed time and the time
+    the main search takes to complete a reference depth (the deepest one completed by all the runs)
+    is compared with the single process search.
+
+    Example:
+        python SMPBenchmark.py --workers 1 2 4 8 16 --timeout 20 --cython
+"""
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+import argparse
+import json
+import random
+import numpy as np
+
+B, W, K, E = 1, 2, 3, 0
+initial_state =  [[E,E,E,B,B,B,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,E,W,E,E,E,E],
+                  [B,E,E,E,W,E,E,E,B],
+                  [B,B,W,W,K,W,W,B,B],
+                  [B,E,E,E,W,E,E,E,B],
+                  [E,E,E,E,W,E,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,B,B,B,E,E,E]]
+
+
+"""
+    Positions reached with random moves from the initial state.
+"""
+def randomPositions(n_positions, plies_between, seed):
+    from gametree.State import State
+    rng = random.Random(seed)
+    state = State(np.array(initial_state, dtype=np.byte), True)
+    positions = []
+    for _ in range(n_positions):
+        positions.append( (state.board.copy(), state.is_white_turn) )
+        for _ in range(plies_between):
+            critical, others = state.getMoves()
+            start, end = rng.choice(critical + others)
+            state.applyMove(start, end)
+    return positions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lazy SMP scaling benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Number of processes to test")
+    parser.add_argument("--timeout", type=float, default=10, help="Seconds of search for each position")
+    parser.add_argument("--positions", type=int, default=4, help="Number of positions")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tt-mb", type=float, default=64, help="Memory (in MB) of the transposition table")
+    parser.add_argument("--compact", action="store_true", default=False)
+    parser.add_argument("--search", type=str.lower, default="alphabeta", choices=["alphabeta", "pvs"])
+    parser.add_argument("--cython", action="store_true", default=False, help="Use the compiled modules")
+    args = parser.parse_args()
+
+    if args.cython:
+        from cgametree.State import State
+        from cgametree.Tree import Tree
+    else:
+        from gametree.State import State
+        from gametree.Tree import Tree
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src/weights.json"), "r") as f:
+        weights = json.load(f)
+
+    positions = randomPositions(args.positions, 4, args.seed)
+    # iteration_times[workers][position] = completion time of each depth of the main search
+    iteration_times = {}
+    for workers in args.workers:
+        iteration_times[workers] = []
+        for board, is_white_turn in positions:
+            color = W if is_white_turn else B
+            tree = Tree(State(board.copy(), is_white_turn), color, weights["white" if is_white_turn else "black"], args.tt_mb, compact=args.compact, search=args.search, workers=workers)
+            tree.decide(args.timeout)
+            iteration_times[workers].append(list(tree.iteration_times))
+            tree.close()
+
+    print(f"{'workers':>8} {'avg depth':>10} {'time to depth':>14} {'speedup':>8}")
+    ref_depths = [ min(len(iteration_times[w][p]) for w in args.workers) for p in range(len(positions)) ]
+    base_time = None
+    for workers in args.workers:
+        avg_depth = np.mean([ len(times) for times in iteration_times[workers] ])
+        time_to_depth = sum( times[ref_depths[p]-1] for p, times in enumerate(iteration_times[workers]) if ref_depths[p] > 0 )
+        if base_time is None: base_time = time_to_depth
+        print(f"{workers:>8} {avg_depth:>10.2f} {time_to_depth:>13.2f}s {base_time/time_to_depth:>7.2f}x")
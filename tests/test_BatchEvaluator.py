@@ -0,0 +1,75 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.State import *
+from gametree.BatchEvaluator import *
+import numpy as np
+import json
+import random
+import unittest
+
+B = BLACK
+W = WHITE
+K = KING
+E = EMPTY
+
+initial_state =  [[E,E,E,B,B,B,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,E,W,E,E,E,E],
+                  [B,E,E,E,W,E,E,E,B],
+                  [B,B,W,W,K,W,W,B,B],
+                  [B,E,E,E,W,E,E,E,B],
+                  [E,E,E,E,W,E,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,B,B,B,E,E,E]]
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src/weights.json"), "r") as f:
+    weights = json.load(f)
+
+
+def randomGames(n_games):
+    boards = []
+    rng = random.Random(42)
+    for _ in range(n_games):
+        state = State(np.array(initial_state, dtype=np.byte), True)
+        while state.getGameState() == OPEN and len(boards) < 60*n_games:
+            critical, others = state.getMoves()
+            state.applyMove(*rng.choice(critical + others))
+            boards.append(state.board.copy())
+    return np.array(boards)
+
+
+class TestBatchEvaluator(unittest.TestCase):
+
+    def test_batchEvaluate(self):
+        boards = randomGames(10)
+        for color, player in ((WHITE, "white"), (BLACK, "black")):
+            for phase in ("early", "mid", "late"):
+                positive_weights = weights[player][phase]["positive"]
+                negative_weights = weights[player][phase]["negative"]
+                expected = [ State(board.copy(), True).evaluate(color, 3, positive_weights, negative_weights) for board in boards ]
+                scores = batchEvaluate(boards, color, 3, positive_weights, negative_weights)
+                np.testing.assert_allclose(scores, expected, atol=1e-9)
+
+    def test_batchFeatures(self):
+        features = batchFeatures(np.array([initial_state], dtype=np.byte))[0]
+        self.assertEqual(features[PAWNS_WHITE], 1)
+        self.assertEqual(features[PAWNS_BLACK], 1)
+        self.assertEqual(features[KING_DANGER], 0)
+        self.assertAlmostEqual(features[ESCAPE_PROXIMITY], 1 - 6/13)
+
+    def test_evaluateChildren(self):
+        state = State(np.array(initial_state, dtype=np.byte), True)
+        critical, others = state.getMoves()
+        moves = critical + others
+        positive_weights = weights["white"]["early"]["positive"]
+        negative_weights = weights["white"]["early"]["negative"]
+        scores = evaluateChildren(state, moves, WHITE, 0, positive_weights, negative_weights)
+        self.assertTrue(np.all(state.board == np.array(initial_state, dtype=np.byte)))
+        for move, score in zip(moves, scores):
+            captured = state.applyMove(*move)
+            self.assertAlmostEqual(score, state.evaluate(WHITE, 0, positive_weights, negative_weights))
+            state.revertMove(*move, captured)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.State import *
+from gametree.BitboardState import BitboardState
+import numpy as np
+import random
+import unittest
+
+B = BLACK
+W = WHITE
+K = KING
+E = EMPTY
+
+initial_state =  [[E,E,E,B,B,B,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,E,W,E,E,E,E],
+                  [B,E,E,E,W,E,E,E,B],
+                  [B,B,W,W,K,W,W,B,B],
+                  [B,E,E,E,W,E,E,E,B],
+                  [E,E,E,E,W,E,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,B,B,B,E,E,E]]
+
+
+def allMoves(state):
+    critical, others = state.getMoves()
+    return sorted(critical + others)
+
+
+class TestBitboardState(unittest.TestCase):
+
+    def test_numSteps(self):
+        b = [[E,E,E,B,B,B,E,E,E],
+             [E,E,E,E,B,E,E,E,E],
+             [K,E,B,E,W,E,E,E,E],
+             [E,B,E,E,E,E,E,E,E],
+             [B,E,E,E,E,E,W,B,B],
+             [B,E,E,E,W,E,E,E,B],
+             [E,E,E,E,W,E,E,E,E],
+             [E,E,E,E,B,E,E,E,E],
+             [E,E,E,B,B,B,E,E,E]]
+        s = BitboardState(np.array(b, dtype=np.byte), True)
+        self.assertEqual(s.numSteps(3,1,RIGHT), 6)
+        self.assertEqual(s.numSteps(3,1,UP), 3)
+        self.assertEqual(s.numSteps(3,1,LEFT), 0)
+        self.assertEqual(s.numSteps(3,1,DOWN), 0)
+        self.assertEqual(s.numSteps(0,3,DOWN), 7)
+        self.assertEqual(s.numSteps(0,4,DOWN), 0)
+
+    def test_getMoves(self):
+        s = BitboardState(np.array(initial_state, dtype=np.byte), True)
+        critical, others = s.getMoves()
+        self.assertEqual(len(critical) + len(others), 56)
+
+    def test_sameRulesAsState(self):
+        random.seed(0)
+        for _ in range(20):
+            state = State(np.array(initial_state, dtype=np.byte), True)
+            bb_state = BitboardState(np.array(initial_state, dtype=np.byte), True)
+            history = []
+
+            for _ in range(60):
+                self.assertEqual(bb_state.getGameState(), state.getGameState())
+                if state.getGameState() != OPEN: break
+
+                moves = allMoves(state)
+                self.assertEqual(allMoves(bb_state), moves)
+                for i in range(9):
+                    for j in range(9):
+                        for direction in (RIGHT, UP, LEFT, DOWN):
+                            if state.board[i, j] != EMPTY:
+                                self.assertEqual(bb_state.numSteps(i, j, direction), state.numSteps(i, j, direction))
+                        self.assertEqual(bool(bb_state.isCaptured(i, j)), bool(state.isCaptured(i, j)))
+
+                start, end = random.choice(moves)
+                captured = state.applyMove(start, end)
+                self.assertEqual(bb_state.applyMove(start, end), captured)
+                self.assertTrue(np.all(bb_state.board == state.board))
+                self.assertEqual(bb_state.hash(), state.hash())
+                self.assertEqual(bb_state.hash(normalize=True), state.hash(normalize=True))
+                history.append((start, end, captured))
+
+            # Undo the whole game
+            for start, end, captured in reversed(history):
+                bb_state.revertMove(start, end, captured)
+            self.assertTrue(np.all(bb_state.board == np.array(initial_state, dtype=np.byte)))
+            self.assertEqual(allMoves(bb_state), allMoves(BitboardState(np.array(initial_state, dtype=np.byte), True)))
+
+
+if __name__ == "__main__":
+    unittest.main()
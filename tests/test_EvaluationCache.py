@@ -0,0 +1,50 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.State import *
+from gametree.EvaluationCache import *
+import numpy as np
+import unittest
+
+B = BLACK
+W = WHITE
+K = KING
+E = EMPTY
+
+initial_state =  [[E,E,E,B,B,B,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,E,W,E,E,E,E],
+                  [B,E,E,E,W,E,E,E,B],
+                  [B,B,W,W,K,W,W,B,B],
+                  [B,E,E,E,W,E,E,E,B],
+                  [E,E,E,E,W,E,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,B,B,B,E,E,E]]
+
+
+class TestEvaluationCache(unittest.TestCase):
+
+    def test_size(self):
+        cache = EvaluationCache(1)
+        self.assertLessEqual(cache.table.nbytes, 2**20)
+        self.assertGreater(cache.table.nbytes, 2**19)
+
+    def test_scores(self):
+        cache = EvaluationCache(1)
+        s = State(np.array(initial_state, dtype=np.byte), True)
+        self.assertIsNone(cache.getScore(s, 0))
+        cache.setScore(s, 0, 0.25)
+        self.assertEqual(cache.getScore(s, 0), 0.25)
+        # Scores of the other phases are not reused
+        self.assertIsNone(cache.getScore(s, 1))
+
+        # Symmetric positions share the score
+        flipped = State(np.flip(s.board, axis=1).copy(), True)
+        self.assertEqual(cache.getScore(flipped, 0), 0.25)
+
+        start, end = s.getMoves()[1][0]
+        s.applyMove(start, end)
+        self.assertIsNone(cache.getScore(s, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.State import *
+from LocalServer import *
+from ServerProtocol import ServerConnection, encodeMove
+import numpy as np
+import socket
+import threading
+import struct
+import time
+import json
+import unittest
+
+B = BLACK
+W = WHITE
+K = KING
+E = EMPTY
+
+weights = json.load(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src/weights.json")))
+
+
+class TestLocalServer(unittest.TestCase):
+
+    def test_referee(self):
+        referee = Referee()
+        self.assertEqual(referee.turn, WHITE_TURN)
+        self.assertEqual(referee.applyMove((2, 4), (2, 1)), BLACK_TURN)
+        self.assertEqual(referee.applyMove((0, 3), (0, 1)), WHITE_TURN)
+        self.assertEqual(referee.result(), (WHITE_TURN, 1, 1))
+
+        # Back to an already seen state
+        referee.applyMove((2, 1), (2, 2))
+        referee.applyMove((0, 1), (0, 2))
+        self.assertEqual(referee.applyMove((2, 2), (2, 1)), BLACK_TURN)
+        self.assertEqual(referee.applyMove((0, 2), (0, 1)), DRAW_TURN)
+        self.assertTrue(referee.isOver())
+
+        # Illegal moves
+        for move in (((0, 3), (0, 1)), ((2, 4), (2, 4)), ((4, 4), (4, 4)), ((2, 4), (9, 4)), ((2, 4), (3, 5))):
+            referee = Referee()
+            self.assertEqual(referee.applyMove(*move), BLACK_WIN_TURN)
+            self.assertEqual(referee.result(), (BLACK_WIN_TURN, 0, 0))
+
+    def test_endOfGame(self):
+        # King escaping
+        board = np.zeros((9, 9), dtype=np.byte)
+        board[2, 1], board[4, 0], board[8, 8] = K, B, B
+        referee = Referee(board)
+        self.assertEqual(referee.applyMove((2, 1), (0, 1)), WHITE_WIN_TURN)
+
+        # Black without moves after a white move
+        board = np.zeros((9, 9), dtype=np.byte)
+        board[8, 0], board[7, 0], board[8, 2], board[6, 6] = B, W, W, K
+        referee = Referee(board)
+        self.assertEqual(referee.applyMove((8, 2), (8, 1)), WHITE_WIN_TURN)
+
+        referee = Referee(max_turns=2)
+        referee.applyMove((2, 4), (2, 1))
+        self.assertEqual(referee.applyMove((0, 3), (0, 1)), DRAW_TURN)
+
+    def test_matchServer(self):
+        server = MatchServer(timeout=0.5, white_port=0, black_port=0)
+        result = []
+        server_thread = threading.Thread(target=lambda: result.append(server.run()))
+        server_thread.start()
+
+        players = {}
+        for color, port in ((WHITE, server.white_port), (BLACK, server.black_port)):
+            players[color] = ServerConnection(socket.create_connection(("localhost", port)))
+            players[color].sendMessage(b"player")
+        for player in players.values():
+            self.assertEqual(player.receiveState()[0], WHITE_TURN)
+
+        players[WHITE].sendMove((2, 4), (2, 1), WHITE)
+        for player in players.values():
+            turn, board = player.receiveState()
+            self.assertEqual(turn, BLACK_TURN)
+            self.assertEqual(board[2, 1], WHITE)
+
+        # Black runs out of time
+        for player in players.values():
+            self.assertEqual(player.receiveState()[0], WHITE_WIN_TURN)
+        server_thread.join()
+        self.assertEqual(result[0], (WHITE_WIN_TURN, 1, 0))
+        for player in players.values(): player.close()
+
+    def test_moveDeadline(self):
+        server = MatchServer(timeout=1, white_port=0, black_port=0)
+        result = []
+        server_thread = threading.Thread(target=lambda: result.append(server.run()))
+        server_thread.start()
+
+        players = {}
+        for color, port in ((WHITE, server.white_port), (BLACK, server.black_port)):
+            players[color] = ServerConnection(socket.create_connection(("localhost", port)))
+            players[color].sendMessage(b"player")
+        for player in players.values():
+            self.assertEqual(player.receiveState()[0], WHITE_TURN)
+
+        # Every chunk arrives within the timeout, but the whole move does not
+        move = encodeMove((2, 4), (2, 1), WHITE)
+        message = struct.pack(">i", len(move)) + move
+        for chunk in (message[:4], message[4:10], message[10:]):
+            players[WHITE].sock.sendall(chunk)
+            time.sleep(0.6)
+        for player in players.values():
+            self.assertEqual(player.receiveState()[0], BLACK_WIN_TURN)
+        server_thread.join()
+        self.assertEqual(result[0], (BLACK_WIN_TURN, 0, 0))
+        for player in players.values(): player.close()
+
+    def test_inProcess(self):
+        turn, white_moves, black_moves = playInProcess(weights["white"], weights["black"], max_depth=1, max_turns=6, tt_mb=1)
+        self.assertEqual((turn, white_moves, black_moves), (DRAW_TURN, 3, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.State import *
+from gametree.MoveOrdering import MoveOrdering
+from gametree.MoveGenerator import MoveGenerator
+from gametree.TranspositionTable import NO_MOVE, packMove, unpackMove
+import numpy as np
+import unittest
+
+B = BLACK
+W = WHITE
+K = KING
+E = EMPTY
+
+board =  [[E,E,E,B,B,B,E,E,E],
+          [E,E,E,E,B,E,E,E,E],
+          [E,W,B,E,E,E,E,E,E],
+          [B,E,E,E,E,E,E,E,B],
+          [B,B,E,E,K,E,E,B,B],
+          [B,E,E,W,E,E,E,E,B],
+          [E,E,E,E,E,W,E,E,E],
+          [E,E,E,E,B,E,E,E,E],
+          [E,E,E,B,B,B,E,E,E]]
+
+
+def generateAll(generator):
+    moves = []
+    while (move := generator.next()) != NO_MOVE:
+        moves.append(move)
+    return moves
+
+
+class TestMoveGenerator(unittest.TestCase):
+
+    def test_stages(self):
+        s = State(np.array(board, dtype=np.byte), True)
+        critical, others = s.getMoves()
+        all_moves = sorted( packMove(start, end) for start, end in critical + others )
+        ordering = MoveOrdering(4)
+        generator = MoveGenerator(ordering)
+
+        tt_move = packMove((6, 5), (6, 8))
+        killer = packMove((6, 5), (6, 6))
+        ordering.recordCutoff(killer, 1, 2, True)
+        generator.reset(s, tt_move, 1)
+        moves = generateAll(generator)
+        self.assertEqual(sorted(moves), all_moves)
+        n_king_moves = len(s.getKingMoves())
+        self.assertEqual(moves[0], tt_move)
+        self.assertTrue(all( s.board[start] == KING for start, _ in map(unpackMove, moves[1:n_king_moves+1]) ))
+        self.assertEqual(moves[n_king_moves+1], packMove((5, 3), (2, 3))) # Capture
+        self.assertEqual(moves[n_king_moves+2], killer)
+
+        # Illegal moves are not generated
+        generator.reset(s, packMove((2, 1), (2, 3)), 0)
+        self.assertEqual(sorted(generateAll(generator)), all_moves)
+
+        # Skipped moves are not generated
+        generator.reset(s, NO_MOVE, 0)
+        generator.skip(tt_move)
+        moves = generateAll(generator)
+        self.assertEqual(len(moves), len(all_moves)-1)
+        self.assertNotIn(tt_move, moves)
+
+
+if __name__ == "__main__":
+    unittest.main()
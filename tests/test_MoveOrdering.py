@@ -0,0 +1,48 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.MoveOrdering import MoveOrdering
+from gametree.TranspositionTable import NO_MOVE, packMove
+import unittest
+
+
+class TestMoveOrdering(unittest.TestCase):
+
+    def test_sortMoves(self):
+        moves = [ packMove((0, 3), (0, i)) for i in range(3) ] + [ packMove((4, 2), (i, 2)) for i in range(1, 4) ]
+        ordering = MoveOrdering(4)
+
+        # Without information the order is kept
+        sorted_moves = moves.copy()
+        ordering.sortMoves(sorted_moves, 0, len(moves), 0, True)
+        self.assertEqual(sorted_moves, moves)
+
+        ordering.recordCutoff(moves[5], 1, 1, True)
+        ordering.recordCutoff(moves[4], 1, 3, True)
+        ordering.recordCutoff(moves[3], 2, 2, True, prev_move=moves[0])
+        sorted_moves = moves.copy()
+        ordering.sortMoves(sorted_moves, 0, len(moves), 0, True)
+        self.assertEqual(sorted_moves[:3], [moves[4], moves[3], moves[5]]) # By history
+        sorted_moves = moves.copy()
+        ordering.sortMoves(sorted_moves, 0, len(moves), 1, True)
+        self.assertEqual(sorted_moves[:3], [moves[4], moves[5], moves[3]]) # Killers first
+        sorted_moves = moves.copy()
+        ordering.sortMoves(sorted_moves, 0, len(moves), 0, True, prev_move=moves[0])
+        self.assertEqual(sorted_moves[:3], [moves[3], moves[4], moves[5]]) # Countermove first
+        sorted_moves = moves.copy()
+        ordering.sortMoves(sorted_moves, 0, len(moves), 0, False)
+        self.assertEqual(sorted_moves, moves) # History is per side
+        sorted_moves = moves.copy()
+        ordering.sortMoves(sorted_moves, 2, 4, 1, True)
+        self.assertEqual(sorted_moves, moves[:2] + [moves[3], moves[2]] + moves[4:]) # Only the range is sorted
+
+    def test_decay(self):
+        move = packMove((0, 3), (0, 2))
+        ordering = MoveOrdering(4)
+        ordering.recordCutoff(move, 0, 4, True)
+        ordering.decay()
+        self.assertEqual(ordering.killers[0], [NO_MOVE, NO_MOVE])
+        self.assertEqual(ordering.history[0][move], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
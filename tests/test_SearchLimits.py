@@ -0,0 +1,41 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.SearchLimits import *
+import time
+import unittest
+
+
+class TestSearchLimits(unittest.TestCase):
+
+    def test_maxNodes(self):
+        limits = SearchLimits(max_nodes=1000)
+        for _ in range(999):
+            self.assertFalse(limits.tick())
+        self.assertTrue(limits.tick())
+        self.assertTrue(limits.tick())
+        self.assertTrue(limits.stopped)
+
+    def test_deadline(self):
+        limits = SearchLimits(time.time() - 1)
+        ticks = 0
+        while not limits.tick(): ticks += 1
+        self.assertLessEqual(ticks, MAX_POLL_INTERVAL)
+        self.assertFalse(SearchLimits().tick())
+
+    def test_interruption(self):
+        polls = []
+        def isInterrupted():
+            polls.append(True)
+            return len(polls) >= 2
+        limits = SearchLimits(is_interrupted=isInterrupted)
+        while not limits.tick(): pass
+        self.assertEqual(len(polls), 2)
+        self.assertGreaterEqual(limits.nodes, 2 * MIN_POLL_INTERVAL)
+
+    def test_depthLimit(self):
+        self.assertEqual(SearchLimits().depthLimit(64), 64)
+        self.assertEqual(SearchLimits(max_depth=3).depthLimit(64), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
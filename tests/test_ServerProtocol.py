@@ -0,0 +1,137 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.State import *
+from ServerProtocol import *
+import numpy as np
+import asyncio
+import socket
+import struct
+import json
+import threading
+import time
+import unittest
+
+B = BLACK
+W = WHITE
+K = KING
+E = EMPTY
+
+initial_state =  [[E,E,E,B,B,B,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,E,W,E,E,E,E],
+                  [B,E,E,E,W,E,E,E,B],
+                  [B,B,W,W,K,W,W,B,B],
+                  [B,E,E,E,W,E,E,E,B],
+                  [E,E,E,E,W,E,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,B,B,B,E,E,E]]
+
+SERVER_NAMES = { E: "EMPTY", B: "BLACK", W: "WHITE", K: "KING" }
+
+
+def serverMessage(board, turn, **dumps_args):
+    server_board = [ [SERVER_NAMES[cell] for cell in row] for row in board ]
+    server_board[4][4] = "THRONE" if board[4][4] == E else server_board[4][4]
+    data = json.dumps({ "board": server_board, "turn": turn }, **dumps_args).encode()
+    return struct.pack(">i", len(data)) + data
+
+
+class TestServerProtocol(unittest.TestCase):
+
+    def setUp(self):
+        self.server_sock, client_sock = socket.socketpair()
+        self.connection = ServerConnection(client_sock)
+
+    def tearDown(self):
+        self.server_sock.close()
+        self.connection.close()
+
+    def test_receiveState(self):
+        self.server_sock.sendall(serverMessage(initial_state, "WHITE"))
+        turn, board = self.connection.receiveState()
+        self.assertEqual(turn, "white")
+        self.assertTrue(np.array_equal(board, np.array(initial_state, dtype=np.byte)))
+        self.assertEqual(board.dtype, np.byte)
+
+        # Throne, lowercase names and turn before the board
+        next_state = np.array(initial_state, dtype=np.byte)
+        next_state[4, 4], next_state[3, 4] = EMPTY, KING
+        data = serverMessage(next_state, "BLACKWIN").replace(b"BLACK\"", b"black\"")
+        payload = json.loads(data[4:])
+        data = json.dumps({ "turn": payload["turn"], "board": payload["board"] }).encode()
+        self.server_sock.sendall(struct.pack(">i", len(data)) + data)
+        turn, same_board = self.connection.receiveState()
+        self.assertEqual(turn, "blackwin")
+        self.assertIs(same_board, board)
+        self.assertTrue(np.array_equal(board, next_state))
+
+    def test_shortReads(self):
+        # Message bigger than the initial buffer, sent in chunks
+        data = serverMessage(initial_state, "BLACK", indent=64)
+        self.assertGreater(len(data), 4096)
+        def sendSlowly():
+            for k in range(0, len(data), 512):
+                self.server_sock.sendall(data[k:k+512])
+                time.sleep(0.001)
+        sender = threading.Thread(target=sendSlowly)
+        sender.start()
+        turn, board = self.connection.receiveState()
+        sender.join()
+        self.assertEqual(turn, "black")
+        self.assertTrue(np.array_equal(board, np.array(initial_state, dtype=np.byte)))
+
+    def test_malformedState(self):
+        data = serverMessage(initial_state, "WHITE").replace(b"KING", b"QUEEN")
+        self.server_sock.sendall(struct.pack(">i", len(data)-4) + data[4:])
+        self.assertRaises(ValueError, self.connection.receiveState)
+
+        data = serverMessage(initial_state, "WHITE").replace(b"KING", b"KINGS")
+        self.server_sock.sendall(struct.pack(">i", len(data)-4) + data[4:])
+        self.assertRaises(ValueError, self.connection.receiveState)
+
+        data = json.dumps({ "board": [["EMPTY"]*9]*8, "turn": "WHITE" }).encode()
+        self.server_sock.sendall(struct.pack(">i", len(data)) + data)
+        self.assertRaises(ValueError, self.connection.receiveState)
+
+    def test_asyncMessages(self):
+        async def playTurn():
+            self.connection.sock.setblocking(False)
+            turn, board = await self.connection.receiveStateAsync()
+            await self.connection.sendMoveAsync((0, 3), (2, 3), BLACK)
+            return turn, board.copy()
+
+        data = serverMessage(initial_state, "BLACK")
+        self.server_sock.sendall(data[:3])
+        threading.Timer(0.01, lambda: self.server_sock.sendall(data[3:])).start()
+        turn, board = asyncio.run(playTurn())
+        self.assertEqual(turn, "black")
+        self.assertTrue(np.array_equal(board, np.array(initial_state, dtype=np.byte)))
+        self.assertGreater(self.connection.arrival_time, 0)
+
+        length = struct.unpack(">i", self.server_sock.recv(4))[0]
+        self.assertEqual(json.loads(self.server_sock.recv(length)), { "from": "D1", "to": "D3", "turn": "B" })
+
+    def test_encoding(self):
+        data = encodeState(np.array(initial_state, dtype=np.byte), "white")
+        self.assertEqual(data, serverMessage(initial_state, "WHITE")[4:])
+        self.assertEqual(decodeMove(encodeMove((4, 2), (7, 2), WHITE)), ((4, 2), (7, 2), "W"))
+        self.assertEqual(fromLettersToIndex("i9"), (8, 8))
+
+    def test_closedConnection(self):
+        self.server_sock.sendall(serverMessage(initial_state, "WHITE")[:50])
+        self.server_sock.close()
+        self.assertRaises(ConnectionError, self.connection.receiveState)
+
+    def test_sendMove(self):
+        self.assertFalse(self.connection.hasIncomingData())
+        self.connection.sendMove((4, 2), (7, 2), WHITE)
+        length = struct.unpack(">i", self.server_sock.recv(4))[0]
+        move = json.loads(self.server_sock.recv(length))
+        self.assertEqual(move, { "from": "C5", "to": "C8", "turn": "W" })
+
+        self.server_sock.sendall(b"\x00")
+        self.assertTrue(self.connection.hasIncomingData())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import os, sys
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
 from gametree.State import *
 import numpy as np
+import random
 import unittest
 
 B = BLACK
@@ -59,6 +60,72 @@ class TestState(unittest.TestCase):
         critical, others = state.getMoves()
         self.assertEqual(len(critical) + len(others), 56)
 
+    def test_stagedMoves(self):
+        b = [[E,E,E,B,B,B,E,E,E],
+             [E,E,E,E,B,E,E,E,E],
+             [E,W,B,E,E,E,E,E,E],
+             [B,E,E,E,E,E,E,E,B],
+             [B,B,E,E,K,E,E,B,B],
+             [B,E,E,W,E,E,E,E,B],
+             [E,E,E,E,E,W,E,E,E],
+             [E,E,E,E,B,E,E,E,E],
+             [E,E,E,B,B,B,E,E,E]]
+        s = State(np.array(b, dtype=np.byte), True)
+        critical, others = s.getMoves()
+        self.assertEqual(s.getCapturingMoves(), [((5, 3), (2, 3))])
+        self.assertEqual(sorted(s.getKingMoves() + s.getPawnsMoves()), sorted(critical + others))
+        self.assertTrue(all(s.board[start] == KING for start, _ in s.getKingMoves()))
+        self.assertTrue(s.isLegalMove((5, 3), (2, 3)))
+        self.assertFalse(s.isLegalMove((2, 1), (2, 3)))
+        self.assertFalse(s.isLegalMove((5, 3), (4, 4)))
+        self.assertFalse(s.isLegalMove((2, 2), (3, 2)))
+        s = State(np.array(b, dtype=np.byte), False)
+        self.assertEqual(s.getKingMoves(), [])
+        self.assertTrue(s.isLegalMove((2, 2), (3, 2)))
+
+    def test_flipTurn(self):
+        s = State(np.array(board, dtype=np.byte), True)
+        s.flipTurn()
+        self.assertFalse(s.is_white_turn)
+        self.assertEqual(s.hash(), State(np.array(board, dtype=np.byte), False).hash())
+        s.flipTurn()
+        self.assertEqual(s.hash(), State(np.array(board, dtype=np.byte), True).hash())
+
+    def test_quietMoves(self):
+        s = State(np.array(board, dtype=np.byte), True)
+        self.assertTrue(s.isQuietMove((2, 4), (2, 1)))
+        self.assertFalse(s.isQuietMove((2, 4), (2, 3))) # Near the column of the king
+        self.assertFalse(s.isQuietMove((4, 4), (4, 4))) # Move of the king
+        s = State(np.array(board, dtype=np.byte), False)
+        self.assertTrue(s.isQuietMove((1, 4), (1, 1)))
+        self.assertFalse(s.isQuietMove((3, 0), (3, 3)))
+
+    def test_quiescenceMoves(self):
+        b = [[E,E,E,B,B,B,E,E,E],
+             [E,E,E,E,B,E,E,E,E],
+             [E,E,K,E,E,E,E,E,E],
+             [B,E,E,E,E,E,E,E,B],
+             [B,B,E,E,E,E,E,B,B],
+             [B,E,E,E,E,E,E,E,B],
+             [E,E,E,E,E,E,W,E,E],
+             [E,E,E,E,B,E,E,E,E],
+             [E,E,E,B,B,B,E,E,E]]
+        s = State(np.array(b, dtype=np.byte), True)
+        self.assertTrue(s.canKingEscape())
+        self.assertIn((2, 0), s.getKingEscapeCells())
+        self.assertNotIn((2, 2), s.getKingEscapeCells())
+        moves = s.getQuiescenceMoves()
+        self.assertIn(((2, 2), (2, 0)), moves)
+        self.assertNotIn(((6, 6), (6, 7)), moves)
+
+        # Black has to stop the escape
+        s = State(np.array(b, dtype=np.byte), False)
+        moves = s.getQuiescenceMoves()
+        self.assertIn(((3, 0), (2, 0)), moves)
+        self.assertIn(((1, 4), (1, 2)), moves)
+        self.assertNotIn(((7, 4), (7, 3)), moves)
+        self.assertFalse(State(board, False).canKingEscape())
+
     
     def test_insideCamp(self):
         b = [[E,E,E,B,B,B,E,E,E],
@@ -198,5 +265,81 @@ class TestState(unittest.TestCase):
         s = State(np.array(b, dtype=np.byte), True)
         self.assertTrue(s.isCaptured(3, 3, HORIZONTAL))
 
+    def test_hash(self):
+        random.seed(0)
+        s = State(np.array(initial_state, dtype=np.byte), True)
+        initial_hash = s.hash()
+        history = []
+        for _ in range(40):
+            if s.getGameState() != OPEN: break
+            self.assertEqual(s.hash(), zobristHash(s.board, s.N_ROWS, s.N_COLS, s.is_white_turn))
+            self.assertEqual(s.hash(normalize=True), zobristHash(s.getNormalizedBoard(), s.N_ROWS, s.N_COLS, s.is_white_turn))
+            self.assertEqual(s.hash(normalize=True), State(s.board.copy(), s.is_white_turn).hash(normalize=True))
+
+            critical, others = s.getMoves()
+            start, end = random.choice(critical + others)
+            history.append( (start, end, s.applyMove(start, end)) )
+
+        for start, end, captured in reversed(history):
+            s.revertMove(start, end, captured)
+        self.assertEqual(s.hash(), initial_hash)
+
+    def test_incrementalPieces(self):
+        random.seed(1)
+        s = State(np.array(initial_state, dtype=np.byte), True)
+        initial_pieces = set(s.pieces)
+        history = []
+        for _ in range(60):
+            if s.getGameState() != OPEN: break
+            fresh = State(s.board.copy(), s.is_white_turn)
+            self.assertEqual(s.pieces, fresh.pieces)
+            self.assertEqual((s.n_whites, s.n_blacks), (np.sum(s.board == WHITE), np.sum(s.board == BLACK)))
+            self.assertEqual(s.getFeatures(), fresh.getFeatures())
+
+            critical, others = s.getMoves()
+            start, end = random.choice(critical + others)
+            history.append( (start, end, s.applyMove(start, end)) )
+
+        for start, end, captured in reversed(history):
+            s.revertMove(start, end, captured)
+        self.assertEqual(s.pieces, initial_pieces)
+        self.assertEqual((s.n_whites, s.n_blacks), (s.N_WHITES, s.N_BLACKS))
+
+    def test_findMove(self):
+        s = State(np.array(initial_state, dtype=np.byte), True)
+        next_state = State(s.board.copy(), True)
+        next_state.applyMove((4, 2), (1, 2))
+        self.assertEqual(s.findMove(next_state), (((4, 2), (1, 2)), []))
+        self.assertEqual(s.findMove(s), (None, []))
+
+        s = State(np.array(
+            [[E,E,E,E,E,E,E,E,E],
+             [E,E,E,E,E,E,E,E,E],
+             [E,E,E,W,E,E,E,E,E],
+             [E,E,E,E,E,E,E,E,E],
+             [E,E,E,E,K,E,E,E,E],
+             [E,E,E,E,E,E,E,E,E],
+             [E,W,B,E,E,E,E,B,E],
+             [E,E,E,E,E,E,E,E,E],
+             [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
+        next_state = State(s.board.copy(), True)
+        self.assertEqual(next_state.applyMove((2, 3), (6, 3)), [((6, 2), BLACK)])
+        self.assertEqual(s.findMove(next_state), (((2, 3), (6, 3)), [(6, 2)]))
+
+        # Two moves away
+        next_state.applyMove((6, 7), (6, 4))
+        self.assertEqual(s.findMove(next_state), (None, []))
+
+    def test_boardTables(self):
+        self.assertEqual([ (i, j) for i, j, _ in MOVE_RAYS[UP][4*9 + 2] ], [(3, 2), (2, 2), (1, 2), (0, 2)])
+        self.assertEqual(MOVE_RAYS[RIGHT][8], [])
+        self.assertEqual(NEIGHBOURS[0], [(1, 0), (0, 1)])
+        self.assertEqual(CAPTURE_PARTNERS[0], [])
+        self.assertEqual(CAPTURE_PARTNERS[1], [(HORIZONTAL, (0, 2), (0, 0))])
+        self.assertTrue(IS_WALL[CASTLE_INDEX])
+        self.assertEqual(CAMP_OF[7*9 + 4], 0)
+        self.assertIsNone(CAMP_OF[CASTLE_INDEX])
+        self.assertEqual(sum(IS_ESCAPE), len(ESCAPE_TILES))
+
 if __name__ == "__main__":
     unittest.main()
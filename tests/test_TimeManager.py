@@ -0,0 +1,49 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.TimeManager import *
+import unittest
+
+
+class TestTimeManager(unittest.TestCase):
+
+    def test_softDeadline(self):
+        stable = TimeManager(10)
+        unstable = TimeManager(10)
+        base_deadline = stable.softDeadline()
+        for move in range(5):
+            stable.startIteration()
+            stable.iterationCompleted(42)
+            unstable.startIteration()
+            unstable.iterationCompleted(move)
+        self.assertLess(stable.softDeadline(), base_deadline)
+        self.assertGreater(unstable.softDeadline(), base_deadline)
+        self.assertLessEqual(unstable.softDeadline(), unstable.hard_deadline + 1e-9)
+
+    def test_prediction(self):
+        tm = TimeManager(10)
+        self.assertEqual(tm.predictNextIteration(), 0)
+        tm.iteration_durations = [0.5]
+        self.assertAlmostEqual(tm.predictNextIteration(), 0.5 * DEFAULT_BRANCHING)
+        tm.iteration_durations = [0.5, 1.5]
+        self.assertAlmostEqual(tm.predictNextIteration(), 4.5)
+        self.assertTrue(tm.shouldStartIteration())
+        # Growth averaged over the last two iterations
+        tm.iteration_durations = [0.1, 0.2, 0.9]
+        self.assertAlmostEqual(tm.predictNextIteration(), 0.9 * 3)
+
+        # The next iteration would not end before the hard deadline
+        tm.iteration_durations = [2, 6]
+        self.assertFalse(tm.shouldStartIteration())
+        tm.adaptive = False
+        self.assertTrue(tm.shouldStartIteration())
+
+    def test_wasted(self):
+        tm = TimeManager(0)
+        self.assertFalse(tm.shouldStartIteration())
+        tm.startIteration()
+        tm.iterationAborted()
+        self.assertGreaterEqual(tm.wasted, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src/ga-training"))
+from Environment import Environment, INPROCESS_REFEREE, JAVA_REFEREE, WHITE_WIN, BLACK_WIN
+from Population import Population
+from Individual import WHITE, BLACK
+from Tournament import Tournament
+from train import DEFAULT_WHITES_STARTING_WEIGHTS, DEFAULT_BLACKS_STARTING_WEIGHTS
+import unittest
+
+
+"""
+    Environment that does not play: the winner of a game only depends on the individual
+    (identified by its timeout) and the players always do 10 white moves and 20 black moves.
+"""
+class StubEnvironment(Environment):
+    def __init__(self, winners:dict):
+        super().__init__("", referee=INPROCESS_REFEREE)
+        self.winners = winners
+
+    def playGame(self, white, black):
+        indiv = white if white.timeout in self.winners else black
+        return self.winners[indiv.timeout], 10, 20
+
+
+class StubLogger:
+    def update(self, target, population, epoch):
+        pass
+
+
+def newPopulation(n_individuals, color):
+    population = Population(n_individuals, DEFAULT_WHITES_STARTING_WEIGHTS if color == WHITE else DEFAULT_BLACKS_STARTING_WEIGHTS, color, 1)
+    for i, indiv in enumerate(population.individuals): indiv.timeout = i
+    return population
+
+def newOpponent(color):
+    opponent = newPopulation(1, color).individuals[0]
+    opponent.timeout = -1
+    return opponent
+
+
+class TestTournament(unittest.TestCase):
+
+    def test_schedule(self):
+        population = newPopulation(2, WHITE)
+        env = StubEnvironment({ 0: WHITE_WIN, 1: BLACK_WIN })
+        for parallel_games in (1, 2):
+            results = Tournament(env, parallel_games=parallel_games, games_per_indiv=3, swap_colors=True).play(population.individuals, newOpponent(BLACK))
+            self.assertEqual(results, [
+                [ (WHITE, WHITE_WIN, 10, 20), (BLACK, WHITE_WIN, 10, 20), (WHITE, WHITE_WIN, 10, 20) ],
+                [ (WHITE, BLACK_WIN, 10, 20), (BLACK, BLACK_WIN, 10, 20), (WHITE, BLACK_WIN, 10, 20) ]
+            ])
+
+        population = newPopulation(2, BLACK)
+        results = Tournament(env, games_per_indiv=2).play(population.individuals, newOpponent(WHITE))
+        self.assertEqual([ [game[0] for game in games] for games in results ], [ [BLACK, BLACK], [BLACK, BLACK] ])
+
+        self.assertRaises(ValueError, lambda: Tournament(Environment("", referee=JAVA_REFEREE), parallel_games=2))
+
+    def test_fight(self):
+        population = newPopulation(2, WHITE)
+        env = StubEnvironment({ 0: WHITE_WIN, 1: BLACK_WIN })
+
+        # The first individual wins both games as white and loses the one as black
+        num_wins = population.fight(Tournament(env, games_per_indiv=3, swap_colors=True), newOpponent(BLACK), StubLogger(), 1)
+        self.assertEqual(num_wins, 1)
+        self.assertAlmostEqual(population.individuals[0].fitness, (8.2 - 6.4 + 8.2) / 3)
+        self.assertAlmostEqual(population.individuals[1].fitness, (-8.2 + 6.4 - 8.2) / 3)
+
+        # Half of the games is not a majority
+        num_wins = population.fight(Tournament(env, games_per_indiv=2, swap_colors=True), newOpponent(BLACK), StubLogger(), 1)
+        self.assertEqual(num_wins, 0)
+        self.assertAlmostEqual(population.individuals[0].fitness, (8.2 - 6.4) / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
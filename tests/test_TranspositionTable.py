@@ -0,0 +1,113 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.State import *
+from gametree.TranspositionTable import *
+import numpy as np
+import unittest
+
+B = BLACK
+W = WHITE
+K = KING
+E = EMPTY
+
+initial_state =  [[E,E,E,B,B,B,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,E,W,E,E,E,E],
+                  [B,E,E,E,W,E,E,E,B],
+                  [B,B,W,W,K,W,W,B,B],
+                  [B,E,E,E,W,E,E,E,B],
+                  [E,E,E,E,W,E,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,B,B,B,E,E,E]]
+
+
+def childStates(n):
+    s = State(np.array(initial_state, dtype=np.byte), True)
+    critical, others = s.getMoves()
+    states = []
+    for start, end in (critical + others)[:n]:
+        child = State(s.board.copy(), True)
+        child.applyMove(start, end)
+        states.append(child)
+    return states
+
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def test_size(self):
+        tt = TranspositionTable(1)
+        self.assertLessEqual(tt.table.nbytes, 2**20)
+        self.assertGreater(tt.table.nbytes, 2**19)
+        self.assertEqual(tt.n_buckets & (tt.n_buckets-1), 0)
+
+    def test_getEntry(self):
+        s1, s2 = childStates(2)
+        tt = TranspositionTable(1)
+        self.assertIsNone(tt[s1])
+        tt.setEntry(s1, EXACT, 0.5, 3, packMove((0, 3), (0, 2)))
+        entry = tt[s1]
+        self.assertEqual((entry.type, entry.value, entry.depth), (EXACT, 0.5, 3))
+        self.assertEqual(unpackMove(entry.best_move), ((0, 3), (0, 2)))
+        self.assertIsNone(tt[s2])
+        # Lookups do not allocate entries
+        tt.setEntry(s2, LOWERBOUND, 0.25, 1)
+        self.assertIs(tt[s2], entry)
+        self.assertEqual((entry.type, entry.value, entry.depth, entry.best_move), (LOWERBOUND, 0.25, 1, NO_MOVE))
+
+    def test_symmetricStates(self):
+        b = np.zeros((9, 9), dtype=np.byte)
+        b[2, 2], b[1, 3], b[7, 6], b[3, 0] = K, W, B, B
+        tt = TranspositionTable(1)
+        tt.setEntry(State(b.copy(), True), EXACT, 0.5, 3, packMove((1, 3), (2, 3)))
+
+        # The best move is returned on the board of the lookup
+        entry = tt[State(np.rot90(b, 2).copy(), True)]
+        self.assertEqual(entry.value, 0.5)
+        self.assertEqual(unpackMove(entry.best_move), ((7, 5), (6, 5)))
+        entry = tt[State(np.rot90(b, 1).copy(), True)]
+        self.assertEqual(unpackMove(entry.best_move), ((5, 1), (5, 2)))
+        self.assertEqual(unpackMove(tt[State(b.copy(), True)].best_move), ((1, 3), (2, 3)))
+
+    def test_replacement(self):
+        s1, s2, s3 = childStates(3)
+        tt = TranspositionTable(0) # Single bucket
+        self.assertEqual(tt.n_buckets, 1)
+
+        tt.setEntry(s1, EXACT, 1, 5)
+        tt.setEntry(s2, LOWERBOUND, 2, 2)
+        # Shallower entries do not replace the deep one
+        self.assertEqual(tt[s1].value, 1)
+        self.assertEqual(tt[s2].value, 2)
+        tt.setEntry(s3, UPPERBOUND, 3, 1)
+        self.assertEqual(tt[s1].value, 1)
+        self.assertIsNone(tt[s2])
+        self.assertEqual(tt[s3].value, 3)
+        # A deeper entry moves the old deep entry in the always-replace slot
+        tt.setEntry(s2, EXACT, 4, 6)
+        self.assertEqual(tt[s2].value, 4)
+        self.assertEqual(tt[s1].value, 1)
+        self.assertIsNone(tt[s3])
+
+    def test_shared(self):
+        s1, s2 = childStates(2)
+        tt = TranspositionTable(1, shared=True)
+        attached_tt = TranspositionTable(1, shm_name=tt.shm.name)
+        tt.setEntry(s1, EXACT, 0.5, 3)
+        self.assertEqual(attached_tt[s1].value, 0.5)
+        attached_tt.setEntry(s2, LOWERBOUND, 0.25, 2)
+        self.assertEqual(tt[s2].value, 0.25)
+        attached_tt.close()
+        tt.close()
+
+    def test_tornEntry(self):
+        s1, = childStates(1)
+        tt = TranspositionTable(1)
+        tt.setEntry(s1, EXACT, 0.5, 3)
+        # Entry partially overwritten by another process
+        slot = (s1.hash(normalize=True) & tt.bucket_mask) * BUCKET_SIZE
+        tt.depths[slot] = 7
+        self.assertIsNone(tt[s1])
+
+
+if __name__ == "__main__":
+    unittest.main()
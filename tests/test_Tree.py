@@ -0,0 +1,198 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.State import *
+from gametree.Tree import Tree
+from gametree.SearchLimits import SearchLimits
+import numpy as np
+import json
+import time
+import unittest
+
+B = BLACK
+W = WHITE
+K = KING
+E = EMPTY
+
+initial_state =  [[E,E,E,B,B,B,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,E,W,E,E,E,E],
+                  [B,E,E,E,W,E,E,E,B],
+                  [B,B,W,W,K,W,W,B,B],
+                  [B,E,E,E,W,E,E,E,B],
+                  [E,E,E,E,W,E,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,B,B,B,E,E,E]]
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src/weights.json"), "r") as f:
+    weights = json.load(f)
+
+
+def newTree(**kwargs):
+    return Tree(State(np.array(initial_state, dtype=np.byte), True), WHITE, weights["white"], tt_mb=1, **kwargs)
+
+
+class TestTree(unittest.TestCase):
+
+    def test_compactMinimax(self):
+        tree = newTree()
+        compact_tree = newTree(compact=True)
+        for depth in range(1, 3):
+            score = tree.minimax(tree.root, depth, -np.inf, np.inf, SearchLimits())
+            compact_score = compact_tree.compactMinimax(depth, 0, -np.inf, np.inf, SearchLimits())
+            self.assertAlmostEqual(score, compact_score)
+        self.assertTrue(np.all(compact_tree.state.board == np.array(initial_state, dtype=np.byte)))
+
+    def test_pvs(self):
+        for compact in (False, True):
+            tree = newTree()
+            pvs_tree = newTree(compact=compact, search="pvs")
+            for depth in range(1, 4):
+                score = tree.minimax(tree.root, depth, -np.inf, np.inf, SearchLimits())
+                if compact:
+                    pvs_score = pvs_tree.compactMinimax(depth, 0, -np.inf, np.inf, SearchLimits())
+                else:
+                    pvs_score = pvs_tree.minimax(pvs_tree.root, depth, -np.inf, np.inf, SearchLimits())
+                self.assertAlmostEqual(score, pvs_score)
+        self.assertRaises(ValueError, newTree, search="mtdf")
+
+    def test_compactDecide(self):
+        tree = newTree(compact=True)
+        critical, others = State(np.array(initial_state, dtype=np.byte), True).getMoves()
+        start, end, _ = tree.decide(1)
+        self.assertIn((start, end), critical + others)
+        self.assertIsNone(tree.root.children)
+
+    def test_workers(self):
+        tree = newTree(workers=2)
+        critical, others = State(np.array(initial_state, dtype=np.byte), True).getMoves()
+        start, end, _ = tree.decide(1)
+        self.assertIn((start, end), critical + others)
+        tree.close()
+        self.assertRaises(ValueError, newTree, workers=0)
+
+    def test_ponder(self):
+        tree = newTree()
+        decays = []
+        decay = tree.ordering.decay
+        tree.ordering.decay = lambda: decays.append(True) or decay()
+        start, end, _ = tree.decide(1)
+        board = tree.state.board.copy()
+        polls = []
+        def isInterrupted():
+            polls.append(True)
+            return len(polls) > 10
+        self.assertGreaterEqual(tree.ponder(isInterrupted), 1)
+        self.assertEqual(len(polls), 11)
+        self.assertTrue(np.all(tree.state.board == board))
+        # The history is aged by the decisions only
+        self.assertEqual(len(decays), 1)
+
+        # The reply of the opponent is found in the pondered tree
+        critical, others = tree.state.getMoves()
+        reply = State(board.copy(), tree.state.is_white_turn)
+        reply.applyMove(*(critical + others)[0])
+        tree.applyOpponentMove(reply)
+        self.assertIsNotNone(tree.root.children)
+
+    def test_quiescence(self):
+        b = [[E,E,E,B,B,B,E,E,E],
+             [E,E,E,E,B,E,E,E,E],
+             [E,E,K,E,E,E,E,E,E],
+             [B,E,E,E,E,E,E,E,B],
+             [B,B,E,E,E,E,E,B,B],
+             [B,E,E,E,E,E,E,E,B],
+             [E,E,E,E,E,E,W,E,E],
+             [E,E,E,E,B,E,E,E,E],
+             [E,E,E,B,B,B,E,E,E]]
+        # Black cannot stop all the escapes of the king
+        tree = Tree(State(np.array(b, dtype=np.byte), False), WHITE, weights["white"], tt_mb=1, quiescence=True)
+        self.assertGreaterEqual(tree.minimax(tree.root, 0, -np.inf, np.inf, SearchLimits()), MAX_SCORE)
+        tree = Tree(State(np.array(b, dtype=np.byte), False), WHITE, weights["white"], tt_mb=1)
+        self.assertLess(tree.minimax(tree.root, 0, -np.inf, np.inf, SearchLimits()), MAX_SCORE)
+
+    def test_selectiveSearch(self):
+        tree = newTree(compact=True, null_move=True, lmr=True, debug=True)
+        initial_hash = tree.state.hash()
+        for depth in range(1, 5):
+            tree.compactMinimax(depth, 0, -np.inf, np.inf, SearchLimits())
+        self.assertGreater(tree._Tree__null_cutoffs, 0)
+        self.assertGreater(tree._Tree__reductions, 0)
+        self.assertTrue(np.all(tree.state.board == np.array(initial_state, dtype=np.byte)))
+        self.assertTrue(tree.state.is_white_turn)
+        self.assertEqual(tree.state.hash(), initial_hash)
+
+        # Selective search is not used near the leaves
+        tree = newTree()
+        selective_tree = newTree(null_move=True, lmr=True)
+        for depth in range(1, 4):
+            score = tree.minimax(tree.root, depth, -np.inf, np.inf, SearchLimits())
+            self.assertAlmostEqual(score, selective_tree.minimax(selective_tree.root, depth, -np.inf, np.inf, SearchLimits()))
+
+    def test_limits(self):
+        tree = newTree(compact=True)
+        tree.decide(np.inf, max_depth=2)
+        self.assertEqual(len(tree.iteration_times), 2)
+
+        # Fixed nodes searches are reproducible
+        moves = [ newTree(compact=True).decide(np.inf, max_nodes=300)[:2] for _ in range(2) ]
+        self.assertEqual(moves[0], moves[1])
+
+        # Interrupted searches keep the last completed iteration
+        tree = newTree(compact=True)
+        tree.decide(np.inf, is_interrupted=lambda: len(tree.iteration_times) >= 2)
+        self.assertEqual(len(tree.iteration_times), 2)
+
+    def test_partialIteration(self):
+        state = State(np.array(initial_state, dtype=np.byte), True)
+
+        # Depth 2 is interrupted as soon as a move better than the previous best one is found
+        tree = newTree()
+        isInterrupted = lambda: tree.partial_pv_searched and (tree.partial_best_move != tree.root_pv_move)
+        depth, best_move, _ = tree.searchPosition(state, 1, time.time() + 1000, 1, isInterrupted)
+        self.assertEqual(depth, 1)
+        self.assertTrue(tree.partial_pv_searched)
+        self.assertNotEqual(tree.root_pv_move, best_move)
+        self.assertEqual(best_move, tree.partial_best_move)
+
+        # Same choice of the complete iteration
+        tree = newTree()
+        score = tree.minimax(tree.root, 2, -np.inf, np.inf, SearchLimits())
+        self.assertIn(best_move, [ child.packedMove() for child in tree.root.children if child.score == score ])
+
+    def test_applyOpponentMove(self):
+        tree = newTree()
+        tree.decide(np.inf, max_depth=2)
+        state = tree.state
+
+        # The reply is recovered from the board and applied to the current state
+        reply = tree.root.children[0]
+        next_state = State(tree.state.board.copy(), tree.state.is_white_turn)
+        next_state.applyMove(reply.start, reply.end)
+        tree.applyOpponentMove(next_state)
+        self.assertIs(tree.root, reply)
+        self.assertIs(tree.state, state)
+        self.assertTrue(np.all(tree.state.board == next_state.board))
+        self.assertEqual(tree.state.hash(), next_state.hash())
+
+        # Reply not among the children
+        tree.root.children = []
+        start, end = tree.state.getMoves()[1][0]
+        next_state = State(tree.state.board.copy(), tree.state.is_white_turn)
+        next_state.applyMove(start, end)
+        tree.applyOpponentMove(next_state)
+        self.assertIsNone(tree.root.start)
+        self.assertIs(tree.state, state)
+        self.assertTrue(np.all(tree.state.board == next_state.board))
+
+        # Desync: the board cannot be reached with a single move
+        board = tree.state.board.copy()
+        board[0, 3] = EMPTY
+        board[8, 3] = EMPTY
+        next_state = State(board, not tree.state.is_white_turn)
+        with self.assertLogs("gametree.Tree", level="ERROR"):
+            tree.applyOpponentMove(next_state)
+        self.assertIs(tree.state, next_state)
+        self.assertIsNone(tree.root.start)
+
+if __name__ == "__main__":
+    unittest.main()
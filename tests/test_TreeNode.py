@@ -0,0 +1,81 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+from gametree.State import *
+from gametree.TreeNode import TreeNode
+from gametree.TranspositionTable import packMove
+from gametree.MoveOrdering import MoveOrdering
+from gametree.MoveGenerator import MoveGenerator
+import numpy as np
+import unittest
+
+B = BLACK
+W = WHITE
+K = KING
+E = EMPTY
+
+initial_state =  [[E,E,E,B,B,B,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,E,W,E,E,E,E],
+                  [B,E,E,E,W,E,E,E,B],
+                  [B,B,W,W,K,W,W,B,B],
+                  [B,E,E,E,W,E,E,E,B],
+                  [E,E,E,E,W,E,E,E,E],
+                  [E,E,E,E,B,E,E,E,E],
+                  [E,E,E,B,B,B,E,E,E]]
+
+
+class TestTreeNode(unittest.TestCase):
+
+    def test_bestMoveFirst(self):
+        s = State(np.array(initial_state, dtype=np.byte), True)
+        critical, others = s.getMoves()
+        start, end = others[-1]
+
+        node = TreeNode(None, None)
+        children = list(node.getChildren(s, packMove(start, end)))
+        self.assertEqual((children[0].start, children[0].end), (start, end))
+        self.assertEqual(len(children), len(critical) + len(others))
+
+        # Moves that are not among the children are ignored
+        node = TreeNode(None, None)
+        children = list(node.getChildren(s, packMove((0, 0), (0, 1))))
+        self.assertEqual([ (c.start, c.end) for c in children ], critical + others)
+
+    def test_lazyChildren(self):
+        s = State(np.array(initial_state, dtype=np.byte), True)
+        critical, others = s.getMoves()
+        generator = MoveGenerator(MoveOrdering(4))
+
+        node = TreeNode(None, None)
+        for child in node.getChildren(s, generator=generator):
+            break # Cutoff
+        self.assertEqual(len(node.children), 1)
+        self.assertFalse(node.expanded)
+
+        # Visiting the node again resumes the generation
+        children = list(node.getChildren(s, generator=generator))
+        self.assertTrue(node.expanded)
+        self.assertEqual(children[0], child)
+        self.assertEqual(sorted( (c.start, c.end) for c in children ), sorted(critical + others))
+
+        # A best move not generated yet comes before the children already generated
+        node = TreeNode(None, None)
+        for child in node.getChildren(s, generator=generator):
+            break
+        start, end = others[-1]
+        children = list(node.getChildren(s, packMove(start, end), generator=generator))
+        self.assertEqual((children[0].start, children[0].end), (start, end))
+        self.assertEqual(children[1], child)
+        self.assertEqual(sorted( (c.start, c.end) for c in children ), sorted(critical + others))
+
+        # Illegal moves are ignored
+        node = TreeNode(None, None)
+        for child in node.getChildren(s, generator=generator):
+            break
+        children = list(node.getChildren(s, packMove((0, 0), (0, 1)), generator=generator))
+        self.assertEqual(children[0], child)
+        self.assertEqual(len(children), len(critical) + len(others))
+
+
+if __name__ == "__main__":
+    unittest.main()
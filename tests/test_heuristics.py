@@ -23,8 +23,8 @@ initial_state =  np.array(
 class TestState(unittest.TestCase):
      def test_pawnRatio(self):
           s = State(initial_state, True)
-          self.assertEqual(s._State__pawnRatio(WHITE), 1)
-          self.assertEqual(s._State__pawnRatio(BLACK), 1)
+          self.assertEqual(s.getFeatures()[PAWNS_WHITE], 1)
+          self.assertEqual(s.getFeatures()[PAWNS_BLACK], 1)
 
           s = State(np.array(
                [[E,E,E,E,E,E,E,E,E],
@@ -36,14 +36,14 @@ class TestState(unittest.TestCase):
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,W,E,E,E,B,E,E],
                 [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
-          self.assertEqual(s._State__pawnRatio(WHITE), 2/s.N_WHITES)
-          self.assertEqual(s._State__pawnRatio(BLACK), 2/s.N_BLACKS)
+          self.assertEqual(s.getFeatures()[PAWNS_WHITE], 2/s.N_WHITES)
+          self.assertEqual(s.getFeatures()[PAWNS_BLACK], 2/s.N_BLACKS)
 
 
      def test_avgProximityToKingRatio(self):
           s = State(initial_state, True)
-          self.assertEqual(s._State__avgProximityToKingRatio(WHITE), 1 - (((1+2)/2) / s.MAX_DIST_TO_KING))
-          self.assertEqual(s._State__avgProximityToKingRatio(BLACK), 1 - (((3+4+5+5)/4) / s.MAX_DIST_TO_KING))
+          self.assertEqual(s.getFeatures()[PROXIMITY_WHITE], 1 - (((1+2)/2) / s.MAX_DIST_TO_KING))
+          self.assertEqual(s.getFeatures()[PROXIMITY_BLACK], 1 - (((3+4+5+5)/4) / s.MAX_DIST_TO_KING))
 
           s = State(np.array(
                [[E,E,E,E,E,E,E,E,E],
@@ -55,7 +55,7 @@ class TestState(unittest.TestCase):
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,B]], dtype=np.byte), True)
-          self.assertEqual(s._State__avgProximityToKingRatio(BLACK), 0)
+          self.assertEqual(s.getFeatures()[PROXIMITY_BLACK], 0)
 
           s = State(np.array(
                [[E,E,E,E,E,E,E,E,E],
@@ -67,13 +67,13 @@ class TestState(unittest.TestCase):
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,B]], dtype=np.byte), True)
-          self.assertEqual(s._State__avgProximityToKingRatio(BLACK), 1 - (((14+1)/2) / s.MAX_DIST_TO_KING))
+          self.assertEqual(s.getFeatures()[PROXIMITY_BLACK], 1 - (((14+1)/2) / s.MAX_DIST_TO_KING))
 
 
      def test_safenessRatio(self):
           s = State(initial_state, True)
-          self.assertEqual(s._State__safenessRatio(WHITE), 1)
-          self.assertEqual(s._State__safenessRatio(BLACK), 1)
+          self.assertEqual(s.getFeatures()[SAFENESS_WHITE], 1)
+          self.assertEqual(s.getFeatures()[SAFENESS_BLACK], 1)
 
           # Pawns near camp wall
           s = State(np.array(
@@ -86,8 +86,8 @@ class TestState(unittest.TestCase):
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
-          self.assertEqual(s._State__safenessRatio(WHITE), 0)
-          self.assertEqual(s._State__safenessRatio(BLACK), 0)
+          self.assertEqual(s.getFeatures()[SAFENESS_WHITE], 0)
+          self.assertEqual(s.getFeatures()[SAFENESS_BLACK], 0)
 
           # Black inside camp
           s = State(np.array(
@@ -100,7 +100,7 @@ class TestState(unittest.TestCase):
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
-          self.assertEqual(s._State__safenessRatio(BLACK), 1)
+          self.assertEqual(s.getFeatures()[SAFENESS_BLACK], 1)
 
           # Pawns near castle
           s = State(np.array(
@@ -113,8 +113,8 @@ class TestState(unittest.TestCase):
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
-          self.assertEqual(s._State__safenessRatio(WHITE), 0.5)
-          self.assertEqual(s._State__safenessRatio(BLACK), 0.5)
+          self.assertEqual(s.getFeatures()[SAFENESS_WHITE], 0.5)
+          self.assertEqual(s.getFeatures()[SAFENESS_BLACK], 0.5)
 
           # Pawns near other pawns
           s = State(np.array(
@@ -127,8 +127,8 @@ class TestState(unittest.TestCase):
                 [E,E,W,B,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
-          self.assertEqual(s._State__safenessRatio(WHITE), 0.5)
-          self.assertEqual(s._State__safenessRatio(BLACK), 0.5)
+          self.assertEqual(s.getFeatures()[SAFENESS_WHITE], 0.5)
+          self.assertEqual(s.getFeatures()[SAFENESS_BLACK], 0.5)
 
           s = State(np.array(
                [[E,E,E,E,E,E,E,E,E],
@@ -140,13 +140,13 @@ class TestState(unittest.TestCase):
                 [E,E,W,B,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
-          self.assertEqual(s._State__safenessRatio(WHITE), 0)
-          self.assertEqual(s._State__safenessRatio(BLACK), 0.5)
+          self.assertEqual(s.getFeatures()[SAFENESS_WHITE], 0)
+          self.assertEqual(s.getFeatures()[SAFENESS_BLACK], 0.5)
 
 
      def test_minDistanceToEscapeRatio(self):
           s = State(initial_state, True)
-          self.assertEqual(s._State__minDistanceToEscapeRatio(), 1 - 6/s.MAX_DIST_TO_ESCAPE)
+          self.assertEqual(s.getFeatures()[ESCAPE_PROXIMITY], 1 - 6/s.MAX_DIST_TO_ESCAPE)
 
           s = State(np.array(
                [[E,E,E,E,E,E,E,E,E],
@@ -158,7 +158,7 @@ class TestState(unittest.TestCase):
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
-          self.assertEqual(s._State__minDistanceToEscapeRatio(), 1 - 1/s.MAX_DIST_TO_ESCAPE)
+          self.assertEqual(s.getFeatures()[ESCAPE_PROXIMITY], 1 - 1/s.MAX_DIST_TO_ESCAPE)
 
           s = State(np.array(
                [[E,W,W,E,E,E,E,E,E],
@@ -170,7 +170,7 @@ class TestState(unittest.TestCase):
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E],
                 [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
-          self.assertEqual(s._State__minDistanceToEscapeRatio(), 1 - 5/s.MAX_DIST_TO_ESCAPE)
+          self.assertEqual(s.getFeatures()[ESCAPE_PROXIMITY], 1 - 5/s.MAX_DIST_TO_ESCAPE)
 
           s = State(np.array(
                [[E,W,W,E,E,E,W,W,E],
@@ -182,7 +182,24 @@ class TestState(unittest.TestCase):
                 [W,E,E,E,E,E,E,E,W],
                 [W,E,E,E,E,E,E,E,W],
                 [E,W,W,E,E,E,W,E,E]], dtype=np.byte), True)
-          self.assertEqual(s._State__minDistanceToEscapeRatio(), 1 - 13/s.MAX_DIST_TO_ESCAPE)
+          self.assertEqual(s.getFeatures()[ESCAPE_PROXIMITY], 1 - 13/s.MAX_DIST_TO_ESCAPE)
+
+
+     def test_kingDanger(self):
+          s = State(initial_state, True)
+          self.assertEqual(s.getFeatures()[KING_DANGER], 0)
+
+          s = State(np.array(
+               [[E,E,E,E,E,E,E,E,E],
+                [E,E,E,E,E,E,E,E,E],
+                [E,E,B,E,E,E,E,E,E],
+                [E,B,K,B,E,E,E,E,E],
+                [E,E,W,E,E,E,E,E,E],
+                [E,E,E,E,E,E,E,E,E],
+                [E,E,E,E,E,E,E,E,E],
+                [E,E,E,E,E,E,E,E,E],
+                [E,E,E,E,E,E,E,E,E]], dtype=np.byte), True)
+          self.assertEqual(s.getFeatures()[KING_DANGER], 3/4)
 
 
 if __name__ == "__main__":